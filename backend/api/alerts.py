@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from backend.services.fast2sms_service import send_sms
-from backend.services.groq_message_service import generate_message_with_groq
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from backend.services.fast2sms_service import send_sms, get_dispatcher
+from backend.services.groq_message_service import (
+    get_alert_message,
+    get_message_service,
+    pregenerate_for_hotspots
+)
+from backend.services.hotspot_engine import EPS_KM_MAX, EPS_KM_MIN
 import os
 from backend.mock_store import add_alert
 from datetime import datetime
@@ -17,6 +23,21 @@ class SendSMSRequest(BaseModel):
     event: str | None = None
 
 
+class SendBulkSMSRequest(BaseModel):
+    phones: List[str]
+    zone: str
+    crime_type: str
+    risk: float
+    event: str | None = None
+
+
+class PregenerateMessagesRequest(BaseModel):
+    events: List[str] = []
+    top: int = Field(20, ge=1, le=200)
+    eps_km: float = Field(3, ge=EPS_KM_MIN, le=EPS_KM_MAX)
+    min_samples: int = Field(2, ge=1)
+
+
 @router.post("/send-sms")
 def send_alert_sms(payload: SendSMSRequest):
     # 1️⃣ Risk gate
@@ -34,14 +55,8 @@ def send_alert_sms(payload: SendSMSRequest):
         "event": payload.event
     }
 
-    # 3️⃣ Generate message via Groq
-    try:
-        message = generate_message_with_groq(context)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Groq message generation failed: {str(e)}"
-        )
+    # 3️⃣ Message: cached, Groq, or a template if Groq is slow or down
+    message, message_source = get_alert_message(context)
 
     # 4️⃣ Send SMS
     try:
@@ -63,8 +78,95 @@ def send_alert_sms(payload: SendSMSRequest):
 
     return {
         "status": "sent",
-        "message_source": "groq",
+        "message_source": message_source,
         "phone": payload.phone,
         "message": message,
         "gateway_response": gateway_response
     }
+
+
+@router.post("/send-sms/bulk")
+def send_alert_sms_bulk(payload: SendBulkSMSRequest):
+    """One message to many phones; batches are sent in the background"""
+    if payload.risk < 0.5:
+        return {
+            "status": "skipped",
+            "reason": "Risk below threshold"
+        }
+
+    context = {
+        "zone": payload.zone,
+        "crime_type": payload.crime_type,
+        "risk": payload.risk,
+        "event": payload.event
+    }
+    message, message_source = get_alert_message(context)
+
+    campaign = get_dispatcher().dispatch(payload.phones, message)
+    add_alert({
+        "zone": payload.zone,
+        "crime_type": payload.crime_type,
+        "risk": payload.risk,
+        "message": message,
+        "sent_at": datetime.utcnow().isoformat(),
+        "delivery": "Queued",
+        "campaign_id": campaign["campaign_id"]
+    })
+
+    return {
+        "status": "queued",
+        "message_source": message_source,
+        "message": message,
+        **campaign
+    }
+
+
+@router.get("/sms/{campaign_id}")
+def sms_campaign_status(campaign_id: int):
+    status = get_dispatcher().status(campaign_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return status
+
+
+@router.get("/sms/{campaign_id}/deliveries")
+def sms_campaign_deliveries(
+    campaign_id: int,
+    status: Optional[str] = Query(None, pattern="^(queued|sent|failed)$"),
+    limit: int = Query(1000, ge=1, le=10000),
+    offset: int = Query(0, ge=0)
+):
+    dispatcher = get_dispatcher()
+    if dispatcher.status(campaign_id) is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return dispatcher.deliveries(campaign_id, status, limit, offset)
+
+
+@router.post("/sms/{campaign_id}/retry")
+def sms_campaign_retry(campaign_id: int):
+    """Queue the campaign's failed numbers again"""
+    try:
+        return get_dispatcher().retry_failed(campaign_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+
+@router.post("/messages/pregenerate")
+def pregenerate_messages(payload: Optional[PregenerateMessagesRequest] = None):
+    """Generate messages for the busiest hotspots ahead of alerts, e.g.
+    {"events": ["Ganesh Festival"], "top": 20}"""
+    payload = payload or PregenerateMessagesRequest()
+    try:
+        return pregenerate_for_hotspots(
+            events=payload.events or [None],
+            top=payload.top,
+            eps_km=payload.eps_km,
+            min_samples=payload.min_samples
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/messages/stats")
+def message_cache_stats():
+    return get_message_service().get_stats()
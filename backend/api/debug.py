@@ -1,5 +1,9 @@
 from fastapi import APIRouter
 from backend.mock_store import get_all_firs
+from backend.services.geocode_cache import get_cache
+from backend.services.ingest_cache import get_ingest_cache
+from backend.services.crime_classifier import reclassify_store
+from backend.fir_store import get_store
 
 router = APIRouter(prefix="/debug")
 
@@ -10,3 +14,18 @@ def debug_firs():
         "count": len(firs),
         "firs": firs
     }
+
+@router.get("/geocode-cache")
+def debug_geocode_cache():
+    return get_cache().get_stats()
+
+
+@router.get("/ingest-cache")
+def debug_ingest_cache():
+    return get_ingest_cache().get_stats()
+
+
+@router.post("/reclassify-crimes")
+def debug_reclassify_crimes():
+    """Re-run the crime type rules over every stored FIR"""
+    return reclassify_store(get_store())
@@ -1,29 +1,27 @@
 # backend/api/deployment.py
 from fastapi import APIRouter
-from backend.mock_store import get_all_firs
+from backend.mock_store import get_aggregates
+from backend.services.geogrid import GEOHASH_PRECISION, decode_bounds
 
 router = APIRouter(prefix="/deployment", tags=["Deployment"])
 
 @router.get("/recommendations")
 def get_deployment_recommendations():
-    firs = get_all_firs()
-
-    hotspots = {}
-    for fir in firs:
-        geo = fir.get("geo")
-        if not geo:
-            continue
-
-        key = f"{round(geo['lat'], 3)}-{round(geo['lon'], 3)}"
-        hotspots[key] = hotspots.get(key, 0) + 1
+    # ~150 m geohash cells, counted on ingest (see services/geogrid.py)
+    hotspots = {
+        cell: n for cell, n in get_aggregates(f"gh{GEOHASH_PRECISION}").items() if n >= 2
+    }
+    cells = list(hotspots)
+    bounds = decode_bounds(cells)
 
     recommendations = []
-    for zone, count in hotspots.items():
-        if count >= 2:
-            recommendations.append({
-                "zone": zone,
-                "recommended_units": ["PCR Van"],
-                "priority": "High"
-            })
+    for cell, b in zip(cells, bounds):
+        lat, lon = (b[0] + b[2]) / 2, (b[1] + b[3]) / 2
+        recommendations.append({
+            "zone": f"{round(lat, 3)}-{round(lon, 3)}",
+            "cell": cell,
+            "recommended_units": ["PCR Van"],
+            "priority": "High"
+        })
 
     return recommendations
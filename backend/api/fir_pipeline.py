@@ -4,6 +4,8 @@ import base64, tempfile
 
 from backend.services.pdf_extraction import extract_text_from_pdf
 from backend.services.fir_extraction import extract_fir_fields
+from backend.services.hashing import sha256_bytes
+from backend.services.ingest_cache import get_ingest_cache
 
 router = APIRouter()
 
@@ -15,6 +17,12 @@ def process_fir(data: FIRPipelineRequest):
 
     pdf_bytes = base64.b64decode(data.pdf_base64)
 
+    # same bytes as an earlier request: reuse its result
+    content_hash = sha256_bytes(pdf_bytes)
+    cached = get_ingest_cache().get_result(content_hash)
+    if cached is not None:
+        return {**cached, "content_hash": content_hash, "cached": True}
+
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
         f.write(pdf_bytes)
         pdf_path = f.name
@@ -23,7 +31,10 @@ def process_fir(data: FIRPipelineRequest):
 
     structured_fir = extract_fir_fields(extracted_text)
 
-    return {
+    result = {
         "extracted_text": extracted_text,
         "structured_fir": structured_fir
     }
+    get_ingest_cache().put_result(content_hash, result)
+
+    return {**result, "content_hash": content_hash, "cached": False}
@@ -1,5 +1,12 @@
-from fastapi import APIRouter
-from backend.rules.hotspot_rules import detect_hotspots
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.fir_store import get_store
+from backend.services.hotspot_engine import EPS_KM_MAX, EPS_KM_MIN
+from backend.rules.hotspot_rules import detect_hotspots, current_hotspots
+from backend.services.geogrid import GEOHASH_PRECISION, tile_counts
+from backend.services.spacetime import SLOT_HOURS, SPACETIME_PRECISION, spacetime_hotspots
 
 router = APIRouter()
 
@@ -7,3 +14,49 @@ router = APIRouter()
 def get_hotspots(crimes: list):
     hotspots = detect_hotspots(crimes)
     return {"hotspots": hotspots}
+
+@router.get("/current")
+def get_current_hotspots(
+    eps_km: float = Query(0.5, ge=EPS_KM_MIN, le=EPS_KM_MAX),
+    min_samples: int = Query(3, ge=1)
+):
+    # served from the FIR store's incremental index, no refit per request
+    try:
+        return {"hotspots": current_hotspots(eps_km, min_samples)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.get("/tiles")
+def get_hotspot_tiles(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    resolution: int = Query(6, ge=1, le=GEOHASH_PRECISION)
+):
+    # FIR counts per geohash cell in the map viewport; coarser resolutions
+    # for zoomed-out views, no raw FIRs leave the server
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="bbox min must not exceed max")
+    return tile_counts(get_store(), (min_lat, min_lon, max_lat, max_lon), resolution)
+
+@router.get("/spacetime")
+def get_spacetime_hotspots(
+    period: str = Query("week", pattern="^(week|day)$"),
+    window_hours: int = Query(SLOT_HOURS, ge=1, le=24),
+    precision: int = Query(SPACETIME_PRECISION, ge=1, le=GEOHASH_PRECISION),
+    min_count: int = Query(3, ge=1),
+    top: int = Query(20, ge=1, le=500),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    crime_type: Optional[str] = None
+):
+    # where and when: busiest time window of each geohash cell
+    rows = get_store().timed_points(
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        crime_type=crime_type
+    )
+    _, lat, lon, crime_types, dates, times = (list(c) for c in zip(*rows)) if rows else ([],) * 6
+    return spacetime_hotspots(lat, lon, dates, times, crime_types, precision,
+                              window_hours, period, min_count, top)
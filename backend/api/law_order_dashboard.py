@@ -1,25 +1,24 @@
 from fastapi import APIRouter
-from collections import Counter
+from typing import Optional
 
-from backend.mock_store import get_all_firs
+from backend.mock_store import get_aggregates, get_pending_count, query_firs
+from backend.rules.priority_rules import resolve_priority
 
 router = APIRouter(prefix="/law-order", tags=["Law Order Dashboard"])
 
+RECENT_WINDOW = 10
+
 
 @router.get("/dashboard")
 def law_order_dashboard():
-    firs = get_all_firs()   # ✅ correct source
-
-    complaint_counts = Counter()
-    pending = 0
+    # counts come from the store's materialized aggregates and the recent
+    # list is an index read, so this does not grow with the number of FIRs
+    complaint_counts = get_aggregates("crime_type")
+    pending = get_pending_count()
     recent = []
 
-    for fir in firs:
+    for fir in query_firs(limit=RECENT_WINDOW, newest_first=True):
         crime = fir.get("crime_type") or "Other"
-        complaint_counts[crime] += 1
-
-        if fir.get("status") == "pending":
-            pending += 1
 
         recent.append({
     "fir_id": fir["fir_id"],
@@ -43,16 +42,16 @@ def law_order_dashboard():
             "pending_complaints": pending,
             "community_uploads": 8
         },
-        "complaint_counts": dict(complaint_counts),
-        "recent_complaints": recent[:10]
+        "complaint_counts": complaint_counts,
+        "priority_counts": get_aggregates("priority"),
+        "department_counts": get_aggregates("department"),
+        "recent_complaints": recent
     }
 
 
-def resolve_priority(crime_type: str):
-    crime_type = crime_type.lower()
-
-    if crime_type in ["murder", "attempt to murder", "rape", "sexual harassment","road accident"]:
-        return "High"
-    if crime_type in ["theft", "assault","cyber crime - online fraud","cheating and fraud"]:
-        return "Medium"
-    return "Low"
+@router.get("/daily-counts")
+def daily_counts(date_from: Optional[str] = None, date_to: Optional[str] = None):
+    """FIRs per occurrence day (YYYY-MM-DD), optionally within a range"""
+    return {
+        "daily_counts": get_aggregates("day", date_from, date_to)
+    }
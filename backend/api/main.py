@@ -19,9 +19,11 @@ from backend.api import (
 )
 from backend.api import fir_pipeline
 from backend.api import pipeline
+from backend.api import spatial
 
 from backend.api.law_order_dashboard import router as law_order_router
 from backend.yolo_detection import model # <--- This imports your model.py
+from backend.yolo_detection import jobs
 
 app = FastAPI(title="SafeCity Backend")
 app.include_router(fir_pipeline.router, prefix="/fir")
@@ -43,12 +45,14 @@ app.add_middleware(
 
 # Keep your existing router include (this handles the POST requests)
 app.include_router(model.router, prefix="/analyze")
+app.include_router(jobs.router, prefix="/analyze")
 
 app.include_router(deployment.router)
 app.include_router(patrolling.router)
 app.include_router(debug.router)
 app.include_router(law_order_router)
 app.include_router(pipeline.router, prefix="/pipeline")
+app.include_router(spatial.router, prefix="/spatial")
 app.include_router(documents.router, prefix="/documents")
 app.include_router(hotspots.router, prefix="/hotspots")
 app.include_router(alerts.router, prefix="/alerts")
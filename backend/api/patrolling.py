@@ -1,21 +1,98 @@
 # backend/api/patrolling.py
-from fastapi import APIRouter
-from backend.mock_store import get_all_firs
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from backend.fir_store import get_store
+from backend.mock_store import query_firs
+from backend.services.gazetteer import get_gazetteer
+from backend.services.hotspot_engine import EPS_KM_MAX, EPS_KM_MIN
+from backend.services.patrol_optimizer import plan_patrols
+from backend.services.pipeline_service import run_store_pipeline
+from backend.services.spacetime import get_slot_profile
 
 router = APIRouter(prefix="/patrolling", tags=["Patrolling"])
 
+# used until the store has FIRs with both a date and a time
+DEFAULT_TIME_SLOT = "18:00 - 22:00"
+
 @router.get("/schedule")
 def patrol_schedule():
-    firs = get_all_firs()
+    firs = query_firs(status="pending", limit=5)
+    # busiest window of each FIR's area over the last year (services/spacetime.py)
+    profile = get_slot_profile(get_store())
 
     schedule = []
     for fir in firs:
-        if fir.get("status") == "pending":
-            schedule.append({
-                "sector": fir.get("location_text"),
-                "time_slot": "18:00 - 22:00",
-                "reason": fir.get("crime_type"),
-                "recommended_unit": "Beat Marshall"
-            })
-
-    return schedule[:5]
+        geo = fir.get("geo") or {}
+        slot = profile.slot_for(geo.get("lat"), geo.get("lon"))
+        schedule.append({
+            "sector": fir.get("location_text"),
+            "time_slot": slot["time_slot"] if slot else DEFAULT_TIME_SLOT,
+            "day": slot["day"] if slot else "Daily",
+            "slot_basis": slot["basis"] if slot else "default",
+            "reason": fir.get("crime_type"),
+            "recommended_unit": "Beat Marshall"
+        })
+
+    return schedule
+
+
+class PatrolStation(BaseModel):
+    name: str
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    units: Optional[int] = Field(None, ge=1)    # overrides the deployment rules
+
+
+class PatrolHotspot(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    crime_count: int = Field(1, ge=1)
+    cluster_id: Optional[int] = None
+    day: Optional[str] = None
+    time_slot: Optional[str] = None
+
+
+class OptimizePatrolsRequest(BaseModel):
+    event: Optional[str] = None
+    stations: Optional[List[PatrolStation]] = None
+    hotspots: Optional[List[PatrolHotspot]] = None
+    eps_km: float = Field(3, ge=EPS_KM_MIN, le=EPS_KM_MAX)
+    min_samples: int = Field(2, ge=1)
+    time_slots: bool = True
+
+
+@router.post("/optimize")
+def optimize_patrols(payload: Optional[OptimizePatrolsRequest] = None):
+    """
+    Body (all optional): {"event": "ganpati", "stations": [{"name", "lat",
+    "lon", "units"?}], "hotspots": [{"lat", "lon", "crime_count", ...}],
+    "eps_km": 3, "min_samples": 2, "time_slots": true}. Without hotspots the
+    stored FIRs are clustered; without stations the gazetteer's police
+    stations are used.
+    """
+    payload = payload or OptimizePatrolsRequest()
+    stations = [s.model_dump(exclude_none=True) for s in payload.stations or []]
+    if not stations:
+        gazetteer = get_gazetteer()
+        stations = gazetteer.places("police_station") if gazetteer else []
+    if not stations:
+        raise HTTPException(status_code=400, detail="no stations given and none in the gazetteer")
+
+    if payload.hotspots is not None:
+        hotspots = [h.model_dump(exclude_none=True) for h in payload.hotspots]
+    else:
+        clusters = run_store_pipeline(
+            eps_km=payload.eps_km, min_samples=payload.min_samples
+        )["hotspot_clusters"]
+        profile = get_slot_profile(get_store()) if payload.time_slots else None
+        hotspots = []
+        for c in clusters:
+            hotspot = {"cluster_id": c["cluster_id"], "crime_count": c["crime_count"], **c["centroid"]}
+            slot = profile.slot_for(hotspot["lat"], hotspot["lon"]) if profile else None
+            if slot:
+                hotspot.update(day=slot["day"], time_slot=slot["time_slot"])
+            hotspots.append(hotspot)
+
+    return plan_patrols(hotspots, stations, payload.event)
@@ -1,5 +1,9 @@
-from fastapi import APIRouter
-from backend.services.pipeline_service import build_crime_points
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.services.hotspot_engine import EPS_KM_MAX, EPS_KM_MIN
+from backend.services.pipeline_service import build_crime_points, run_store_pipeline
 from backend.services.spatial_clustering import detect_hotspots
 
 router = APIRouter()
@@ -42,3 +46,24 @@ def run_pipeline(documents_output: dict):
         "valid_geo_points": valid_geo_points,
         "hotspot_clusters": hotspot_response
     }
+
+
+@router.get("/hotspots")
+def store_pipeline(
+    eps_km: float = Query(3, ge=EPS_KM_MIN, le=EPS_KM_MAX),
+    min_samples: int = Query(2, ge=1),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    crime_type: Optional[str] = None
+):
+    # same clustering as /run, over the FIR store instead of a posted list
+    try:
+        return run_store_pipeline(
+            eps_km=eps_km,
+            min_samples=min_samples,
+            date_from=date_from.isoformat() if date_from else None,
+            date_to=date_to.isoformat() if date_to else None,
+            crime_type=crime_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
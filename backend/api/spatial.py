@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.services.spatial_index import get_spatial_index
+
+router = APIRouter()
+
+
+def _iso(d: Optional[date]) -> Optional[str]:
+    return d.isoformat() if d else None
+
+
+@router.get("/radius")
+def firs_within_radius(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(500, gt=0),
+    crime_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(500, ge=1)
+):
+    firs = get_spatial_index().radius(lat, lon, radius_m, crime_type,
+                                      _iso(date_from), _iso(date_to), limit)
+    return {"count": len(firs), "firs": firs}
+
+
+@router.get("/nearest")
+def nearest_firs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=1000),
+    crime_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    firs = get_spatial_index().nearest(lat, lon, k, crime_type, _iso(date_from), _iso(date_to))
+    return {"count": len(firs), "firs": firs}
+
+
+@router.get("/bbox")
+def firs_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    crime_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(1000, ge=1)
+):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="bbox min must not exceed max")
+    firs = get_spatial_index().bbox(min_lat, min_lon, max_lat, max_lon, crime_type,
+                                    _iso(date_from), _iso(date_to), limit)
+    return {"count": len(firs), "firs": firs}
+
+
+@router.get("/near/{fir_id}")
+def firs_near_fir(
+    fir_id: str,
+    radius_m: float = Query(500, gt=0),
+    days: Optional[int] = Query(None, ge=0),
+    crime_type: Optional[str] = None,
+    limit: int = Query(500, ge=1)
+):
+    # "what else happened within radius_m of this FIR, within days of it"
+    index = get_spatial_index()
+    fir = index.location_of(fir_id)
+    if fir is None:
+        raise HTTPException(status_code=404, detail="FIR not found or not geocoded")
+
+    date_from = date_to = None
+    if days is not None:
+        if not fir["date"]:
+            raise HTTPException(status_code=400, detail="FIR has no date to count days from")
+        day = date.fromisoformat(fir["date"])
+        date_from = (day - timedelta(days=days)).isoformat()
+        date_to = (day + timedelta(days=days)).isoformat()
+
+    firs = index.radius(fir["lat"], fir["lon"], radius_m, crime_type, date_from, date_to, limit + 1)
+    firs = [f for f in firs if f["fir_id"] != fir_id][:limit]
+    return {"fir": fir, "count": len(firs), "firs": firs}
+
+
+@router.get("/stats")
+def spatial_index_stats():
+    return get_spatial_index().stats()
@@ -0,0 +1,121 @@
+# Run from repo root: python -m backend.benchmarks.bench_alert_messages
+#
+# A festival surge of alerts over a few dozen zones against the local stub
+# LLM (STUB_LATENCY per answer): one LLM call per alert, as before, versus
+# AlertMessageService cold, after pregeneration, and with the LLM too slow
+# or down (answers must still come back within the timeout, as templates).
+# Uses the Groq SDK pointed at the stub when it is installed, else the same
+# chat completions request over a plain requests session.
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from backend.dev.stub_llm import StubLLM
+from backend.services.groq_message_service import (
+    SYSTEM_PROMPT,
+    AlertMessageService,
+    risk_bucket
+)
+
+N_ALERTS = 2000
+N_UNCACHED = 20
+STUB_LATENCY = 0.4
+TIMEOUT = 1.0
+ZONES = ["Dadar", "Andheri West", "Bandra West", "Kurla", "Borivali West", "Colaba",
+         "Ghatkopar East", "Malad West", "Chembur", "Girgaon Chowpatty"]
+CRIMES = ["Theft", "Chain Snatching", "Sexual Harassment"]
+EVENTS = [None, "Ganesh Festival"]
+
+
+def generate_fn(stub):
+    try:
+        from groq import Groq
+    except ImportError:
+        session = requests.Session()
+
+        def generate(context):
+            prompt = (f"Area: {context['zone']}\nIncident Type: {context['crime_type']}\n"
+                      f"Risk Level: {risk_bucket(context.get('risk'))}\n"
+                      f"Event Context: {context.get('event') or 'None'}")
+            r = session.post(stub.url, json={"model": "stub", "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]},
+                timeout=10)
+            r.raise_for_status()
+            return r.json()["choices"][0]["message"]["content"].strip()
+        return generate
+
+    client = Groq(api_key="stub", base_url=stub.base_url, timeout=10, max_retries=0)
+
+    def generate(context):
+        return client.chat.completions.create(model="stub", messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Area: {context['zone']}\nIncident Type: {context['crime_type']}"}
+        ]).choices[0].message.content.strip()
+    return generate
+
+
+def surge(rng, n):
+    # a few zones get most of the alerts
+    weights = 1 / np.arange(1, len(ZONES) + 1)
+    zones = rng.choices(ZONES, weights=weights, k=n)
+    return [{"zone": z, "crime_type": rng.choice(CRIMES), "risk": rng.uniform(0.5, 1.0),
+             "event": rng.choice(EVENTS)} for z in zones]
+
+
+def run(service, alerts):
+    def one(context):
+        start = time.perf_counter()
+        _, source = service.get(context)
+        return time.perf_counter() - start, source
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(one, alerts))
+    total = time.perf_counter() - start
+    latency = np.array([r[0] for r in results]) * 1000
+    sources = {s: sum(1 for r in results if r[1] == s) for s in ("groq", "template")}
+    return total, latency, sources
+
+
+def report(name, service, result):
+    total, latency, sources = result
+    stats = service.get_stats()
+    print(f"{name:<16} {total:6.2f} s  p50 {np.percentile(latency, 50):7.2f} ms  "
+          f"p99 {np.percentile(latency, 99):7.1f} ms  max {latency.max():7.1f} ms  "
+          f"hit rate {stats['hit_rate']:.3f}  llm calls {stats['llm_calls']}  {sources}")
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    alerts = surge(rng, N_ALERTS)
+    contexts = {(a["zone"], a["crime_type"], risk_bucket(a["risk"]), a["event"]) for a in alerts}
+    print(f"{N_ALERTS} alerts over {len(contexts)} distinct cache keys")
+
+    with StubLLM(latency=STUB_LATENCY) as stub:
+        generate = generate_fn(stub)
+        start = time.perf_counter()
+        for a in alerts[:N_UNCACHED]:
+            generate(a)
+        per_alert = (time.perf_counter() - start) / N_UNCACHED
+        print(f"{'uncached':<16} {per_alert * 1000:.0f} ms per alert, ~{per_alert * N_ALERTS:.0f} s sequentially")
+
+        cold = AlertMessageService(generate, timeout=TIMEOUT)
+        report("cold cache", cold, run(cold, alerts))
+
+        warm = AlertMessageService(generate, timeout=TIMEOUT)
+        for a in alerts:
+            warm.prefetch(a)
+        warm.wait()
+        warm.stats.update(hits=0, template_hits=0, misses=0, llm_calls=0)
+        report("pregenerated", warm, run(warm, alerts))
+
+    with StubLLM(latency=5 * TIMEOUT) as stub:
+        slow = AlertMessageService(generate_fn(stub), timeout=TIMEOUT)
+        report("llm too slow", slow, run(slow, alerts[:200]))
+
+    with StubLLM(fail_rate=1.0) as stub:
+        down = AlertMessageService(generate_fn(stub), timeout=TIMEOUT)
+        report("llm down", down, run(down, alerts[:200]))
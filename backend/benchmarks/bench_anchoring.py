@@ -0,0 +1,53 @@
+# Run from repo root: python -m backend.benchmarks.bench_anchoring
+import hashlib
+import time
+
+from backend.dev.local_chain import LocalChain
+from backend.services.anchoring import MerkleAnchor
+
+# simulated wait for a receipt, roughly a local Ganache round trip
+BLOCK_TIME = 0.02
+N_PER_TX = 100
+N_BATCHED = 20000
+MAX_BATCH = 1024
+
+
+def item_hashes(n, salt="fir"):
+    return [hashlib.sha256(f"{salt}-{i}".encode()).hexdigest() for i in range(n)]
+
+
+def per_hash(chain, hashes):
+    """What store_fir_hash_on_chain does: one transaction per hash"""
+    start = time.perf_counter()
+    for h in hashes:
+        chain.anchor(h, 1)
+    return len(hashes) / (time.perf_counter() - start)
+
+
+def batched(chain, hashes):
+    anchor = MerkleAnchor(chain.anchor, db_path=":memory:", window=0.05, max_batch=MAX_BATCH,
+                          root_fn=chain.anchored_root)
+    start = time.perf_counter()
+    futures = [anchor.submit(h) for h in hashes]
+    anchor.flush()
+    proofs = [f.result() for f in futures]
+    rate = len(hashes) / (time.perf_counter() - start)
+
+    verified = sum(anchor.verify(h) for h in hashes)
+    on_chain = all(chain.is_anchored(p["root"]) for p in proofs)
+    anchor.close()
+    return rate, verified, on_chain
+
+
+if __name__ == "__main__":
+    before = per_hash(LocalChain(BLOCK_TIME), item_hashes(N_PER_TX))
+
+    chain = LocalChain(BLOCK_TIME)
+    after, verified, on_chain = batched(chain, item_hashes(N_BATCHED))
+
+    print(f"block time: {BLOCK_TIME * 1000:.0f} ms")
+    print(f"one tx per hash: {before:10.1f} hashes/sec")
+    print(f"merkle batches:  {after:10.1f} hashes/sec "
+          f"({len(chain.blocks)} txs for {N_BATCHED} hashes, max batch {MAX_BATCH})")
+    print(f"proofs verified: {verified}/{N_BATCHED}, roots on chain: {on_chain}")
+    print(f"speedup:         {after / before:.1f}x")
@@ -0,0 +1,133 @@
+# Run from repo root: python -m backend.benchmarks.bench_crime_classifier
+#
+# Compares the rule-table classifier with the original chain of `in`
+# checks (kept verbatim below): labels on a synthetic FIR corpus, where the
+# only allowed differences are section numbers the old code found inside
+# longer numbers ("302" in "1302"), then speed with the shipped rules (one
+# `in` check per keyword, as before) and with a 300-keyword table (one
+# trie regex scan).
+import random
+import time
+
+from backend.services.crime_classifier import DEFAULT_RULES, CrimeClassifier, parse_sections
+
+N_ROWS = 50000
+N_EXTRA_KEYWORDS = 300
+
+FILLER = ("the complainant stated that on the night of the incident near the station "
+          "a man on a bike came from behind and ran away towards the market road while "
+          "people gathered and the police control room was informed by a passer by").split()
+KEYWORDS = ["killed", "murder", "iron rod", "attack", "stolen", "wallet", "traffic jam", "congestion",
+            "attacked", "wallets", "murdered"]
+SECTIONS = ["302", "307", "379", "354", "420", "279", "34", "323", "506", "1302", "3079", "4201", "498A",
+            "354A", "376D", "302 r/w 34", "302r/w 34", "307 R/W 34"]
+
+
+def original_resolve_crime_type(extracted, sections, complaint_text):
+    if extracted:
+        return extracted.strip()
+
+    if sections:
+        if "302" in sections:
+            return "Murder"
+        if "307" in sections:
+            return "Attempt to Murder"
+        if "379" in sections:
+            return "Theft"
+        if "354" in sections:
+            return "Sexual Harassment"
+        if "420" in sections:
+            return "Cheating / Fraud"
+        if "279" in sections:
+            return "Road Accident"
+
+    if not complaint_text:
+        return "Unknown"
+
+    text = complaint_text.lower()
+
+    if "killed" in text or "murder" in text:
+        return "Murder"
+    if "iron rod" in text or "attack" in text:
+        return "Attempt to Murder"
+    if "stolen" in text or "wallet" in text:
+        return "Theft"
+    if "traffic jam" in text or "congestion" in text:
+        return "Traffic Obstruction"
+
+    return "Unknown"
+
+
+def corpus(rng, n):
+    rows = []
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(40, 160))]
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            kw = rng.choice(KEYWORDS)
+            words.insert(rng.randrange(len(words) + 1), kw.upper() if rng.random() < 0.2 else kw)
+        text = " ".join(words)
+        sections = rng.choice([None, None, "IPC " + ", ".join(rng.sample(SECTIONS, rng.randint(1, 3)))])
+        extracted = rng.choice([None] * 9 + ["Chain Snatching"])
+        rows.append((extracted, sections, text))
+    return rows
+
+
+def substring_only(sections):
+    """Sections where the old code saw a rule number that is not a section"""
+    parsed = parse_sections(sections or "")
+    # lettered sections (354A) count as their base section
+    parsed = parsed | {s.rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for s in parsed}
+    return any(s in (sections or "") and s not in parsed for _, ss, _ in DEFAULT_RULES for s in ss)
+
+
+def chain_for(rules):
+    """The original approach generalised to any rule table"""
+    def resolve(extracted, sections, complaint_text):
+        if extracted:
+            return extracted.strip()
+        if sections:
+            for label, ss, _ in rules:
+                for s in ss:
+                    if s in sections:
+                        return label
+        if not complaint_text:
+            return "Unknown"
+        text = complaint_text.lower()
+        for label, _, kws in rules:
+            for k in kws:
+                if k in text:
+                    return label
+        return "Unknown"
+    return resolve
+
+
+def timed(fn, rows):
+    start = time.perf_counter()
+    fn(rows)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    rows = corpus(rng, N_ROWS)
+    classifier = CrimeClassifier()
+
+    new = [label for label, _ in classifier.classify_batch(rows)]
+    old = [original_resolve_crime_type(*r) for r in rows]
+    diff = [i for i in range(len(rows)) if new[i] != old[i]]
+    expected = [i for i in diff if substring_only(rows[i][1])]
+    print(f"labels: {len(diff)} differ, {len(expected)} of them section-substring false positives fixed, "
+          f"{len(diff) - len(expected)} unexpected")
+
+    print(f"shipped rules   old: {timed(lambda rs: [original_resolve_crime_type(*r) for r in rs], rows):6.2f} us/FIR"
+          f"   new batch: {timed(classifier.classify_batch, rows):6.2f} us/FIR")
+
+    extra = [(f"Type {i}", [str(1000 + i)], [f"kw{i}{rng.choice(FILLER)}", f"{rng.choice(FILLER)} x{i}"])
+             for i in range(N_EXTRA_KEYWORDS // 2)]
+    big_rules = DEFAULT_RULES[:-1] + extra + DEFAULT_RULES[-1:]
+    big = CrimeClassifier(big_rules)
+    chain = chain_for(big_rules)
+    plain = [(None, None, text) for _, _, text in rows]
+    assert [label for label, _ in big.classify_batch(plain)] == [chain(*r) for r in plain]
+    print(f"{len(big._keyword_rule)} keywords  old: {timed(lambda rs: [chain(*r) for r in rs], plain):6.2f} us/FIR"
+          f"   new batch: {timed(big.classify_batch, plain):6.2f} us/FIR")
@@ -0,0 +1,97 @@
+# Run from repo root: python -m backend.benchmarks.bench_fir_extraction
+import random
+import re
+import time
+
+from backend.services.fir_extraction import extract_fir_fields, extract_fir_fields_batch
+
+N_TEXTS = 5000
+
+CRIMES = ["Theft", "Chain Snatching", "Assault", "Cyber Fraud", "Robbery", "House Break-in"]
+PLACES = ["Borivali West, Mumbai", "Near Dahisar Check Naka", "Andheri (E) station road",
+          "Kandivali Time Square mall", "Location unknown", "Dadar Flower Market"]
+SECTIONS = ["379", "392, 34", "323, 506", "420 r/w 66D IT Act", "454, 380"]
+FILLER = ("The complainant stated that the accused placed the bag near the gate and "
+          "sometimes dated receipts were kept inside. Applicable rules were explained. ")
+# no terminator keyword anywhere: the lazy patterns scan to the end of the text
+PLAIN_FILLER = "The accused ran off with the bag and was not seen again by the complainant. "
+
+
+def original_extract(text):
+    """extract_fir_fields before the single-pass engine"""
+    def find(pattern):
+        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        return match.group(1).strip() if match else None
+
+    structured_data = {
+        "crime_type": find(r"Crime\s*Type:\s*(.*?)(?:IPC|Applicable|Place|Date|Time)"),
+        "location": find(r"(?:Place\s*of\s*Occurrence|Location):\s*(.*?)(?:Date|Time|Complaint)"),
+        "date": find(r"Date\s*(?:&\s*Time\s*of\s*Occurrence)?:\s*(\d{2}/\d{2}/\d{4})"),
+        "time": find(r"Time:\s*([0-9:]+\s*hrs)"),
+        "sections": find(r"(?:IPC\s*Sections?|Applicable\s*Sections?):\s*(.*?)(?:Place|Date|Time|Complaint)")
+    }
+    complaint_match = re.search(r"Complaint:\s*(.*)", text, re.IGNORECASE | re.DOTALL)
+    complaint_text = complaint_match.group(1).strip() if complaint_match else None
+    return structured_data, complaint_text
+
+
+def sparse_text(rng):
+    """Scanned/short FIRs: only a few labels, no date or time"""
+    return (f"Crime Type: {rng.choice(CRIMES)}\n"
+            f"Place of Occurrence: {rng.choice(PLACES)}\n"
+            "Complaint: " + PLAIN_FILLER * rng.randint(1, 60))
+
+
+def synthetic_text(rng):
+    parts = [
+        "FIRST INFORMATION REPORT\nPolice Station: Borivali\n",
+        f"Crime Type: {rng.choice(CRIMES)}\n",
+        f"{rng.choice(['IPC Sections', 'Applicable Section', 'ipc section'])}: {rng.choice(SECTIONS)}\n",
+        f"{rng.choice(['Place of Occurrence', 'Location', 'PLACE OF  OCCURRENCE'])}: {rng.choice(PLACES)}\n",
+        f"{rng.choice(['Date & Time of Occurrence', 'Date'])}: "
+        f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/20{rng.randint(20, 25)}\n",
+        f"Time: {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} hrs\n",
+        "Complaint: " + FILLER * rng.randint(1, 30),
+    ]
+    # drop / shuffle labels so terminators go missing or appear out of order
+    if rng.random() < 0.3:
+        del parts[rng.randrange(1, len(parts))]
+    if rng.random() < 0.2:
+        body = parts[1:]
+        rng.shuffle(body)
+        parts = parts[:1] + body
+    text = "".join(parts)
+    if rng.random() < 0.05:
+        text = text.replace("a", rng.choice(["ä", "ı", "ſ"]), 3)
+    return text
+
+
+def bench(fn, texts):
+    start = time.perf_counter()
+    out = [fn(t) for t in texts]
+    return out, len(texts) / (time.perf_counter() - start)
+
+
+def report(label, texts):
+    before, before_rate = bench(original_extract, texts)
+    after, after_rate = bench(extract_fir_fields, texts)
+
+    start = time.perf_counter()
+    batch = extract_fir_fields_batch(texts)
+    batch_rate = len(texts) / (time.perf_counter() - start)
+
+    mismatches = sum(a != b for a, b in zip(before, after)) + sum(a != b for a, b in zip(before, batch))
+    avg_chars = sum(map(len, texts)) / len(texts)
+
+    print(f"{label}: {len(texts)} texts, {avg_chars:.0f} chars on average")
+    print(f"  mismatches:  {mismatches}")
+    print(f"  original:    {before_rate:10.0f} texts/sec")
+    print(f"  single-pass: {after_rate:10.0f} texts/sec")
+    print(f"  batch:       {batch_rate:10.0f} texts/sec")
+    print(f"  speedup:     {after_rate / before_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    report("typical", [synthetic_text(rng) for _ in range(N_TEXTS)])
+    report("sparse", [sparse_text(rng) for _ in range(N_TEXTS)])
@@ -0,0 +1,67 @@
+# Run from repo root: python -m backend.benchmarks.bench_fir_store [n_firs]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from backend.fir_store import FIRStore
+
+CRIMES = ["Theft", "Murder", "Attempt to Murder", "Cheating / Fraud",
+          "Road Accident", "Sexual Harassment", "Traffic Obstruction"]
+DEPTS = {"Murder": ["law_order", "crime_branch"], "Road Accident": ["traffic"],
+         "Traffic Obstruction": ["traffic"]}
+
+
+def synthetic_firs(n, seed=0):
+    rng = random.Random(seed)
+    for k in range(n):
+        crime = rng.choice(CRIMES)
+        yield {
+            "fir_id": f"FIR-{k:08x}",
+            "source_file": f"fir_{k}.pdf",
+            "raw_text": "Crime Type: " + crime,
+            "complaint_text": "Complainant reported an incident.",
+            "crime_type": crime,
+            "sections": None,
+            "date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+            "time": f"{rng.randint(0, 23):02d}:00 hrs",
+            "location_text": "Borivali West",
+            "geo": {"lat": 18.9 + rng.random() * 0.4, "lon": 72.8 + rng.random() * 0.2,
+                    "display_name": "Mumbai"},
+            "department_tags": DEPTS.get(crime, ["law_order"]),
+            "status": "pending" if rng.random() < 0.3 else "closed",
+        }
+
+
+def timed(label, fn, repeat=5):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    ms = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<34} {ms:10.2f} ms")
+    return out
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = os.path.join(tempfile.mkdtemp(), "firs.db")
+    store = FIRStore(path)
+
+    start = time.perf_counter()
+    store.bulk_load(synthetic_firs(n))
+    print(f"bulk_load {n} FIRs: {time.perf_counter() - start:.1f} s "
+          f"({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    # baseline: what mock_store did on every request
+    firs = list(synthetic_firs(n))
+    timed("list scan: pending count", lambda: sum(1 for f in firs if f["status"] == "pending"), 1)
+    timed("list scan: copy all", lambda: list(firs), 1)
+
+    timed("store: pending count", lambda: store.count(status="pending"))
+    timed("store: first 5 pending", lambda: store.query(status="pending", limit=5))
+    timed("store: count_by crime_type", lambda: store.count_by("crime_type"))
+    timed("store: traffic dept, 10 newest", lambda: store.query(department="traffic", limit=10, newest_first=True))
+    timed("store: date range count (1 month)", lambda: store.count(date_from="2025-03-01", date_to="2025-03-31"))
+    timed("store: bbox 1km x 1km", lambda: store.query(bbox=(19.10, 72.85, 19.109, 72.859)))
@@ -0,0 +1,85 @@
+# Run from repo root: python -m backend.benchmarks.bench_hotspots
+#
+# Checks that HotspotEngine labels equal a full haversine DBSCAN refit
+# (bulk load and one-at-a-time inserts, both modules' parameters), then
+# compares the cost of keeping hotspots current as FIRs arrive.
+import time
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+from backend.services.hotspot_engine import HotspotEngine
+
+PARAMS = [(3, 2), (0.5, 3), (1, 5), (0.2, 2)]   # spatial_clustering, hotspot_rules, ...
+N_CHECKS = 60
+N_POINTS = 20000
+N_ARRIVALS = 200
+
+
+def synthetic_points(rng, n):
+    """Clustered + uniform points over Mumbai (lat, lon degrees)"""
+    centers = rng.uniform([18.9, 72.8], [19.3, 73.0], (12, 2))
+    clustered = centers[rng.integers(0, len(centers), n)] + rng.normal(0, 0.01, (n, 2))
+    noise = rng.uniform([18.9, 72.8], [19.3, 73.0], (n // 3, 2))
+    points = np.vstack([clustered, noise])
+    rng.shuffle(points)
+    return points[:n]
+
+
+def refit(points, eps_km, min_samples):
+    return DBSCAN(eps=eps_km / 6371.0, min_samples=min_samples,
+                  metric="haversine", algorithm="ball_tree").fit(np.radians(points)).labels_
+
+
+def check_equivalence(rng):
+    mismatches = 0
+    for k in range(N_CHECKS):
+        eps_km, min_samples = PARAMS[k % len(PARAMS)]
+        points = synthetic_points(rng, int(rng.integers(2, 1500)))
+        expected = refit(points, eps_km, min_samples)
+
+        bulk = HotspotEngine(eps_km, min_samples)
+        bulk.add(points[:, 0], points[:, 1])
+
+        split = int(rng.integers(1, len(points)))
+        incremental = HotspotEngine(eps_km, min_samples)
+        incremental.add(points[:split, 0], points[:split, 1])
+        for p in points[split:]:
+            incremental.add([p[0]], [p[1]])
+
+        for labels in (bulk.labels(), incremental.labels()):
+            mismatches += not np.array_equal(labels, expected)
+    return mismatches
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"equivalence: {check_equivalence(rng)} mismatches in {2 * N_CHECKS} runs")
+
+    eps_km, min_samples = PARAMS[1]
+    points = synthetic_points(rng, N_POINTS + N_ARRIVALS)
+    base, arrivals = points[:N_POINTS], points[N_POINTS:]
+
+    start = time.perf_counter()
+    for k in range(1, 21):
+        refit(points[:N_POINTS + k], eps_km, min_samples)
+    refit_ms = (time.perf_counter() - start) / 20 * 1000
+
+    engine = HotspotEngine(eps_km, min_samples)
+    start = time.perf_counter()
+    engine.add(base[:, 0], base[:, 1])
+    engine.labels()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for p in arrivals:
+        engine.add([p[0]], [p[1]])
+        engine.labels()
+    update_ms = (time.perf_counter() - start) / N_ARRIVALS * 1000
+
+    assert np.array_equal(engine.labels(), refit(points, eps_km, min_samples))
+    print(f"{N_POINTS} FIRs, eps={eps_km} km, min_samples={min_samples}")
+    print(f"full DBSCAN refit per new FIR:     {refit_ms:8.1f} ms")
+    print(f"engine initial build:              {build_ms:8.1f} ms")
+    print(f"engine add + current clusters:     {update_ms:8.1f} ms")
+    print(f"speedup per arrival:               {refit_ms / update_ms:8.1f}x")
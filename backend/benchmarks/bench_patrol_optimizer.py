@@ -0,0 +1,69 @@
+# Run from repo root: python -m backend.benchmarks.bench_patrol_optimizer
+#
+# Route quality of nearest insertion + 2-opt against exact tours on small
+# instances (brute force), then a city-scale plan: thousands of hotspots,
+# the gazetteer's police stations, an event multiplier and time slots.
+import time
+from itertools import permutations
+
+import numpy as np
+
+from backend.services.gazetteer import get_gazetteer
+from backend.services.patrol_optimizer import (
+    distance_matrix, nearest_insertion, plan_patrols, route_length, two_opt
+)
+
+N_SMALL = 200
+N_HOTSPOTS = 3000
+SLOTS = [("Daily", "18:00 - 22:00"), ("Fri", "20:00 - 00:00"), ("Sat", "22:00 - 02:00")]
+
+
+def exact_length(D):
+    n = len(D)
+    return min(route_length([0, *p, 0], D) for p in permutations(range(1, n)))
+
+
+def check_quality(rng):
+    worst, gaps = 0.0, []
+    for _ in range(N_SMALL):
+        n = int(rng.integers(4, 9))
+        D = distance_matrix(rng.uniform(18.9, 19.3, n), rng.uniform(72.8, 73.0, n))
+        got = route_length(two_opt(nearest_insertion(D), D), D)
+        gap = got / exact_length(D) - 1
+        gaps.append(gap)
+        worst = max(worst, gap)
+    return float(np.mean(gaps)), worst
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    mean_gap, worst_gap = check_quality(rng)
+    print(f"vs exact on {N_SMALL} tours of 4-8 stops: mean gap {mean_gap:.2%}, worst {worst_gap:.2%}")
+
+    stations = get_gazetteer().places("police_station")
+    counts = rng.pareto(1.5, N_HOTSPOTS) * 5 + 2
+    hotspots = [{
+        "cluster_id": i,
+        "lat": float(rng.uniform(18.9, 19.27)),
+        "lon": float(rng.uniform(72.8, 72.98)),
+        "crime_count": int(counts[i]),
+        **dict(zip(("day", "time_slot"), SLOTS[i % len(SLOTS)]))
+    } for i in range(N_HOTSPOTS)]
+
+    start = time.perf_counter()
+    plan = plan_patrols(hotspots, stations, event="election")
+    elapsed = time.perf_counter() - start
+
+    insertion_only = 0.0
+    for route in plan["routes"]:
+        station = next(s for s in stations if s["name"] == route["station"])
+        lat = [station["lat"]] + [p["lat"] for p in route["stops"]]
+        lon = [station["lon"]] + [p["lon"] for p in route["stops"]]
+        D = distance_matrix(lat, lon)
+        insertion_only += route_length(nearest_insertion(D), D)
+    visited = sum(len(r["stops"]) for r in plan["routes"])
+
+    print(f"{N_HOTSPOTS} hotspots, {len(stations)} stations, {plan['units']} units, "
+          f"{len(plan['routes'])} routes: {elapsed:.2f} s")
+    print(f"every hotspot visited once: {visited == N_HOTSPOTS and len({p['cluster_id'] for r in plan['routes'] for p in r['stops']}) == N_HOTSPOTS}")
+    print(f"total distance: nearest insertion {insertion_only:.0f} km, + 2-opt {plan['total_distance_km']:.0f} km")
@@ -0,0 +1,38 @@
+# Run from repo root: python -m backend.benchmarks.bench_reid
+import time
+import numpy as np
+
+from backend.yolo_detection import model
+
+N_CROPS = 256
+
+def make_crops(n, seed=0):
+    rng = np.random.default_rng(seed)
+    crops = []
+    for _ in range(n):
+        h, w = rng.integers(60, 200), rng.integers(30, 100)
+        crops.append(rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+    return crops
+
+def bench(fn, crops):
+    fn(crops[:4])  # warm-up
+    start = time.perf_counter()
+    fn(crops)
+    return len(crops) / (time.perf_counter() - start)
+
+def per_crop(crops):
+    return [model.extract_feat(c) for c in crops]
+
+if __name__ == "__main__":
+    crops = make_crops(N_CROPS)
+
+    before = bench(per_crop, crops)
+    after = bench(model.extract_feats, crops)
+
+    a = np.stack(per_crop(crops[:8]))
+    b = np.stack(model.extract_feats(crops[:8]))
+    print(f"max abs diff (8 crops): {np.abs(a - b).max():.2e}")
+
+    print(f"per-crop: {before:8.1f} crops/sec")
+    print(f"batched:  {after:8.1f} crops/sec (batch={model.REID_BATCH})")
+    print(f"speedup:  {after / before:.2f}x")
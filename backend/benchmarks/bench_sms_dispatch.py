@@ -0,0 +1,63 @@
+# Run from repo root: python -m backend.benchmarks.bench_sms_dispatch
+#
+# Ward-wide alert against the local mock gateway (MOCK_LATENCY per request):
+# one requests.get per number, as /alerts/send-sms did, versus the batched,
+# pooled SMSDispatcher; then the dispatcher again with injected 500s and
+# 429s to check that retries still reach every number exactly once.
+import os
+import tempfile
+import time
+
+import requests
+
+from backend.dev.mock_gateway import MockGateway
+from backend.services.fast2sms_service import SMSDispatcher, send_batch
+
+N_PHONES = 10000
+N_SEQUENTIAL = 200
+MOCK_LATENCY = 0.02
+
+
+def phones(n):
+    return [f"9{i:09d}" for i in range(n)]
+
+
+def dispatcher(url, db_path, **kw):
+    return SMSDispatcher(lambda numbers, message: send_batch(numbers, message, url, "bench"),
+                         db_path=db_path, **kw)
+
+
+if __name__ == "__main__":
+    tmp = tempfile.mkdtemp()
+    message = "Advisory: increased thefts reported near Dadar station. Keep valuables secure."
+
+    with MockGateway(latency=MOCK_LATENCY) as mock:
+        start = time.perf_counter()
+        for p in phones(N_SEQUENTIAL):
+            requests.get(mock.url, params={"authorization": "bench", "route": "q",
+                                           "message": message, "numbers": p}, timeout=10)
+        per_number = (time.perf_counter() - start) / N_SEQUENTIAL
+        print(f"one request per number: {per_number * 1000:.1f} ms/number, "
+              f"~{per_number * N_PHONES:.0f} s for {N_PHONES} numbers")
+
+    with MockGateway(latency=MOCK_LATENCY) as mock:
+        d = dispatcher(mock.url, os.path.join(tmp, "plain.db"), rate=20)
+        start = time.perf_counter()
+        campaign = d.dispatch(phones(N_PHONES) + phones(100), message)
+        queued_ms = (time.perf_counter() - start) * 1000
+        status = d.wait(campaign["campaign_id"])
+        total = time.perf_counter() - start
+        print(f"dispatcher: queued in {queued_ms:.0f} ms, {status['sent']} sent in {total:.2f} s "
+              f"with {mock.requests} gateway requests ({campaign['batches']} batches)")
+        d.close()
+
+    with MockGateway(latency=MOCK_LATENCY, fail_rate=0.2, throttle_rate=0.1, seed=1) as mock:
+        d = dispatcher(mock.url, os.path.join(tmp, "flaky.db"), rate=20, backoff=0.05, batch_size=100)
+        campaign = d.dispatch(phones(N_PHONES), message)
+        status = d.wait(campaign["campaign_id"])
+        attempts = sum(r["attempts"] for r in d.deliveries(campaign["campaign_id"], limit=N_PHONES)) / N_PHONES
+        duplicates = len(mock.delivered) - len(set(mock.delivered))
+        print(f"with 30% failing requests: {status['sent']} sent, {status['failed']} failed, "
+              f"{mock.requests} requests, {attempts:.2f} attempts per number, {duplicates} duplicates")
+        assert sorted(mock.delivered) == phones(N_PHONES) or status["failed"]
+        d.close()
@@ -0,0 +1,89 @@
+# Run from repo root: python -m backend.benchmarks.bench_spacetime
+#
+# Checks the vectorized date/time parsing against datetime on mixed inputs,
+# then runs space x hour-of-week hotspots over a year of synthetic FIRs with
+# a few planted (place, weekday, evening) hotspots and times it, and times
+# the SlotProfile the patrolling endpoints rebuild after every FIR insert
+# (every cell, week and day periods, crime mix included).
+import re
+import time
+from datetime import date
+
+import numpy as np
+
+from backend.services.spacetime import (
+    SLOT_HOURS,
+    SPACETIME_PRECISION,
+    SlotProfile,
+    parse_hours,
+    parse_weekdays,
+    spacetime_hotspots
+)
+
+N_PER_DAY = 1000
+TIME_FORMATS = ["{h:02d}:{m:02d} hrs", "{h:02d}{m:02d} hrs", "{h}:{m:02d} Hrs", "{h} hrs", "{h:02d}.{m:02d}"]
+BAD_TIMES = ["", None, "late night", "25:00 hrs", "12:75 hrs", "123456 hrs"]
+# (lat, lon, weekday, start hour, FIRs per week)
+PLANTED = [(19.0760, 72.8777, 4, 20, 30), (19.1197, 72.8468, 5, 1, 25), (18.9400, 72.8350, 0, 8, 20)]
+CRIME_TYPES = ["Theft", "Chain Snatching", "Sexual Harassment", "Cheating / Fraud", None]
+
+
+def reference_hour(text):
+    if not text:
+        return -1
+    m = re.fullmatch(r"(\d{1,2})(?::|\.)?(\d{2})?", re.sub(r"(?i)\s*hrs?$|\s+", "", text))
+    if not m:
+        return -1
+    h, mi = int(m.group(1)), int(m.group(2) or 0)
+    return h if h < 24 and mi < 60 else -1
+
+
+def check_parsing(rng):
+    times = [TIME_FORMATS[rng.integers(len(TIME_FORMATS))].format(h=int(rng.integers(24)), m=int(rng.integers(60)))
+             for _ in range(20000)] + BAD_TIMES
+    mismatches = int((parse_hours(times) != [reference_hour(t) for t in times]).sum())
+
+    days = [str(np.datetime64("2020-01-01") + int(d)) for d in rng.integers(0, 3000, 20000)] + [None, ""]
+    want = [date.fromisoformat(d).weekday() if d else -1 for d in days]
+    return mismatches + int((parse_weekdays(days) != want).sum())
+
+
+def synthetic_year(rng):
+    n = 365 * N_PER_DAY
+    lat = rng.uniform(18.9, 19.3, n)
+    lon = rng.uniform(72.8, 73.0, n)
+    day = rng.integers(0, 365, n)
+    hour = rng.integers(0, 24, n)
+    for p_lat, p_lon, weekday, start, per_week in PLANTED:
+        k = 52 * per_week
+        lat = np.append(lat, p_lat + rng.normal(0, 0.001, k))
+        lon = np.append(lon, p_lon + rng.normal(0, 0.001, k))
+        # 2024-01-01 was a Monday
+        day = np.append(day, 7 * rng.integers(0, 52, k) + weekday)
+        hour = np.append(hour, (start + rng.integers(0, 3, k)) % 24)
+    dates = (np.datetime64("2024-01-01") + day).astype(str).tolist()
+    times = [f"{h:02d}:{m:02d} hrs" for h, m in zip(hour.tolist(), rng.integers(0, 60, len(hour)).tolist())]
+    return lat, lon, dates, times
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"parsing: {check_parsing(rng)} mismatches")
+
+    lat, lon, dates, times = synthetic_year(rng)
+    crime_types = rng.choice(np.array(CRIME_TYPES, dtype=object), len(lat)).tolist()
+    start = time.perf_counter()
+    result = spacetime_hotspots(lat, lon, dates, times, crime_types, top=5)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(lat)} FIRs over a year, top 5: {elapsed:.2f} s")
+    for h in result["hotspots"][:len(PLANTED) + 1]:
+        print(f"  {h['cell']}  {h['day']} {h['time_slot']}  {h['crimes_in_slot']:5d} in slot"
+              f" / {h['crimes_in_cell']:5d} in cell  lift {h['lift']}")
+
+    # rows as FIRStore.timed_points returns them
+    rows = list(zip(range(len(lat)), lat.tolist(), lon.tolist(), crime_types, dates, times))
+    start = time.perf_counter()
+    profile = SlotProfile(rows, SPACETIME_PRECISION, SLOT_HOURS, min_count=3)
+    elapsed = time.perf_counter() - start
+    print(f"slot profile: {elapsed:.2f} s, {len(profile.week)} weekly and {len(profile.day)} daily cells")
@@ -0,0 +1,127 @@
+# Run from repo root: python -m backend.benchmarks.bench_spatial_index
+#
+# Builds the spatial index over N_FIRS synthetic FIRs (tree + a delta of
+# recent arrivals), checks radius / k-nearest / bbox answers against a brute
+# force haversine scan, then times each query type.
+import time
+
+import numpy as np
+
+from backend.services import spatial_index
+from backend.services.hotspot_engine import haversine_km
+from backend.services.spatial_index import SpatialIndex
+
+N_FIRS = 1_000_000
+N_ARRIVALS = 20_000
+N_CHECKS = 50
+N_TIMED = 500
+CRIME_TYPES = ["Theft", "Assault", "Robbery", "Cyber Crime", "Fraud", None]
+
+
+class ArrayStore:
+    """rows_since() / version() over synthetic rows, like FIRStore"""
+
+    path = None
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, rows):
+        self.rows += rows
+
+    def rows_since(self, seq):
+        return self.rows[seq:]
+
+    def version(self):
+        return len(self.rows)
+
+
+def synthetic_rows(rng, start, n):
+    lat = 18.9 + rng.beta(2, 2, n) * 0.4
+    lon = 72.8 + rng.beta(2, 2, n) * 0.2
+    days = rng.integers(0, 730, n)
+    dates = (np.datetime64("2023-01-01") + days).astype(str)
+    crimes = rng.integers(0, len(CRIME_TYPES), n)
+    return [(start + k + 1, f"F{start + k}", float(lat[k]), float(lon[k]),
+             CRIME_TYPES[crimes[k]], str(dates[k])) for k in range(n)]
+
+
+def brute(rows, lat, lon, crime_type, date_from, date_to):
+    pts = np.array([(r[2], r[3]) for r in rows])
+    dist = haversine_km(lat, lon, pts[:, 0], pts[:, 1])
+    keep = np.ones(len(rows), dtype=bool)
+    if crime_type is not None:
+        keep &= np.array([r[4] == crime_type for r in rows])
+    if date_from is not None:
+        keep &= np.array([r[5] >= date_from for r in rows])
+    if date_to is not None:
+        keep &= np.array([r[5] <= date_to for r in rows])
+    return dist, keep
+
+
+def check(sample, rng):
+    """Brute force is slow: compare on a smaller index, tree + delta"""
+    errors = 0
+    sub = SpatialIndex(ArrayStore(), path=None)
+    sub.store.add(sample[:-N_ARRIVALS])
+    sub.sync()
+    sub.store.add(sample[-N_ARRIVALS:])
+    sub.sync()
+    assert sub.n - sub.m == N_ARRIVALS
+    for _ in range(N_CHECKS):
+        lat, lon = rng.uniform(18.95, 19.25), rng.uniform(72.82, 72.98)
+        crime_type = rng.choice([None, "Theft", "Fraud"])
+        date_from, date_to = rng.choice([(None, None), ("2023-06-01", "2023-07-01")])
+        dist, keep = brute(sample, lat, lon, crime_type, date_from, date_to)
+
+        got = {f["fir_id"] for f in sub.radius(lat, lon, 300, crime_type, date_from, date_to)}
+        want = {sample[i][1] for i in np.flatnonzero(keep & (dist <= 0.3))}
+        errors += got != want
+
+        got = [f["distance_m"] for f in sub.nearest(lat, lon, 10, crime_type, date_from, date_to)]
+        want = np.round(np.sort(dist[keep])[:10] * 1000, 1).tolist()
+        errors += not np.allclose(got, want, atol=0.2)
+
+        box = (lat - 0.005, lon - 0.005, lat + 0.005, lon + 0.005)
+        got = {f["fir_id"] for f in sub.bbox(*box, crime_type, date_from, date_to)}
+        pts = np.array([(r[2], r[3]) for r in sample])
+        inside = ((pts[:, 0] >= box[0]) & (pts[:, 0] <= box[2])
+                  & (pts[:, 1] >= box[1]) & (pts[:, 1] <= box[3]))
+        want = {sample[i][1] for i in np.flatnonzero(keep & inside)}
+        errors += got != want
+    return errors
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(*q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    # arrivals stay in the brute-force delta; queries cover both parts
+    spatial_index.SPATIAL_REBUILD_MIN = 2 * N_ARRIVALS
+    rows = synthetic_rows(rng, 0, N_FIRS)
+    arrivals = synthetic_rows(rng, N_FIRS, N_ARRIVALS)
+
+    store = ArrayStore()
+    index = SpatialIndex(store, path=None)
+    store.add(rows)
+    start = time.perf_counter()
+    index.sync()
+    build_s = time.perf_counter() - start
+    store.add(arrivals)
+    index.sync()
+
+    errors = check(rows[:200_000] + arrivals, rng)
+    print(f"equivalence: {errors} mismatches in {3 * N_CHECKS} queries")
+    print(f"{N_FIRS} FIRs in the tree, {N_ARRIVALS} in the delta; tree build {build_s:.1f} s")
+
+    points = [(rng.uniform(18.95, 19.25), rng.uniform(72.82, 72.98)) for _ in range(N_TIMED)]
+    print(f"radius 500 m:                {timed(lambda a, b: index.radius(a, b, 500), points):7.2f} ms")
+    print(f"radius 500 m, Theft, 30 days:{timed(lambda a, b: index.radius(a, b, 500, 'Theft', '2024-03-01', '2024-03-31'), points):7.2f} ms")
+    print(f"10 nearest:                  {timed(lambda a, b: index.nearest(a, b, 10), points):7.2f} ms")
+    print(f"10 nearest, Theft, 30 days:  {timed(lambda a, b: index.nearest(a, b, 10, 'Theft', '2024-03-01', '2024-03-31'), points):7.2f} ms")
+    print(f"bbox ~1 km:                  {timed(lambda a, b: index.bbox(a, b, a + 0.01, b + 0.01), points):7.2f} ms")
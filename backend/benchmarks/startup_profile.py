@@ -0,0 +1,82 @@
+# Run from repo root: python -m backend.benchmarks.startup_profile
+#
+# Import cost of every router main.py includes, each measured in a fresh
+# interpreter (python -X importtime), plus the whole app. Shows which
+# third-party packages dominate each router's cold start. The router list
+# is read from main.py's include_router calls, so new routers show up.
+import ast
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from importlib.util import find_spec
+
+APP = "backend.api.main"
+BASELINE = "fastapi"     # imported by every router anyway
+TOP_PACKAGES = 3
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def app_routers(app=APP):
+    """Modules behind the app's include_router calls, read from its source
+    so the list follows main.py without importing it"""
+    tree = ast.parse(open(find_spec(app).origin).read())
+    modules = {}   # name bound by "from package import name"
+    objects = {}   # name bound by "from module import router as name"
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                modules[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+                objects[alias.asname or alias.name] = node.module
+
+    routers = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "include_router"):
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Attribute):     # include_router(spatial.router)
+            module = modules[arg.value.id]
+        else:                                  # include_router(law_order_router)
+            module = objects[arg.id]
+        if module not in routers:
+            routers.append(module)
+    return routers
+
+
+def profile(module):
+    """(total ms, {top-level package: ms}, error) for importing module"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {BASELINE}; import {module}"],
+        capture_output=True, text=True
+    )
+    total = 0
+    packages = defaultdict(int)
+    seen_baseline = False
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m[1]), int(m[2]), len(m[3]), m[4]
+        if not seen_baseline:
+            seen_baseline = indent == 1 and name == BASELINE
+            continue
+        packages[name.split(".")[0]] += self_us
+        if indent == 1:
+            total += cumulative_us
+    error = None
+    if proc.returncode:
+        error = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+    return total / 1000, {k: v / 1000 for k, v in packages.items()}, error
+
+
+if __name__ == "__main__":
+    print(f"{'router':40s} {'import ms':>10s}  heaviest packages")
+    for module in app_routers() + [APP]:
+        total, packages, error = profile(module)
+        top = sorted(packages.items(), key=lambda kv: -kv[1])[:TOP_PACKAGES]
+        detail = ", ".join(f"{k} {v:.0f}" for k, v in top)
+        if error:
+            detail += f"  [{error}]"
+        print(f"{module:40s} {total:10.1f}  {detail}")
@@ -0,0 +1,37 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Optional
+
+# Development and test stand-in for the CaseRegistry contract, used with
+# ANCHOR_BACKEND=local and by backend/tests and backend/benchmarks; the
+# API only imports it when that backend is chosen.
+
+
+class LocalChain:
+    """In-process chain stand-in for development, tests and benchmarks.
+    block_time simulates waiting for the receipt of each transaction."""
+
+    def __init__(self, block_time: float = 0.0):
+        self.block_time = block_time
+        self.blocks = []
+        self._by_tx = {}
+        self._lock = threading.Lock()
+
+    def anchor(self, root: str, size: int) -> Dict:
+        if self.block_time:
+            time.sleep(self.block_time)
+        with self._lock:
+            number = len(self.blocks) + 1
+            tx_hash = hashlib.sha256(f"{number}:{root}".encode()).hexdigest()
+            self.blocks.append({"root": root, "size": size, "tx_hash": tx_hash})
+            self._by_tx[tx_hash] = root
+        return {"tx_hash": tx_hash, "block_number": number}
+
+    def anchored_root(self, tx_hash: str) -> Optional[str]:
+        with self._lock:
+            return self._by_tx.get(tx_hash)
+
+    def is_anchored(self, root: str) -> bool:
+        with self._lock:
+            return any(b["root"] == root for b in self.blocks)
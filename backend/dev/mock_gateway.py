@@ -0,0 +1,116 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# Development and test stand-in for the Fast2SMS gateway; never imported by
+# the API. Used by backend/tests and backend/benchmarks, or run on its own
+# with FAST2SMS_URL pointed at it.
+
+
+class MockGateway:
+    """Fast2SMS-compatible bulkV2 endpoint on 127.0.0.1 for development,
+    tests and benchmarks. Accepts GET query parameters (send_sms) and JSON
+    POSTs (send_batch). latency delays every response; fail_rate answers
+    that share of requests with a 500 and throttle_rate with a 429, sent
+    with a Retry-After of retry_after seconds. fail_next() scripts the
+    status of the next requests."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, fail_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self._scripted = []         # statuses for the next requests
+        self.delivered = []         # numbers accepted, in order
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                gateway._handle(self, parse_qs(urlparse(self.path).query))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                body["authorization"] = self.headers.get("authorization")
+                gateway._handle(self, {k: [v] for k, v in body.items()})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/dev/bulkV2"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-sms", daemon=True)
+
+    def _handle(self, handler, params):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            scripted = self._scripted.pop(0) if self._scripted else None
+        numbers = [n for n in (params.get("numbers") or [""])[0].split(",") if n]
+
+        if not (params.get("authorization") or [None])[0]:
+            status, body = 401, {"return": False, "status_code": 412, "message": "Invalid Authentication"}
+        elif scripted is not None:
+            status, body = scripted, {"return": False, "message": f"scripted {scripted}"}
+        elif roll < self.fail_rate:
+            status, body = 500, {"return": False, "message": "Internal error"}
+        elif roll < self.fail_rate + self.throttle_rate:
+            status, body = 429, {"return": False, "message": "Too many requests"}
+        elif not numbers or not (params.get("message") or [""])[0]:
+            status, body = 400, {"return": False, "status_code": 411, "message": "Invalid Numbers"}
+        else:
+            with self._lock:
+                self.delivered.extend(numbers)
+                request_id = f"mock{self.requests}"
+            status, body = 200, {"return": True, "request_id": request_id,
+                                 "message": ["SMS sent successfully."]}
+
+        data = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            handler.send_header("Retry-After", f"{self.retry_after:g}")
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def fail_next(self, status: int, count: int = 1):
+        """Answer the next `count` requests with `status` (e.g. 500, 429, 400)"""
+        with self._lock:
+            self._scripted += [status] * count
+
+    def start(self) -> "MockGateway":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # python -m backend.dev.mock_gateway [port]: run the mock
+    # gateway; start the backend with FAST2SMS_URL set to the printed URL
+    import sys
+    mock = MockGateway(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8099)
+    print(mock.url)
+    mock.server.serve_forever()
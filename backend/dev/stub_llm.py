@@ -0,0 +1,99 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Development and test stand-in for the Groq API; never imported by the
+# API. Used by backend/tests and backend/benchmarks, or run on its own with
+# GROQ_BASE_URL pointed at it.
+
+
+class StubLLM:
+    """OpenAI-compatible chat completions endpoint on 127.0.0.1 (the path
+    the Groq SDK posts to) answering with a fixed-shape advisory built from
+    the prompt. latency delays every answer; fail_rate answers that share
+    of requests with a 503."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, fail_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                stub._handle(self, json.loads(self.rfile.read(length) or b"{}"))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.url = self.base_url + "/openai/v1/chat/completions"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-llm", daemon=True)
+
+    def _handle(self, handler, body):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+            fail = self._random.random() < self.fail_rate
+
+        if not handler.path.endswith("/chat/completions"):
+            status, reply = 404, {"error": {"message": "not found"}}
+        elif fail:
+            status, reply = 503, {"error": {"message": "service unavailable"}}
+        else:
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            fields = dict(line.strip().split(": ", 1) for line in prompt.splitlines() if ": " in line)
+            content = (f"Advisory for {fields.get('Area', 'your area')}: stay alert to "
+                       f"{fields.get('Incident Type', 'incidents').lower()}. Report concerns to 112.")
+            status, reply = 200, {
+                "id": f"stub-{n}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            }
+
+        data = json.dumps(reply).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def start(self) -> "StubLLM":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # python -m backend.dev.stub_llm [port]: run the stub
+    # LLM; start the backend with GROQ_BASE_URL set to the printed URL
+    import sys
+    stub = StubLLM(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8098)
+    print(stub.base_url)
+    stub.server.serve_forever()
@@ -0,0 +1,451 @@
+import json
+import math
+import os
+import secrets
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from backend.rules.priority_rules import resolve_priority
+from backend.services.geogrid import cell_contributions
+
+# SQLite-backed FIR store. mock_store keeps its add_firs/get_all_firs API on
+# top of this; API modules can use query()/count()/count_by() to let the
+# indexes do the filtering instead of scanning every FIR in Python.
+
+DB_PATH = os.getenv(
+    "FIR_DB_PATH",
+    str(Path(__file__).resolve().parent / "data" / "firs.db")
+)
+
+# spatial key: ~1.1 km grid cells (0.01 degree)
+CELL_DEG = 0.01
+# bump when _contributions changes; older databases get fir_counts rebuilt
+AGGREGATES_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS firs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    fir_id TEXT UNIQUE NOT NULL,
+    status TEXT,
+    crime_type TEXT,
+    date_iso TEXT,
+    lat REAL,
+    lon REAL,
+    cell_lat INTEGER,
+    cell_lon INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fir_departments (
+    fir_seq INTEGER NOT NULL,
+    department TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fir_counts (
+    dim TEXT NOT NULL,
+    key TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (dim, key)
+);
+CREATE TABLE IF NOT EXISTS fir_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO fir_meta (key, value) VALUES ('version', 0);
+INSERT OR IGNORE INTO fir_meta (key, value) VALUES ('aggregates', 0);
+CREATE INDEX IF NOT EXISTS idx_firs_status ON firs(status);
+CREATE INDEX IF NOT EXISTS idx_firs_crime_type ON firs(crime_type);
+CREATE INDEX IF NOT EXISTS idx_firs_date ON firs(date_iso);
+CREATE INDEX IF NOT EXISTS idx_firs_cell ON firs(cell_lat, cell_lon);
+CREATE INDEX IF NOT EXISTS idx_fir_departments ON fir_departments(department, fir_seq);
+CREATE INDEX IF NOT EXISTS idx_fir_departments_seq ON fir_departments(fir_seq);
+"""
+
+
+def iso_date(date: Optional[str]) -> Optional[str]:
+    """FIR dates are extracted as dd/mm/yyyy; store them sortable"""
+    if not date:
+        return None
+    try:
+        return datetime.strptime(date.strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def cell_of(lat: float, lon: float):
+    return math.floor(lat / CELL_DEG), math.floor(lon / CELL_DEG)
+
+
+def _contributions(fir: Dict):
+    """(dim, key) pairs a FIR adds to the materialized fir_counts table"""
+    crime = fir.get("crime_type") or "Other"
+    keys = [
+        ("total", "all"),
+        ("crime_type", crime),
+        ("priority", resolve_priority(crime)),
+    ]
+    if fir.get("status"):
+        keys.append(("status", fir["status"]))
+    day = iso_date(fir.get("date"))
+    if day:
+        keys.append(("day", day))
+    keys += [("department", d) for d in fir.get("department_tags") or []]
+    return keys
+
+
+def _batch_contributions(firs: List[Dict]):
+    """_contributions of many FIRs plus their geohash cells (one vectorized
+    encode per batch)"""
+    keys = [k for f in firs for k in _contributions(f)]
+    geo = [f.get("geo") or {} for f in firs]
+    keys += cell_contributions([(g.get("lat"), g.get("lon")) for g in geo])
+    return keys
+
+
+def _where_sql(clauses: List[str]) -> str:
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+
+def _row(fir: Dict):
+    geo = fir.get("geo") or {}
+    lat, lon = geo.get("lat"), geo.get("lon")
+    cell = cell_of(lat, lon) if lat is not None and lon is not None else (None, None)
+    return (
+        fir["fir_id"],
+        fir.get("status"),
+        fir.get("crime_type"),
+        iso_date(fir.get("date")),
+        lat, lon, cell[0], cell[1],
+        json.dumps(fir)
+    )
+
+
+class FIRStore:
+    def __init__(self, path: str = DB_PATH):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO fir_meta (key, value) VALUES ('store_id', ?)",
+                (secrets.randbits(62),)
+            )
+        self._ensure_aggregates()
+
+    # -- writes ---------------------------------------------------------
+
+    def _apply_counts(self, cur, delta: Counter):
+        cur.executemany(
+            "INSERT INTO fir_counts (dim, key, n) VALUES (?, ?, ?) "
+            "ON CONFLICT (dim, key) DO UPDATE SET n = n + excluded.n",
+            [(dim, key, n) for (dim, key), n in delta.items() if n]
+        )
+
+    def _ensure_aggregates(self):
+        # databases created before fir_counts (or one of its dims) existed
+        # get it filled once
+        with self._lock, self._conn:
+            built = self._conn.execute(
+                "SELECT value FROM fir_meta WHERE key = 'aggregates'"
+            ).fetchone()[0]
+            if built < AGGREGATES_VERSION:
+                has_firs = self._conn.execute("SELECT 1 FROM firs LIMIT 1").fetchone()
+                if has_firs:
+                    self._rebuild_aggregates()
+                self._conn.execute(
+                    "UPDATE fir_meta SET value = ? WHERE key = 'aggregates'", (AGGREGATES_VERSION,)
+                )
+
+    def _rebuild_aggregates(self):
+        delta = Counter()
+        cursor = self._conn.execute("SELECT doc FROM firs")
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            delta.update(_batch_contributions([json.loads(doc) for (doc,) in rows]))
+        cur = self._conn.cursor()
+        cur.execute("DELETE FROM fir_counts")
+        self._apply_counts(cur, delta)
+
+    def rebuild_aggregates(self):
+        with self._lock, self._conn:
+            self._rebuild_aggregates()
+
+    def _bump_version(self, cur):
+        cur.execute("UPDATE fir_meta SET value = value + 1 WHERE key = 'version'")
+
+    def _insert(self, cur, firs: List[Dict]):
+        # last one wins if a batch repeats a fir_id
+        firs = list({f["fir_id"]: f for f in firs}.values())
+
+        # re-adding a fir_id replaces it: take the old row out of the counts
+        delta = Counter()
+        ids = [f["fir_id"] for f in firs]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = cur.execute(
+                f"SELECT doc FROM firs WHERE fir_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            delta.subtract(_batch_contributions([json.loads(doc) for (doc,) in rows]))
+        delta.update(_batch_contributions(firs))
+
+        cur.executemany(
+            "DELETE FROM fir_departments WHERE fir_seq = "
+            "(SELECT seq FROM firs WHERE fir_id = ?)",
+            [(f["fir_id"],) for f in firs]
+        )
+        cur.executemany(
+            "INSERT OR REPLACE INTO firs "
+            "(fir_id, status, crime_type, date_iso, lat, lon, cell_lat, cell_lon, doc) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [_row(f) for f in firs]
+        )
+        cur.executemany(
+            "INSERT INTO fir_departments (fir_seq, department) "
+            "SELECT seq, ? FROM firs WHERE fir_id = ?",
+            [(d, f["fir_id"]) for f in firs for d in f.get("department_tags") or []]
+        )
+        self._apply_counts(cur, delta)
+        self._bump_version(cur)
+
+    def add_firs(self, firs: List[Dict]):
+        with self._lock, self._conn:
+            self._insert(self._conn.cursor(), firs)
+
+    def bulk_load(self, firs: Iterable[Dict], batch_size: int = 10000) -> int:
+        """Migration path: load any iterable of FIR dicts in large batches.
+
+        Durability is relaxed for the duration of the load and restored
+        afterwards; a crash mid-load only loses the batch in flight.
+        """
+        loaded = 0
+        batch = []
+        with self._lock:
+            self._conn.execute("PRAGMA synchronous=OFF")
+            try:
+                for fir in firs:
+                    batch.append(fir)
+                    if len(batch) >= batch_size:
+                        with self._conn:
+                            self._insert(self._conn.cursor(), batch)
+                        loaded += len(batch)
+                        batch = []
+                if batch:
+                    with self._conn:
+                        self._insert(self._conn.cursor(), batch)
+                    loaded += len(batch)
+            finally:
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute("ANALYZE")
+        return loaded
+
+    def migrate_json(self, path: str) -> int:
+        """Load a JSON dump: a list of FIRs or the /debug/firs response"""
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("firs", [])
+        return self.bulk_load(data)
+
+    def set_status(self, fir_id: str, status: str) -> Optional[Dict]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT doc FROM firs WHERE fir_id = ?", (fir_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            fir = json.loads(row[0])
+            delta = Counter()
+            if fir.get("status"):
+                delta[("status", fir["status"])] -= 1
+            delta[("status", status)] += 1
+            fir["status"] = status
+            self._conn.execute(
+                "UPDATE firs SET status = ?, doc = ? WHERE fir_id = ?",
+                (status, json.dumps(fir), fir_id)
+            )
+            cur = self._conn.cursor()
+            self._apply_counts(cur, delta)
+            self._bump_version(cur)
+        return fir
+
+    # -- reads ----------------------------------------------------------
+
+    def version(self) -> int:
+        """Bumped by every write, in the same transaction; kept in the
+        database so caches in other processes see changes too"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT value FROM fir_meta WHERE key = 'version'"
+            ).fetchone()[0]
+
+    def store_id(self) -> int:
+        """Drawn when the database is created: a recreated database gets a
+        new one even at the same path, so files derived from it can tell"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT value FROM fir_meta WHERE key = 'store_id'"
+            ).fetchone()[0]
+
+    def _where(self, department=None, **filters):
+        # a department filter walks the (department, fir_seq) index and
+        # joins the FIR rows, which keeps "newest N for a department" cheap
+        source, order = "firs", "firs.seq"
+        clauses, params = self._filters(**filters)
+        if department is not None:
+            source = "fir_departments d JOIN firs ON firs.seq = d.fir_seq"
+            order = "d.fir_seq"
+            clauses.insert(0, "d.department = ?"); params.insert(0, department)
+        return f"{source}{_where_sql(clauses)}", params, order
+
+    def _filters(self, status=None, crime_type=None, date_from=None, date_to=None,
+                 bbox=None, has_geo=None):
+        """Conditions on the firs columns, and their parameters"""
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?"); params.append(status)
+        if crime_type is not None:
+            clauses.append("crime_type = ?"); params.append(crime_type)
+        if date_from is not None:
+            clauses.append("date_iso >= ?"); params.append(date_from)
+        if date_to is not None:
+            clauses.append("date_iso <= ?"); params.append(date_to)
+        if bbox is not None:
+            # (min_lat, min_lon, max_lat, max_lon): cell range hits the
+            # index, the exact comparison trims the edge cells
+            min_lat, min_lon, max_lat, max_lon = bbox
+            lo, hi = cell_of(min_lat, min_lon), cell_of(max_lat, max_lon)
+            clauses.append(
+                "cell_lat BETWEEN ? AND ? AND cell_lon BETWEEN ? AND ? "
+                "AND lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?"
+            )
+            params += [lo[0], hi[0], lo[1], hi[1], min_lat, max_lat, min_lon, max_lon]
+        if has_geo is True:
+            clauses.append("lat IS NOT NULL")
+        elif has_geo is False:
+            clauses.append("lat IS NULL")
+        return clauses, params
+
+    def query(self, limit: Optional[int] = None, offset: int = 0,
+              newest_first: bool = False, **filters) -> List[Dict]:
+        source, params, order = self._where(**filters)
+        sql = f"SELECT doc FROM {source} ORDER BY {order} {'DESC' if newest_first else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count(self, **filters) -> int:
+        source, params, _ = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+    def count_by(self, field: str, **filters) -> Dict[str, int]:
+        """Counts grouped by status, crime_type, date or department"""
+        if field == "department":
+            filters.pop("department", None)
+            clauses, params = self._filters(**filters)
+            sql = (
+                "SELECT d.department, COUNT(*) FROM fir_departments d "
+                f"JOIN firs ON firs.seq = d.fir_seq{_where_sql(clauses)} GROUP BY d.department"
+            )
+        else:
+            column = {"status": "status", "crime_type": "crime_type", "date": "date_iso"}[field]
+            source, params, _ = self._where(**filters)
+            sql = f"SELECT {column}, COUNT(*) FROM {source} GROUP BY {column}"
+        with self._lock:
+            return dict(self._conn.execute(sql, params).fetchall())
+
+    def aggregates(self, dim: str, key_from: Optional[str] = None,
+                   key_to: Optional[str] = None) -> Dict[str, int]:
+        """Materialized counts: dim is total, crime_type, status, priority,
+        department, day (keys are ISO dates, so ranges work) or gh1..gh7
+        (geohash cells; a prefix range selects a region)"""
+        sql = "SELECT key, n FROM fir_counts WHERE dim = ? AND n > 0"
+        params = [dim]
+        if key_from is not None:
+            sql += " AND key >= ?"; params.append(key_from)
+        if key_to is not None:
+            sql += " AND key <= ?"; params.append(key_to)
+        with self._lock:
+            return dict(self._conn.execute(sql + " ORDER BY key", params).fetchall())
+
+    def geo_points(self, **filters) -> List[tuple]:
+        """(fir_id, lat, lon, crime_type) for geocoded FIRs, without the docs"""
+        filters.setdefault("has_geo", True)
+        source, params, order = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT firs.fir_id, lat, lon, crime_type FROM {source} ORDER BY {order}", params
+            ).fetchall()
+
+    def timed_points(self, **filters) -> List[tuple]:
+        """(fir_id, lat, lon, crime_type, date_iso, time) for geocoded FIRs;
+        time is the raw extracted text ("22:30 hrs"), read inside SQLite"""
+        filters.setdefault("has_geo", True)
+        source, params, order = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT firs.fir_id, lat, lon, crime_type, date_iso, json_extract(doc, '$.time') "
+                f"FROM {source} ORDER BY {order}", params
+            ).fetchall()
+
+    def scan(self, batch_size: int = 5000) -> Iterable[List[Dict]]:
+        """Every FIR stored when the scan starts, in batches, oldest first.
+        FIRs re-added during the scan (new seq) are not visited again."""
+        with self._lock:
+            last = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM firs").fetchone()[0]
+        seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, doc FROM firs WHERE seq > ? AND seq <= ? ORDER BY seq LIMIT ?",
+                    (seq, last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            seq = rows[-1][0]
+            yield [json.loads(doc) for _, doc in rows]
+
+    def rows_since(self, seq: int = 0) -> List[tuple]:
+        """(seq, fir_id, lat, lon, crime_type, date_iso) of FIRs stored after
+        seq, oldest first; lets indexes catch up incrementally. A re-added
+        fir_id comes back with a new seq."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, fir_id, lat, lon, crime_type, date_iso FROM firs "
+                "WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+    def get_fir(self, fir_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc FROM firs WHERE fir_id = ?", (fir_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_STORE: Optional[FIRStore] = None
+_STORE_LOCK = Lock()
+
+
+def get_store() -> FIRStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = FIRStore()
+        return _STORE
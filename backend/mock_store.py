@@ -1,20 +1,36 @@
-from typing import List, Dict
-from threading import Lock
+from typing import List, Dict, Optional
 
-_FIRS: List[Dict] = []
-_LOCK = Lock()
+from backend.fir_store import get_store
+
+# FIRs live in the SQLite store (backend/fir_store.py); these helpers keep
+# the original in-memory API so callers do not need to change.
 
 def add_firs(firs: List[Dict]):
-    with _LOCK:
-        _FIRS.extend(firs)
+    get_store().add_firs(firs)
 
 def get_all_firs() -> List[Dict]:
-    with _LOCK:
-        return list(_FIRS)
+    return get_store().query()
 
 def get_pending_count() -> int:
-    with _LOCK:
-        return sum(1 for f in _FIRS if f.get("status") == "pending")
+    return get_store().aggregates("status").get("pending", 0)
+
+def query_firs(limit: Optional[int] = None, newest_first: bool = False, **filters) -> List[Dict]:
+    return get_store().query(limit=limit, newest_first=newest_first, **filters)
+
+def count_firs(**filters) -> int:
+    return get_store().count(**filters)
+
+def get_aggregates(dim: str, key_from: Optional[str] = None, key_to: Optional[str] = None) -> Dict[str, int]:
+    return get_store().aggregates(dim, key_from, key_to)
+
+def get_geo_points(**filters) -> List[tuple]:
+    return get_store().geo_points(**filters)
+
+def get_fir(fir_id: str) -> Optional[Dict]:
+    return get_store().get_fir(fir_id)
+
+def set_fir_status(fir_id: str, status: str) -> Optional[Dict]:
+    return get_store().set_status(fir_id, status)
 
 ALERTS = []
 
@@ -22,4 +38,4 @@ def add_alert(alert: dict):
     ALERTS.insert(0, alert)  # newest first
 
 def get_alerts(limit: int = 10):
-    return ALERTS[:limit]
\ No newline at end of file
+    return ALERTS[:limit]
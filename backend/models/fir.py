@@ -9,6 +9,8 @@ class FIR(BaseModel):
     complaint_text: str
 
     crime_type: Optional[str]
+    # "extracted", "section", "keyword" or "default"; see crime_classifier
+    crime_type_source: Optional[str] = None
     sections: Optional[str]
 
     date: Optional[str]
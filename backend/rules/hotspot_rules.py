@@ -1,29 +1,19 @@
-def detect_hotspots(points, eps_km=0.5, min_samples=3):
-    if not points:
-        return {
-            "valid_geo_points": 0,
-            "hotspot_clusters": {}
-        }
-
-    coords = np.array([[p["lat"], p["lon"]] for p in points])
-    eps = eps_km / 6371.0
-
-    clustering = DBSCAN(
-        eps=eps,
-        min_samples=min_samples,
-        metric="haversine",
-        algorithm="ball_tree"
-    ).fit(np.radians(coords))
+from backend.services.hotspot_engine import cluster_points, get_store_hotspots
 
-    labels = clustering.labels_
-
-    hotspots = {}
-    for label, point in zip(labels, points):
-        if label == -1:
-            continue
-        hotspots.setdefault(label, []).append(point)
+def detect_hotspots(points, eps_km=0.5, min_samples=3):
+    # same labels as a haversine DBSCAN refit (see hotspot_engine.py)
+    return cluster_points(points, eps_km, min_samples)
 
+def current_hotspots(eps_km=0.5, min_samples=3):
+    """Hotspots over every geocoded FIR in the store, updated incrementally"""
+    engine = get_store_hotspots(eps_km, min_samples).sync()
+    clusters = {}
+    for label, ids in engine.clusters().items():
+        clusters[label] = [
+            {"fir_id": fir_id, "lat": lat, "lon": lon, "crime_type": crime_type}
+            for _, fir_id, lat, lon, crime_type, _ in (engine.payloads[i] for i in ids)
+        ]
     return {
-        "valid_geo_points": len(points),
-        "hotspot_clusters": hotspots
+        "valid_geo_points": engine.n,
+        "hotspot_clusters": clusters
     }
@@ -0,0 +1,8 @@
+def resolve_priority(crime_type: str):
+    crime_type = crime_type.lower()
+
+    if crime_type in ["murder", "attempt to murder", "rape", "sexual harassment","road accident"]:
+        return "High"
+    if crime_type in ["theft", "assault","cyber crime - online fraud","cheating and fraud"]:
+        return "Medium"
+    return "Low"
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Batched on-chain anchoring. FIR / evidence hashes are collected for up to
+# ANCHOR_WINDOW_SECONDS or ANCHOR_MAX_BATCH items, a Merkle tree is built
+# over them and only its root is sent on chain (one transaction per batch).
+# Each item's inclusion proof is kept in SQLite so a single FIR can be
+# verified later against the root as the chain has it, read back through
+# the anchoring transaction.
+
+ANCHOR_DB_PATH = os.getenv(
+    "ANCHOR_DB_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "anchors.db")
+)
+ANCHOR_WINDOW_SECONDS = float(os.getenv("ANCHOR_WINDOW_SECONDS", "5"))
+ANCHOR_MAX_BATCH = int(os.getenv("ANCHOR_MAX_BATCH", "1024"))
+# "contract": CaseRegistry via blockchain.py, "local": the in-process
+# development chain in backend/dev/local_chain.py
+ANCHOR_BACKEND = os.getenv("ANCHOR_BACKEND", "contract")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS anchor_batches (
+    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    tx_hash TEXT,
+    block_number INTEGER,
+    anchored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS anchor_items (
+    item_hash TEXT PRIMARY KEY,
+    kind TEXT,
+    batch_id INTEGER NOT NULL,
+    leaf_index INTEGER NOT NULL,
+    proof TEXT NOT NULL
+);
+"""
+
+
+# -- Merkle tree ----------------------------------------------------------
+# leaves and inner nodes are domain-separated; an odd node at the end of a
+# level is carried up unchanged rather than paired with itself
+
+def _h(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def merkle_leaf(item_hash: str) -> bytes:
+    return _h(b"\x00" + item_hash.encode())
+
+
+def merkle_levels(leaves: List[bytes]) -> List[List[bytes]]:
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_h(b"\x01" + level[i] + level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[list]:
+    """[[side, sibling hex], ...] from leaf to root; side is "L" or "R" """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(["L" if sibling < index else "R", level[sibling].hex()])
+        index //= 2
+    return proof
+
+
+def verify_proof(item_hash: str, proof: List[list], root: str) -> bool:
+    node = merkle_leaf(item_hash)
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        node = _h(b"\x01" + sibling + node) if side == "L" else _h(b"\x01" + node + sibling)
+    return node.hex() == root
+
+
+# -- chain backends -------------------------------------------------------
+
+def contract_anchor(root: str, size: int) -> Dict:
+    # imported on first use so the local backend works without web3
+    from backend.services.blockchain import store_merkle_root_on_chain
+    return store_merkle_root_on_chain(root, size)
+
+
+def contract_root(tx_hash: str) -> Optional[str]:
+    from backend.services.blockchain import read_merkle_root_from_chain
+    return read_merkle_root_from_chain(tx_hash)
+
+
+# -- batching service -----------------------------------------------------
+
+class MerkleAnchor:
+    def __init__(self, anchor_fn: Callable[[str, int], Dict] = contract_anchor,
+                 db_path: str = ANCHOR_DB_PATH, window: float = ANCHOR_WINDOW_SECONDS,
+                 max_batch: int = ANCHOR_MAX_BATCH,
+                 root_fn: Optional[Callable[[str], Optional[str]]] = contract_root):
+        """anchor_fn(root, size) sends a root on chain and returns its
+        {"tx_hash", "block_number"}; root_fn(tx_hash) reads the root that
+        transaction anchored back from the chain (None: local check only)"""
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        self.anchor_fn = anchor_fn
+        self.root_fn = root_fn
+        self.window = window
+        self.max_batch = max_batch
+
+        self._pending = {}          # item_hash -> (kind, [futures])
+        self._first_at = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="merkle-anchor", daemon=True)
+        self._worker.start()
+
+    def submit(self, item_hash: str, kind: str = "FIR") -> Future:
+        """Queue a hash; the future resolves to its proof once anchored"""
+        future = Future()
+        known = self.get_proof(item_hash)
+        if known is not None:
+            future.set_result(known)
+            return future
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("anchor service is closed")
+            entry = self._pending.setdefault(item_hash, (kind, []))
+            entry[1].append(future)
+            if self._first_at is None:
+                # first item of a window: wake the worker to start its timer
+                self._first_at = time.monotonic()
+                self._cond.notify()
+            elif len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._closed:
+                if len(self._pending) >= self.max_batch:
+                    break
+                if self._first_at is not None:
+                    remaining = self._first_at + self.window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+            items = list(self._pending.items())[:self.max_batch]
+            for item_hash, _ in items:
+                del self._pending[item_hash]
+            self._first_at = time.monotonic() if self._pending else None
+            return items
+
+    def _run(self):
+        while True:
+            items = self._take_batch()
+            if items:
+                self._anchor(items)
+            with self._cond:
+                if self._closed and not self._pending:
+                    return
+
+    def _anchor(self, items):
+        try:
+            levels = merkle_levels([merkle_leaf(h) for h, _ in items])
+            root = levels[-1][0].hex()
+            receipt = self.anchor_fn(root, len(items))
+
+            proofs = {}
+            with self._db_lock, self._conn:
+                batch_id = self._conn.execute(
+                    "INSERT INTO anchor_batches (root, size, tx_hash, block_number, anchored_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (root, len(items), receipt.get("tx_hash"), receipt.get("block_number"), time.time())
+                ).lastrowid
+                rows = []
+                for i, (item_hash, (kind, _)) in enumerate(items):
+                    proof = merkle_proof(levels, i)
+                    rows.append((item_hash, kind, batch_id, i, json.dumps(proof)))
+                    proofs[item_hash] = {
+                        "item_hash": item_hash,
+                        "kind": kind,
+                        "batch_id": batch_id,
+                        "leaf_index": i,
+                        "proof": proof,
+                        "root": root,
+                        "tx_hash": receipt.get("tx_hash"),
+                        "block_number": receipt.get("block_number")
+                    }
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO anchor_items (item_hash, kind, batch_id, leaf_index, proof) "
+                    "VALUES (?, ?, ?, ?, ?)", rows
+                )
+        except Exception as e:
+            # nothing was recorded; callers may submit the hashes again
+            for _, (_, futures) in items:
+                for f in futures:
+                    f.set_exception(e)
+            return
+
+        for item_hash, (_, futures) in items:
+            for f in futures:
+                f.set_result(proofs[item_hash])
+
+    def flush(self):
+        """Anchor whatever is pending now instead of waiting for the window"""
+        with self._cond:
+            if self._pending:
+                self._first_at = time.monotonic() - self.window
+                self._cond.notify()
+
+    def get_proof(self, item_hash: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT i.kind, i.batch_id, i.leaf_index, i.proof, b.root, b.tx_hash, b.block_number "
+                "FROM anchor_items i JOIN anchor_batches b ON b.batch_id = i.batch_id "
+                "WHERE i.item_hash = ?", (item_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        kind, batch_id, leaf_index, proof, root, tx_hash, block_number = row
+        return {
+            "item_hash": item_hash,
+            "kind": kind,
+            "batch_id": batch_id,
+            "leaf_index": leaf_index,
+            "proof": json.loads(proof),
+            "root": root,
+            "tx_hash": tx_hash,
+            "block_number": block_number
+        }
+
+    def verify(self, item_hash: str) -> bool:
+        """True if the stored proof links the hash to its batch root and
+        that root is the one the chain holds for the batch's transaction
+        (errors reaching the chain are raised, not reported as False)"""
+        entry = self.get_proof(item_hash)
+        if entry is None or not verify_proof(item_hash, entry["proof"], entry["root"]):
+            return False
+        if self.root_fn is None:
+            return True
+        return entry["tx_hash"] is not None and self.root_fn(entry["tx_hash"]) == entry["root"]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        with self._db_lock:
+            self._conn.close()
+
+
+_ANCHOR: Optional[MerkleAnchor] = None
+_ANCHOR_LOCK = threading.Lock()
+_LOCAL_CHAIN = None
+
+
+def get_anchor() -> MerkleAnchor:
+    global _ANCHOR, _LOCAL_CHAIN
+    with _ANCHOR_LOCK:
+        if _ANCHOR is None:
+            anchor_fn, root_fn = contract_anchor, contract_root
+            if ANCHOR_BACKEND == "local":
+                from backend.dev.local_chain import LocalChain
+                _LOCAL_CHAIN = LocalChain()
+                anchor_fn, root_fn = _LOCAL_CHAIN.anchor, _LOCAL_CHAIN.anchored_root
+            _ANCHOR = MerkleAnchor(anchor_fn, root_fn=root_fn)
+        return _ANCHOR
+
+
+def anchor_fir_hash(fir_hash: str) -> Future:
+    return get_anchor().submit(fir_hash, "FIR")
+
+
+def anchor_evidence_hash(file_hash: str, ev_type: str = "DOCUMENT") -> Future:
+    return get_anchor().submit(file_hash, ev_type)
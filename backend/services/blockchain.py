@@ -1,8 +1,17 @@
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from concurrent.futures import Future
 from pathlib import Path
+from threading import Lock, Thread, Event
+from typing import Optional
 import json
 import os
-import hashlib
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.services.hashing import sha256_bytes
 
 
 EVIDENCE_TYPE_MAP = {
@@ -12,69 +21,226 @@ EVIDENCE_TYPE_MAP = {
     "DOCUMENT": 3
 }
 
-GANACHE_URL = "http://127.0.0.1:7545"  
-CONTRACT_ADDRESS = "Your address"
-if not CONTRACT_ADDRESS:
-    raise Exception("CONTRACT_ADDRESS not set in environment")
-
+GANACHE_URL = os.getenv("GANACHE_URL", "http://127.0.0.1:7545")
+CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "Your address")
 
-w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
+BASE_DIR = Path(__file__).resolve().parent
+ABI_PATH = BASE_DIR / "CaseRegistry.json"
 
-if not w3.is_connected():
-    raise Exception("Blockchain not connected. Is Ganache running?")
+# HTTP connections kept open to the node
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "8"))
+RECEIPT_POLL_SECONDS = float(os.getenv("RECEIPT_POLL_SECONDS", "0.2"))
+RECEIPT_TIMEOUT_SECONDS = float(os.getenv("RECEIPT_TIMEOUT_SECONDS", "120"))
+
+# description of the addEvidence calls that anchor a Merkle root
+MERKLE_ROOT_TAG = "merkle-root:"
+
+
+class BlockchainClient:
+    """Connects on first use, not at import. Transactions are sent with
+    locally assigned nonces so several can be in flight; receipts are
+    polled by one background thread and delivered through futures.
+    Pass w3 to use a provider other than HTTP to url (e.g. eth-tester)."""
+
+    def __init__(self, url: str = GANACHE_URL, contract_address: str = CONTRACT_ADDRESS,
+                 abi_path: Path = ABI_PATH, w3: Optional[Web3] = None):
+        self.url = url
+        self.contract_address = contract_address
+        self.abi_path = abi_path
+
+        self._w3 = w3
+        self.w3 = None
+        self.account = None
+        self.contract = None
+        self._connect_lock = Lock()
+
+        self._nonce = None
+        self._nonce_lock = Lock()
+
+        self._pending = {}          # tx hash -> (future, transform, deadline)
+        self._pending_lock = Lock()
+        self._wakeup = Event()
+        self._poller = None
+
+    # -- connection -----------------------------------------------------
+
+    def connect(self):
+        with self._connect_lock:
+            if self.contract is not None:
+                return self
+
+            if not self.contract_address:
+                raise Exception("CONTRACT_ADDRESS not set in environment")
+
+            w3 = self._w3
+            if w3 is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                w3 = Web3(Web3.HTTPProvider(self.url, session=session))
+
+            if not w3.is_connected():
+                raise Exception("Blockchain not connected. Is Ganache running?")
+
+            if not self.abi_path.exists():
+                raise FileNotFoundError(f"ABI file not found at {self.abi_path}")
+
+            with open(self.abi_path, "r") as f:
+                abi = json.load(f)["abi"]
+
+            self.w3 = w3
+            self.account = w3.eth.accounts[0]
+            self.contract = w3.eth.contract(
+                address=Web3.to_checksum_address(self.contract_address),
+                abi=abi
+            )
+        return self
+
+    # -- sending --------------------------------------------------------
+
+    def _next_nonce(self):
+        # caller holds _nonce_lock
+        if self._nonce is None:
+            self._nonce = self.w3.eth.get_transaction_count(self.account, "pending")
+        nonce = self._nonce
+        self._nonce += 1
+        return nonce
+
+    def transact(self, function_name: str, *args, transform=None) -> Future:
+        """Send a contract call; the future resolves to transform(receipt)"""
+        self.connect()
+        fn = getattr(self.contract.functions, function_name)(*args)
+
+        with self._nonce_lock:
+            try:
+                tx_hash = fn.transact({"from": self.account, "nonce": self._next_nonce()})
+            except Exception:
+                # the node may have rejected the nonce: re-read it next time
+                self._nonce = None
+                raise
+
+        future = Future()
+        future.tx_hash = tx_hash.hex()
+        with self._pending_lock:
+            self._pending[tx_hash] = (future, transform, time.monotonic() + RECEIPT_TIMEOUT_SECONDS)
+            if self._poller is None:
+                self._poller = Thread(target=self._poll_receipts, name="receipt-poller", daemon=True)
+                self._poller.start()
+        self._wakeup.set()
+        return future
+
+    def _poll_receipts(self):
+        while True:
+            self._wakeup.wait(RECEIPT_POLL_SECONDS)
+            self._wakeup.clear()
+            with self._pending_lock:
+                pending = list(self._pending.items())
+
+            for tx_hash, (future, transform, deadline) in pending:
+                try:
+                    receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+                except Exception as e:
+                    # not mined yet, or the node / connection hiccupped: the
+                    # transaction is already sent, so keep polling until the
+                    # deadline and only then fail with the last error
+                    if time.monotonic() > deadline:
+                        error = TimeoutError(f"no receipt for {tx_hash.hex()} after {RECEIPT_TIMEOUT_SECONDS}s")
+                        if not isinstance(e, TransactionNotFound):
+                            error.__cause__ = e
+                        self._resolve(tx_hash, exception=error)
+                    continue
+                if receipt.status != 1:
+                    self._resolve(tx_hash, exception=Exception(f"transaction {tx_hash.hex()} reverted"))
+                    continue
+                try:
+                    self._resolve(tx_hash, result=transform(receipt) if transform else receipt)
+                except Exception as e:
+                    self._resolve(tx_hash, exception=e)
+
+    # -- reading --------------------------------------------------------
+
+    def anchored_root(self, tx_hash: str) -> Optional[str]:
+        """The Merkle root an anchoring transaction put on chain, decoded
+        from the mined transaction itself; None unless it succeeded, went
+        to this contract and is an addEvidence merkle-root call"""
+        self.connect()
+        if not tx_hash.startswith("0x"):
+            tx_hash = "0x" + tx_hash
+        try:
+            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            tx = self.w3.eth.get_transaction(tx_hash)
+        except TransactionNotFound:
+            return None
+        if receipt.status != 1 or tx["to"] != self.contract.address:
+            return None
+        fn, params = self.contract.decode_function_input(tx["input"])
+        if fn.abi["name"] != "addEvidence":
+            return None
+        # by position: the ABI's parameter names are the contract's choice
+        file_hash, ev_type, desc = (params[i["name"]] for i in fn.abi["inputs"])
+        if ev_type != EVIDENCE_TYPE_MAP["DOCUMENT"] or not str(desc).startswith(MERKLE_ROOT_TAG):
+            return None
+        return file_hash
+
+    def _resolve(self, tx_hash, result=None, exception=None):
+        with self._pending_lock:
+            future = self._pending.pop(tx_hash)[0]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+def _tx_info(receipt):
+    return {
+        "tx_hash": receipt.transactionHash.hex(),
+        "block_number": receipt.blockNumber
+    }
 
-ACCOUNT = w3.eth.accounts[0] 
 
+_CLIENT = None
+_CLIENT_LOCK = Lock()
 
 
-BASE_DIR = Path(__file__).resolve().parent
-ABI_PATH = BASE_DIR / "CaseRegistry.json"
+def get_client() -> BlockchainClient:
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = BlockchainClient()
+        return _CLIENT
 
-if not ABI_PATH.exists():
-    raise FileNotFoundError(f"ABI file not found at {ABI_PATH}")
 
-with open(ABI_PATH, "r") as f:
-    ABI = json.load(f)["abi"]
+def submit_fir_hash(fir_hash: str, police_station: str, ipc_sections: str) -> Future:
+    """Non-blocking: future of {"tx_hash", "block_number"}"""
+    return get_client().transact("addFIR", fir_hash, police_station, ipc_sections, transform=_tx_info)
 
-contract = w3.eth.contract(
-    address=Web3.to_checksum_address(CONTRACT_ADDRESS),
-    abi=ABI
-)
 
-
-
-def sha256_bytes(data: bytes) -> str:
-    """Create SHA256 hash for files (FIR / evidence)"""
-    return hashlib.sha256(data).hexdigest()
+def submit_evidence_hash(file_hash: str, ev_type: str, desc="") -> Future:
+    """Non-blocking: future of {"tx_hash", "block_number"}"""
+    return get_client().transact("addEvidence", file_hash, EVIDENCE_TYPE_MAP[ev_type], desc,
+                                 transform=_tx_info)
 
 
 def store_fir_hash_on_chain(fir_hash: str, police_station: str, ipc_sections: str):
     """
     Stores FIR hash on blockchain
     """
-    tx = contract.functions.addFIR(
-        fir_hash,
-        police_station,
-        ipc_sections
-    ).transact({
-        "from": ACCOUNT
-    })
+    return submit_fir_hash(fir_hash, police_station, ipc_sections).result()
 
-    receipt = w3.eth.wait_for_transaction_receipt(tx)
 
-    return {
-        "tx_hash": receipt.transactionHash.hex(),
-        "block_number": receipt.blockNumber
-    }
+def store_evidence_hash_on_chain(file_hash: str,ev_type: str, desc=""):
+    return submit_evidence_hash(file_hash, ev_type, desc).result()["tx_hash"]
 
 
-def store_evidence_hash_on_chain(file_hash: str,ev_type: str, desc=""):
-  
-    tx = contract.functions.addEvidence(
-        file_hash,
-        EVIDENCE_TYPE_MAP[ev_type],
-        desc
-    ).transact({"from": ACCOUNT})
-
-    receipt = w3.eth.wait_for_transaction_receipt(tx)
-    return receipt.transactionHash.hex()
+def store_merkle_root_on_chain(root: str, size: int, client: Optional[BlockchainClient] = None):
+    """Anchor the Merkle root of a batch of FIR / evidence hashes
+    (see services/anchoring.py); one transaction for the whole batch"""
+    client = client or get_client()
+    return client.transact("addEvidence", root, EVIDENCE_TYPE_MAP["DOCUMENT"], f"{MERKLE_ROOT_TAG}{size}",
+                           transform=_tx_info).result()
+
+
+def read_merkle_root_from_chain(tx_hash: str, client: Optional[BlockchainClient] = None) -> Optional[str]:
+    """The root store_merkle_root_on_chain anchored in tx_hash, as the chain has it"""
+    return (client or get_client()).anchored_root(tx_hash)
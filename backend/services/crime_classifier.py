@@ -1,33 +1,244 @@
+import json
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Rule-table crime classification.
+#
+# A FIR keeps the crime type printed on it. Otherwise its IPC sections are
+# parsed into a set of section numbers ("302/34" -> {"302", "34"}, so 302
+# no longer matches inside 1302); a lettered section the table does not
+# list (354A) counts as its base section (354). Failing that the complaint
+# text is searched for keywords: with a small table one `in` check per
+# keyword, as before, and past KEYWORD_TRIE_MIN keywords a single scan by
+# one regex compiled from every keyword as a trie, so the cost stops
+# growing with the number of keywords. Earlier rows of the rule table win,
+# exactly as the old chain of `in` checks did.
+#
+# CRIME_RULES_PATH may point to a JSON list of {"crime_type", "sections",
+# "keywords"} rows that replaces the table below; after changing rules,
+# reclassify_store() brings the stored FIRs in line in one pass.
+
+CRIME_RULES_PATH = os.getenv("CRIME_RULES_PATH", "")
+
+# below this many keywords separate `in` checks beat one regex scan
+KEYWORD_TRIE_MIN = int(os.getenv("KEYWORD_TRIE_MIN", "64"))
+SECTION_MEMO_SIZE = 4096
+
+# (crime type, IPC sections, complaint keywords); earlier rows win
+DEFAULT_RULES = [
+    ("Murder", ["302"], ["killed", "murder"]),
+    ("Attempt to Murder", ["307"], ["iron rod", "attack"]),
+    ("Theft", ["379"], ["stolen", "wallet"]),
+    ("Sexual Harassment", ["354"], []),
+    ("Cheating / Fraud", ["420"], []),
+    ("Road Accident", ["279"], []),
+    ("Traffic Obstruction", [], ["traffic jam", "congestion"]),
+]
+UNKNOWN = "Unknown"
+
+# a section number with an optional letter suffix (498A), not part of a
+# word, and not the "r" of "302r/w 34" (read with)
+_SECTION_RE = re.compile(r"(?<!\d)(\d+)(?:(?![rR]/[wW])([A-Za-z])(?![A-Za-z]))?")
+
+
+@lru_cache(maxsize=SECTION_MEMO_SIZE)
+def parse_sections(sections: str) -> FrozenSet[str]:
+    """"IPC 302r/w 34, 498a" -> {"302", "34", "498A"}"""
+    return frozenset(num + suffix.upper() for num, suffix in _SECTION_RE.findall(sections or ""))
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex matching any of the words, shaped as a trie so the engine
+    follows one branch per character; the longest word at a position wins"""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + body + ")?" if len(branches) == 1 else body[:-1] + ")?"
+        return body
+
+    return build(trie)
+
+
+class CrimeClassifier:
+    def __init__(self, rules: List[Tuple[str, List[str], List[str]]] = DEFAULT_RULES):
+        self.rules = [(label, list(sections), [k.lower() for k in keywords])
+                      for label, sections, keywords in rules]
+
+        self._section_rule = {}
+        self._section_memo = {}     # sections string -> rule; the same few strings recur
+        self._keyword_rule = {}
+        for i, (_, sections, keywords) in enumerate(self.rules):
+            for s in sections:
+                self._section_rule.setdefault(s.upper(), i)
+            for k in keywords:
+                self._keyword_rule.setdefault(k, i)
+
+        # a match is the longest keyword at its position; every shorter
+        # keyword that is a prefix of it matched there too
+        self._match_rule = {
+            k: min(r for p, r in self._keyword_rule.items() if k.startswith(p))
+            for k in self._keyword_rule
+        }
+        self._keyword_re = None
+        if len(self._keyword_rule) >= KEYWORD_TRIE_MIN:
+            self._keyword_re = re.compile(_trie_pattern(self._keyword_rule))
+        # (keyword, rule) in table order for the `in` checks
+        self._keyword_order = [(k, i) for i, (_, _, keywords) in enumerate(self.rules) for k in keywords]
+
+    @classmethod
+    def from_json(cls, path: str) -> "CrimeClassifier":
+        with open(path) as f:
+            rows = json.load(f)
+        return cls([(r["crime_type"], r.get("sections") or [], r.get("keywords") or []) for r in rows])
+
+    def _section_match(self, sections: Optional[str]) -> Optional[int]:
+        if not sections:
+            return None
+        try:
+            return self._section_memo[sections]
+        except KeyError:
+            pass
+        hits = []
+        for s in parse_sections(sections):
+            rule = self._section_rule.get(s)
+            if rule is None and s[-1].isalpha():
+                rule = self._section_rule.get(s[:-1])
+            if rule is not None:
+                hits.append(rule)
+        if len(self._section_memo) >= SECTION_MEMO_SIZE:
+            self._section_memo.clear()
+        rule = self._section_memo[sections] = min(hits) if hits else None
+        return rule
+
+    def _keyword_match(self, text: str) -> Optional[int]:
+        if self._keyword_re is None:
+            for k, rule in self._keyword_order:
+                if k in text:
+                    return rule
+            return None
+        best = None
+        search = self._keyword_re.search
+        m = search(text)
+        while m:
+            rule = self._match_rule[m.group()]
+            if best is None or rule < best:
+                best = rule
+                if best == 0:
+                    break
+            # restart one character on: keywords may overlap
+            m = search(text, m.start() + 1)
+        return best
+
+    def classify(self, extracted: Optional[str], sections: Optional[str],
+                 complaint_text: Optional[str]) -> Tuple[str, str]:
+        """(crime type, source); source is extracted, section, keyword or default"""
+        if extracted:
+            return extracted.strip(), "extracted"
+        rule = self._section_match(sections)
+        if rule is not None:
+            return self.rules[rule][0], "section"
+        if complaint_text:
+            rule = self._keyword_match(complaint_text.lower())
+            if rule is not None:
+                return self.rules[rule][0], "keyword"
+        return UNKNOWN, "default"
+
+    def classify_batch(self, rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]]
+                       ) -> List[Tuple[str, str]]:
+        """classify() over (extracted, sections, complaint_text) rows"""
+        rules = self.rules
+        section_match = self._section_match
+        keyword_match = self._keyword_match
+        out = []
+        append = out.append
+        for extracted, sections, complaint_text in rows:
+            if extracted:
+                append((extracted.strip(), "extracted"))
+                continue
+            rule = section_match(sections) if sections else None
+            if rule is not None:
+                append((rules[rule][0], "section"))
+                continue
+            rule = keyword_match(complaint_text.lower()) if complaint_text else None
+            append((rules[rule][0], "keyword") if rule is not None else (UNKNOWN, "default"))
+        return out
+
+
+_CLASSIFIER: Optional[CrimeClassifier] = None
+_CLASSIFIER_LOCK = Lock()
+
+
+def get_classifier() -> CrimeClassifier:
+    global _CLASSIFIER
+    with _CLASSIFIER_LOCK:
+        if _CLASSIFIER is None:
+            _CLASSIFIER = (CrimeClassifier.from_json(CRIME_RULES_PATH)
+                           if CRIME_RULES_PATH else CrimeClassifier())
+        return _CLASSIFIER
+
+
 def resolve_crime_type(extracted, sections, complaint_text):
-    if extracted:
-        return extracted.strip()
-
-    if sections:
-        if "302" in sections:
-            return "Murder"
-        if "307" in sections:
-            return "Attempt to Murder"
-        if "379" in sections:
-            return "Theft"
-        if "354" in sections:
-            return "Sexual Harassment"
-        if "420" in sections:
-            return "Cheating / Fraud"
-        if "279" in sections:
-            return "Road Accident"
-
-    if not complaint_text:
-        return "Unknown"
-
-    text = complaint_text.lower()
-
-    if "killed" in text or "murder" in text:
-        return "Murder"
-    if "iron rod" in text or "attack" in text:
-        return "Attempt to Murder"
-    if "stolen" in text or "wallet" in text:
-        return "Theft"
-    if "traffic jam" in text or "congestion" in text:
-        return "Traffic Obstruction"
-
-    return "Unknown"
+    return get_classifier().classify(extracted, sections, complaint_text)[0]
+
+
+def classify_crimes(rows) -> List[Tuple[str, str]]:
+    return get_classifier().classify_batch(rows)
+
+
+def reclassify_store(store, classifier: Optional[CrimeClassifier] = None,
+                     batch_size: int = 5000) -> Dict:
+    """Re-run the rules over every stored FIR in one pass; FIRs whose crime
+    type changes are re-added with new department tags. Types printed on
+    the FIR itself are left alone."""
+    from backend.services.department_classifier import classify_departments
+    from backend.services.fir_extraction import extract_fir_fields
+
+    classifier = classifier or get_classifier()
+    scanned = changed = updated = 0
+    moves = Counter()
+    for batch in store.scan(batch_size):
+        rows, firs = [], []
+        for fir in batch:
+            source = fir.get("crime_type_source")
+            if source is None:
+                # stored before sources were recorded: the raw text tells
+                # whether the type was printed on the FIR
+                if not fir.get("raw_text"):
+                    continue
+                if extract_fir_fields(fir["raw_text"])[0].get("crime_type"):
+                    continue
+            elif source == "extracted":
+                continue
+            rows.append((None, fir.get("sections"), fir.get("complaint_text")))
+            firs.append(fir)
+
+        updates = []
+        for fir, (label, source) in zip(firs, classifier.classify_batch(rows)):
+            if label != fir.get("crime_type") or source != fir.get("crime_type_source"):
+                if label != fir.get("crime_type"):
+                    moves[f"{fir.get('crime_type')} -> {label}"] += 1
+                    changed += 1
+                updates.append({**fir, "crime_type": label, "crime_type_source": source,
+                                "department_tags": classify_departments(label)})
+        if updates:
+            store.add_firs(updates)
+        scanned += len(batch)
+        updated += len(updates)
+
+    # updated also counts FIRs that only gained a crime_type_source
+    return {"scanned": scanned, "updated": updated, "changed": changed,
+            "changes": dict(moves.most_common())}
@@ -1,15 +1,130 @@
 import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
 import requests
-import urllib.parse
+from requests.adapters import HTTPAdapter
+
+# SMS through Fast2SMS.
+#
+# send_sms() sends one message right away. Ward-wide alerts go through
+# SMSDispatcher: recipients are deduplicated and packed SMS_BATCH_SIZE at a
+# time into the gateway's comma-separated `numbers` field, batches are sent
+# from a small thread pool over one keep-alive connection pool, no faster
+# than SMS_RATE_PER_SECOND requests, and failed requests are retried with
+# exponential backoff. Every recipient's delivery status is kept in SQLite,
+# with the pid of the process sending it while it is queued: several API
+# workers share the database, and a dispatcher starting up only fails the
+# queued rows of processes that are gone.
+#
+# backend/dev/mock_gateway.py is a local stand-in for the gateway; point
+# FAST2SMS_URL at it for development.
 
 FAST2SMS_API_KEY = os.getenv("FAST2SMS_API_KEY")
+FAST2SMS_URL = os.getenv("FAST2SMS_URL", "https://www.fast2sms.com/dev/bulkV2")
+
+SMS_DB_PATH = os.getenv(
+    "SMS_DB_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "sms.db")
+)
+SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", "500"))
+SMS_WORKERS = int(os.getenv("SMS_WORKERS", "4"))
+SMS_RATE_PER_SECOND = float(os.getenv("SMS_RATE_PER_SECOND", "5"))
+SMS_MAX_RETRIES = int(os.getenv("SMS_MAX_RETRIES", "4"))
+SMS_BACKOFF_SECONDS = float(os.getenv("SMS_BACKOFF_SECONDS", "1"))
+SMS_TIMEOUT_SECONDS = float(os.getenv("SMS_TIMEOUT_SECONDS", "10"))
+
+# Fast2SMS is VERY strict
+MAX_MESSAGE_LENGTH = 150
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sms_campaigns (
+    campaign_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL,
+    recipients INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sms_deliveries (
+    campaign_id INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    request_id TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    owner_pid INTEGER,
+    PRIMARY KEY (campaign_id, phone)
+);
+CREATE INDEX IF NOT EXISTS sms_deliveries_status ON sms_deliveries (campaign_id, status);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x100000, False, pid)     # SYNCHRONIZE
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == 0x102     # WAIT_TIMEOUT
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class GatewayError(Exception):
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def normalize_phone(phone) -> Optional[str]:
+    """10-digit Indian mobile number, or None"""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 and digits[0] in "6789" else None
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Shared session; connections to the gateway are kept alive and reused"""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(SMS_WORKERS, 1))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSION = session
+        return _SESSION
+
 
 def send_sms(phone: str, message: str):
     if not FAST2SMS_API_KEY:
         raise Exception("FAST2SMS_API_KEY not set")
 
-    # Fast2SMS is VERY strict
-    message = message[:150]  # enforce limit
+    message = message[:MAX_MESSAGE_LENGTH]  # enforce limit
     phone = str(phone)
 
     params = {
@@ -19,12 +134,280 @@ def send_sms(phone: str, message: str):
         "numbers": phone
     }
 
-    url = "https://www.fast2sms.com/dev/bulkV2"
+    response = get_session().get(FAST2SMS_URL, params=params, timeout=SMS_TIMEOUT_SECONDS)
 
-    response = requests.get(url, params=params, timeout=10)
-    
     # Debug help if it fails again
     if response.status_code != 200:
         raise Exception(f"{response.status_code} {response.text}")
 
     return response.json()
+
+
+def send_batch(numbers: List[str], message: str, url: str = FAST2SMS_URL,
+               api_key: Optional[str] = None) -> Dict:
+    """One gateway request for many numbers; raises GatewayError"""
+    api_key = api_key or FAST2SMS_API_KEY
+    if not api_key:
+        raise GatewayError("FAST2SMS_API_KEY not set")
+    try:
+        response = get_session().post(
+            url,
+            headers={"authorization": api_key},
+            json={"route": "q", "message": message[:MAX_MESSAGE_LENGTH], "numbers": ",".join(numbers)},
+            timeout=SMS_TIMEOUT_SECONDS
+        )
+    except requests.RequestException as e:
+        raise GatewayError(f"{type(e).__name__}: {e}", retryable=True)
+
+    if response.status_code == 429 or response.status_code >= 500:
+        try:
+            retry_after = float(response.headers.get("Retry-After") or 0) or None
+        except ValueError:
+            retry_after = None
+        raise GatewayError(f"{response.status_code} {response.text[:200]}", retryable=True,
+                           retry_after=retry_after)
+    if response.status_code != 200:
+        raise GatewayError(f"{response.status_code} {response.text[:200]}")
+    try:
+        body = response.json()
+    except ValueError:
+        raise GatewayError(f"unreadable gateway response: {response.text[:200]}", retryable=True)
+    if not body.get("return"):
+        raise GatewayError(f"gateway refused: {body.get('message')}")
+    return body
+
+
+class RateLimiter:
+    """At most `rate` acquisitions per second across threads (0: no limit)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SMSDispatcher:
+    def __init__(self, sender=send_batch, db_path: str = SMS_DB_PATH,
+                 batch_size: int = SMS_BATCH_SIZE, workers: int = SMS_WORKERS,
+                 rate: float = SMS_RATE_PER_SECOND, max_retries: int = SMS_MAX_RETRIES,
+                 backoff: float = SMS_BACKOFF_SECONDS):
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sms_deliveries)")}
+        if "owner_pid" not in columns:
+            # databases created before rows had owners
+            self._conn.execute("ALTER TABLE sms_deliveries ADD COLUMN owner_pid INTEGER")
+        self._db_lock = threading.Lock()
+        self._pid = os.getpid()
+
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._limiter = RateLimiter(rate)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sms")
+        self._futures = {}          # campaign_id -> [futures not yet done]
+        self._futures_lock = threading.Lock()
+        self._mark_interrupted()
+
+    def _mark_interrupted(self):
+        """Rows still queued by a process that has exited never got an
+        answer; their batch may or may not have reached the gateway, so
+        they are failed rather than re-sent and retry_failed() can queue
+        them again. Rows of live processes (other API workers, or this
+        one) are theirs to finish."""
+        with self._db_lock, self._conn:
+            owners = [pid for (pid,) in self._conn.execute(
+                "SELECT DISTINCT owner_pid FROM sms_deliveries WHERE status = 'queued'"
+            )]
+            dead = [pid for pid in owners if pid is None or (pid != self._pid and not _pid_alive(pid))]
+            now = time.time()
+            for pid in dead:
+                self._conn.execute(
+                    "UPDATE sms_deliveries SET status = 'failed', error = 'interrupted', updated_at = ? "
+                    "WHERE status = 'queued' AND owner_pid IS ?", (now, pid)
+                )
+
+    def dispatch(self, phones: Iterable, message: str) -> Dict:
+        """Queue a message for every phone and return at once; delivery
+        runs in the background and is tracked through status()"""
+        message = message[:MAX_MESSAGE_LENGTH]
+        valid, invalid = [], []
+        seen = set()
+        for p in phones:
+            number = normalize_phone(p)
+            if number is None:
+                invalid.append(str(p))
+            elif number not in seen:
+                seen.add(number)
+                valid.append(number)
+
+        now = time.time()
+        with self._db_lock, self._conn:
+            campaign_id = self._conn.execute(
+                "INSERT INTO sms_campaigns (message, recipients, created_at) VALUES (?, ?, ?)",
+                (message, len(valid) + len(invalid), now)
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sms_deliveries (campaign_id, phone, status, updated_at, owner_pid) "
+                "VALUES (?, ?, 'queued', ?, ?)", [(campaign_id, p, now, self._pid) for p in valid]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sms_deliveries (campaign_id, phone, status, error, updated_at) "
+                "VALUES (?, ?, 'failed', 'invalid number', ?)", [(campaign_id, p, now) for p in invalid]
+            )
+
+        batches = self._submit(campaign_id, valid, message)
+        return {"campaign_id": campaign_id, "recipients": len(valid),
+                "invalid": len(invalid), "batches": batches}
+
+    def retry_failed(self, campaign_id: int) -> Dict:
+        """Queue the campaign's failed numbers again (not invalid ones)"""
+        with self._db_lock, self._conn:
+            row = self._conn.execute(
+                "SELECT message FROM sms_campaigns WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(campaign_id)
+            phones = [p for (p,) in self._conn.execute(
+                "SELECT phone FROM sms_deliveries WHERE campaign_id = ? AND status = 'failed' "
+                "AND (error IS NULL OR error != 'invalid number')", (campaign_id,)
+            )]
+            self._conn.executemany(
+                "UPDATE sms_deliveries SET status = 'queued', error = NULL, updated_at = ?, owner_pid = ? "
+                "WHERE campaign_id = ? AND phone = ?", [(time.time(), self._pid, campaign_id, p) for p in phones]
+            )
+        return {"campaign_id": campaign_id, "recipients": len(phones),
+                "batches": self._submit(campaign_id, phones, row[0])}
+
+    def _submit(self, campaign_id, phones, message) -> int:
+        futures = [
+            self._executor.submit(self._send, campaign_id, phones[i:i + self.batch_size], message)
+            for i in range(0, len(phones), self.batch_size)
+        ]
+        with self._futures_lock:
+            self._futures.setdefault(campaign_id, []).extend(futures)
+        for f in futures:
+            f.add_done_callback(lambda f, c=campaign_id: self._forget(c, f))
+        return len(futures)
+
+    def _forget(self, campaign_id, future):
+        with self._futures_lock:
+            pending = self._futures.get(campaign_id)
+            if pending is None:
+                return
+            if future in pending:
+                pending.remove(future)
+            if not pending:
+                del self._futures[campaign_id]
+
+    def _send(self, campaign_id, numbers, message):
+        attempts = 0
+        while True:
+            attempts += 1
+            self._limiter.acquire()
+            try:
+                body = self.sender(numbers, message)
+            except GatewayError as e:
+                if e.retryable and attempts <= self.max_retries:
+                    delay = e.retry_after or self.backoff * 2 ** (attempts - 1)
+                    time.sleep(delay * random.uniform(1.0, 1.25))
+                    continue
+                self._record(campaign_id, numbers, "failed", attempts, None, str(e))
+                return
+            except Exception as e:
+                self._record(campaign_id, numbers, "failed", attempts, None, f"{type(e).__name__}: {e}")
+                return
+            self._record(campaign_id, numbers, "sent", attempts, body.get("request_id"), None)
+            return
+
+    def _record(self, campaign_id, numbers, status, attempts, request_id, error):
+        now = time.time()
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "UPDATE sms_deliveries SET status = ?, attempts = attempts + ?, request_id = ?, "
+                "error = ?, updated_at = ? WHERE campaign_id = ? AND phone = ?",
+                [(status, attempts, request_id, error, now, campaign_id, p) for p in numbers]
+            )
+
+    def wait(self, campaign_id: int, timeout: Optional[float] = None) -> Dict:
+        """Block until the campaign's queued batches are done"""
+        with self._futures_lock:
+            futures = list(self._futures.get(campaign_id, []))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for f in futures:
+            f.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.status(campaign_id)
+
+    def status(self, campaign_id: int) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT message, recipients, created_at FROM sms_campaigns WHERE campaign_id = ?",
+                (campaign_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM sms_deliveries WHERE campaign_id = ? GROUP BY status",
+                (campaign_id,)
+            ).fetchall())
+            errors = dict(self._conn.execute(
+                "SELECT error, COUNT(*) FROM sms_deliveries WHERE campaign_id = ? AND status = 'failed' "
+                "GROUP BY error ORDER BY COUNT(*) DESC LIMIT 10", (campaign_id,)
+            ).fetchall())
+        return {
+            "campaign_id": campaign_id,
+            "message": row[0],
+            "recipients": row[1],
+            "created_at": row[2],
+            "queued": counts.get("queued", 0),
+            "sent": counts.get("sent", 0),
+            "failed": counts.get("failed", 0),
+            "done": counts.get("queued", 0) == 0,
+            "errors": errors
+        }
+
+    def deliveries(self, campaign_id: int, status: Optional[str] = None,
+                   limit: int = 1000, offset: int = 0) -> List[Dict]:
+        sql = ("SELECT phone, status, attempts, request_id, error, updated_at "
+               "FROM sms_deliveries WHERE campaign_id = ?")
+        args = [campaign_id]
+        if status:
+            sql += " AND status = ?"
+            args.append(status)
+        sql += " ORDER BY phone LIMIT ? OFFSET ?"
+        args += [limit, offset]
+        with self._db_lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        keys = ("phone", "status", "attempts", "request_id", "error", "updated_at")
+        return [dict(zip(keys, r)) for r in rows]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._db_lock:
+            self._conn.close()
+
+
+_DISPATCHER: Optional[SMSDispatcher] = None
+_DISPATCHER_LOCK = threading.Lock()
+
+
+def get_dispatcher() -> SMSDispatcher:
+    global _DISPATCHER
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is None:
+            _DISPATCHER = SMSDispatcher()
+        return _DISPATCHER
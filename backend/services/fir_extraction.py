@@ -1,33 +1,115 @@
 import re
+from typing import Iterable, List
 
-def extract_fir_fields(text: str):
+# Single-pass extraction: the text is lowercased once and label / terminator
+# keywords are located with plain substring search; each field is then
+# sliced between its label and the next terminator. Results are identical to
+# the per-field regexes below, which are kept as the reference and for the
+# rare texts the fast path cannot handle.
+
+_FLAGS = re.IGNORECASE | re.DOTALL
+
+_CRIME_TYPE_RE = re.compile(r"Crime\s*Type:\s*(.*?)(?:IPC|Applicable|Place|Date|Time)", _FLAGS)
+_LOCATION_RE = re.compile(r"(?:Place\s*of\s*Occurrence|Location):\s*(.*?)(?:Date|Time|Complaint)", _FLAGS)
+_DATE_RE = re.compile(r"Date\s*(?:&\s*Time\s*of\s*Occurrence)?:\s*(\d{2}/\d{2}/\d{4})", _FLAGS)
+_TIME_RE = re.compile(r"Time:\s*([0-9:]+\s*hrs)", _FLAGS)
+_SECTIONS_RE = re.compile(r"(?:IPC\s*Sections?|Applicable\s*Sections?):\s*(.*?)(?:Place|Date|Time|Complaint)", _FLAGS)
+_COMPLAINT_RE = re.compile(r"Complaint:\s*(.*)", _FLAGS)
+
+# label prefixes, matched only where their first keyword occurs
+_LABELS = {
+    "crime": re.compile(r"Crime\s*Type:", re.IGNORECASE),
+    "place": re.compile(r"Place\s*of\s*Occurrence:", re.IGNORECASE),
+    "location": re.compile(r"Location:", re.IGNORECASE),
+    "ipc": re.compile(r"IPC\s*Sections?:", re.IGNORECASE),
+    "applicable": re.compile(r"Applicable\s*Sections?:", re.IGNORECASE),
+    "complaint": re.compile(r"Complaint:", re.IGNORECASE),
+}
+
+_CRIME_TYPE_ENDS = ("ipc", "applicable", "place", "date", "time")
+_LOCATION_ENDS = ("date", "time", "complaint")
+_SECTIONS_ENDS = ("place", "date", "time", "complaint")
+
+# characters re.IGNORECASE folds onto ASCII letters but str.lower() does not
+# (or turns into two characters); texts containing them take the regex path
+_UNSAFE_RE = re.compile("[İıſK]")
+
+
+def _label(text, low, kind):
+    """(start, end) of the first `kind` label, or None"""
+    label = _LABELS[kind]
+    p = low.find(kind)
+    while p != -1:
+        m = label.match(text, p)
+        if m:
+            return p, m.end()
+        p = low.find(kind, p + 1)
+    return None
+
+
+def _label_end(text, low, kinds):
+    """End offset of the earliest label of any of `kinds`, or None"""
+    found = [f for f in (_label(text, low, kind) for kind in kinds) if f]
+    return min(found)[1] if found else None
+
+
+def _next_keyword(low, kinds, start):
+    found = [i for i in (low.find(kind, start) for kind in kinds) if i != -1]
+    return min(found) if found else None
+
+
+def _between(text, low, labels, ends):
+    start = _label_end(text, low, labels)
+    if start is None:
+        return None
+    end = _next_keyword(low, ends, start)
+    return text[start:end].strip() if end is not None else None
+
+
+def _first_match(text, low, kind, pattern):
+    p = low.find(kind)
+    while p != -1:
+        m = pattern.match(text, p)
+        if m:
+            return m.group(1).strip()
+        p = low.find(kind, p + 1)
+    return None
+
+
+def _extract_fir_fields_regex(text: str):
     def find(pattern):
-        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        match = pattern.search(text)
         return match.group(1).strip() if match else None
 
     structured_data = {
-        "crime_type": find(
-            r"Crime\s*Type:\s*(.*?)(?:IPC|Applicable|Place|Date|Time)"
-        ),
-        "location": find(
-            r"(?:Place\s*of\s*Occurrence|Location):\s*(.*?)(?:Date|Time|Complaint)"
-        ),
-        "date": find(
-            r"Date\s*(?:&\s*Time\s*of\s*Occurrence)?:\s*(\d{2}/\d{2}/\d{4})"
-        ),
-        "time": find(
-            r"Time:\s*([0-9:]+\s*hrs)"
-        ),
-        "sections": find(
-            r"(?:IPC\s*Sections?|Applicable\s*Sections?):\s*(.*?)(?:Place|Date|Time|Complaint)"
-        )
+        "crime_type": find(_CRIME_TYPE_RE),
+        "location": find(_LOCATION_RE),
+        "date": find(_DATE_RE),
+        "time": find(_TIME_RE),
+        "sections": find(_SECTIONS_RE)
     }
+    return structured_data, find(_COMPLAINT_RE)
+
 
-    complaint_match = re.search(
-        r"Complaint:\s*(.*)",
-        text,
-        re.IGNORECASE | re.DOTALL
-    )
-    complaint_text = complaint_match.group(1).strip() if complaint_match else None
+def extract_fir_fields(text: str):
+    low = text.lower()
+    if len(low) != len(text) or _UNSAFE_RE.search(text):
+        return _extract_fir_fields_regex(text)
+
+    structured_data = {
+        "crime_type": _between(text, low, ("crime",), _CRIME_TYPE_ENDS),
+        "location": _between(text, low, ("place", "location"), _LOCATION_ENDS),
+        "date": _first_match(text, low, "date", _DATE_RE),
+        "time": _first_match(text, low, "time", _TIME_RE),
+        "sections": _between(text, low, ("ipc", "applicable"), _SECTIONS_ENDS)
+    }
+
+    complaint_start = _label_end(text, low, ("complaint",))
+    complaint_text = text[complaint_start:].strip() if complaint_start is not None else None
 
     return structured_data, complaint_text
+
+
+def extract_fir_fields_batch(texts: Iterable[str]) -> List[tuple]:
+    """extract_fir_fields over many texts, in order"""
+    return [extract_fir_fields(t) for t in texts]
@@ -0,0 +1,232 @@
+import bisect
+import csv
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+
+# Offline geocoder over a local gazetteer (localities, police station areas,
+# roads, landmarks). The CSV is compiled once into a compact .npz next to
+# the other runtime data; later startups load the arrays directly and
+# build the in-memory token index from them.
+
+GAZETTEER_CSV = os.getenv(
+    "GAZETTEER_PATH",
+    str(Path(__file__).resolve().parent / "mumbai_gazetteer.csv")
+)
+GAZETTEER_INDEX = os.getenv(
+    "GAZETTEER_INDEX_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "gazetteer.npz")
+)
+MIN_SCORE = 0.6
+
+# words that never identify a place on their own
+STOPWORDS = {"mumbai", "india", "maharashtra", "near", "opp", "the", "of", "and"}
+
+# words shared by many places ("Mira Road", "Borivali Station"); they count
+# GENERIC_WEIGHT of a distinctive word and never make a match by themselves
+FEATURE_WORDS = {"road", "rd", "marg", "lane", "highway", "street", "st", "gali", "link",
+                 "station", "stn", "chowk", "naka", "junction"}
+GENERIC = FEATURE_WORDS | {"west", "east", "north", "south", "w", "e", "nagar",
+                           "railway", "police", "ps", "main", "cross", "colony"}
+GENERIC_WEIGHT = 0.25
+
+# on ties prefer the area-level entry over a single building or road
+KIND_RANK = {"locality": 0, "police_station": 1, "landmark": 2, "road": 3}
+
+
+def normalize(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", (text or "").lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def tokens(text: str):
+    return [t for t in normalize(text).split() if t not in STOPWORDS]
+
+
+def token_weight(token: str) -> float:
+    return GENERIC_WEIGHT if token in GENERIC else 1.0
+
+
+def _deletes(token: str):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def compile_gazetteer(csv_path: str = GAZETTEER_CSV, out_path: str = GAZETTEER_INDEX):
+    """CSV (name,kind,lat,lon,aliases) -> compact .npz used at startup"""
+    names, kinds, lats, lons = [], [], [], []
+    keys, key_entry = [], []
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(line for line in f if not line.startswith("#"))
+        for row in rows:
+            idx = len(names)
+            names.append(row["name"].strip())
+            kinds.append(KIND_RANK.get(row["kind"].strip(), len(KIND_RANK)))
+            lats.append(float(row["lat"]))
+            lons.append(float(row["lon"]))
+            for key in [row["name"]] + (row.get("aliases") or "").split("|"):
+                if key.strip():
+                    keys.append(normalize(key))
+                    key_entry.append(idx)
+
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        out_path,
+        names=np.array(names),
+        kinds=np.array(kinds, dtype=np.uint8),
+        coords=np.array([lats, lons], dtype=np.float64).T,
+        keys=np.array(keys),
+        key_entry=np.array(key_entry, dtype=np.int32)
+    )
+    return out_path
+
+
+class Gazetteer:
+    def __init__(self, names, kinds, coords, keys, key_entry):
+        self.names = [str(n) for n in names]
+        self.kinds = kinds
+        self.coords = coords
+
+        self.exact = {}
+        self.key_tokens = []                 # per key: its token set
+        self.key_weight = []                 # per key: summed token weights
+        self.key_entry = [int(e) for e in key_entry]
+        postings = defaultdict(set)          # token -> key ids
+        for k, key in enumerate(keys):
+            key = str(key)
+            self.exact.setdefault(key, self.key_entry[k])
+            toks = set(tokens(key))
+            self.key_tokens.append(toks)
+            self.key_weight.append(sum(token_weight(t) for t in toks))
+            for t in toks:
+                postings[t].add(k)
+        self.postings = dict(postings)
+
+        # sorted vocabulary for prefix lookups ("borivali w" -> "west")
+        self.vocab = sorted(self.postings)
+        # single-deletion neighbourhood for edit-distance-1 typo matching
+        self.deletes = defaultdict(set)
+        for t in self.vocab:
+            if len(t) >= 4:
+                for d in _deletes(t):
+                    self.deletes[d].add(t)
+
+    @classmethod
+    def load(cls, csv_path: str = GAZETTEER_CSV, index_path: str = GAZETTEER_INDEX):
+        stale = (
+            not os.path.exists(index_path)
+            or os.path.getmtime(index_path) < os.path.getmtime(csv_path)
+        )
+        if stale:
+            compile_gazetteer(csv_path, index_path)
+        with np.load(index_path) as data:
+            return cls(data["names"], data["kinds"], data["coords"],
+                       data["keys"], data["key_entry"])
+
+    def places(self, kind: str) -> list:
+        """[{"name", "lat", "lon"}] of every entry of a kind, e.g. police_station"""
+        rank = KIND_RANK[kind]
+        return [
+            {"name": self.names[i], "lat": float(self.coords[i][0]), "lon": float(self.coords[i][1])}
+            for i in np.flatnonzero(np.asarray(self.kinds) == rank)
+        ]
+
+    def _candidates(self, token, last):
+        """Vocabulary tokens a query token can stand for, with a weight"""
+        found = []
+        if token in self.postings:
+            found.append((token, 1.0))
+            # a short last token may also abbreviate a word ("andheri e")
+            if not (last and len(token) <= 2):
+                return found
+        elif len(token) >= 4:
+            near = set(self.deletes.get(token, ()))     # query is missing a char
+            for d in _deletes(token):
+                if d in self.postings:                  # query has an extra char
+                    near.add(d)
+                near |= self.deletes.get(d, set())      # one substituted char
+            found += [(t, 0.8) for t in near]
+        if last and (not found or len(token) <= 2):
+            i = bisect.bisect_left(self.vocab, token)
+            while i < len(self.vocab) and self.vocab[i].startswith(token):
+                if self.vocab[i] != token:
+                    found.append((self.vocab[i], 0.7))
+                i += 1
+        return found
+
+    def lookup(self, query: str) -> Optional[dict]:
+        key = normalize(query)
+        if not key:
+            return None
+
+        entry = self.exact.get(key)
+        score = 1.0
+        if entry is None:
+            q_tokens = tokens(key)
+            if not q_tokens:
+                return None
+
+            # key id -> {query token position: (weighted score, token weight)}
+            matched = defaultdict(dict)
+            distinctive = set()              # keys matched on a non-generic word
+            for pos, tok in enumerate(q_tokens):
+                for vocab_tok, w in self._candidates(tok, pos == len(q_tokens) - 1):
+                    weight = token_weight(vocab_tok)
+                    for k in self.postings[vocab_tok]:
+                        if matched[k].get(pos, (0,))[0] < w * weight:
+                            matched[k][pos] = (w * weight, weight)
+                        if weight == 1.0:
+                            distinctive.add(k)
+            if not distinctive:
+                return None
+
+            # an unmatched "road" or "station" means the query names a
+            # feature this key is not, so it weighs fully against recall
+            missing = [1.0 if t in FEATURE_WORDS else token_weight(t) for t in q_tokens]
+
+            best = None
+            for k in distinctive:
+                hits = matched[k]
+                m = sum(score for score, _ in hits.values())
+                precision = m / self.key_weight[k]
+                recall = m / sum(hits[p][1] if p in hits else missing[p] for p in range(len(q_tokens)))
+                f1 = 2 * precision * recall / (precision + recall)
+                e = self.key_entry[k]
+                rank = (f1, -int(self.kinds[e]), -len(self.names[e]))
+                if best is None or rank > best[0]:
+                    best = (rank, e)
+            score, entry = best[0][0], best[1]
+            if score < MIN_SCORE:
+                return None
+
+        lat, lon = self.coords[entry]
+        return {
+            "lat": float(lat),
+            "lon": float(lon),
+            "display_name": f"{self.names[entry]}, Mumbai",
+            "source": "gazetteer",
+            "match_score": round(score, 3)
+        }
+
+
+_GAZETTEER: Optional[Gazetteer] = None
+_GAZETTEER_LOCK = Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Shared instance, or None when no gazetteer file is present"""
+    global _GAZETTEER
+    with _GAZETTEER_LOCK:
+        if _GAZETTEER is None and os.path.exists(GAZETTEER_CSV):
+            _GAZETTEER = Gazetteer.load()
+        return _GAZETTEER
+
+
+if __name__ == "__main__":
+    # python -m backend.services.gazetteer: rebuild the compiled index
+    print(compile_gazetteer())
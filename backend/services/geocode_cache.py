@@ -0,0 +1,134 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+# Two-level cache for geocoding results: an in-process LRU in front of a
+# SQLite table. "Not found" is cached too (as None) with a shorter TTL so a
+# locality Nominatim does not know is not asked for again on every FIR.
+
+CACHE_PATH = os.getenv(
+    "GEOCODE_CACHE_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "geocode.db")
+)
+TTL_SECONDS = float(os.getenv("GEOCODE_TTL_DAYS", "30")) * 86400
+NEGATIVE_TTL_SECONDS = float(os.getenv("GEOCODE_NEGATIVE_TTL_HOURS", "24")) * 3600
+LRU_SIZE = int(os.getenv("GEOCODE_LRU_SIZE", "4096"))
+
+MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    if not query:
+        return ""
+    q = re.sub(r"[^\w\s]", " ", query.lower())
+    return re.sub(r"\s+", " ", q).strip()
+
+
+class GeocodeCache:
+    def __init__(self, path: str = CACHE_PATH, lru_size: int = LRU_SIZE,
+                 ttl: float = TTL_SECONDS, negative_ttl: float = NEGATIVE_TTL_SECONDS):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode_cache ("
+            "key TEXT PRIMARY KEY, result TEXT, expires_at REAL NOT NULL)"
+        )
+        self._lru = OrderedDict()   # key -> (result, expires_at)
+        self._lock = Lock()
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0
+        }
+
+    def _remember(self, key, result, expires_at):
+        self._lru[key] = (result, expires_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, query: str):
+        """Cached result (a dict, or None for "not found"), else MISSING"""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and entry[1] > now:
+                self._lru.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                if entry[0] is None:
+                    self.stats["negative_hits"] += 1
+                return entry[0]
+
+            row = self._conn.execute(
+                "SELECT result, expires_at FROM geocode_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] > now:
+                result = json.loads(row[0]) if row[0] is not None else None
+                self._remember(key, result, row[1])
+                self.stats["disk_hits"] += 1
+                if result is None:
+                    self.stats["negative_hits"] += 1
+                return result
+
+            if entry is not None or row is not None:
+                self.stats["expired"] += 1
+            self._lru.pop(key, None)
+            self.stats["misses"] += 1
+            return MISSING
+
+    def put(self, query: str, result: Optional[dict]):
+        key = normalize_query(query)
+        expires_at = time.time() + (self.ttl if result is not None else self.negative_ttl)
+        payload = json.dumps(result) if result is not None else None
+        with self._lock:
+            self._remember(key, result, expires_at)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (key, result, expires_at) VALUES (?, ?, ?)",
+                    (key, payload, expires_at)
+                )
+
+    def purge_expired(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._lru)
+            stats["disk_entries"] = self._conn.execute(
+                "SELECT COUNT(*) FROM geocode_cache"
+            ).fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_CACHE: Optional[GeocodeCache] = None
+_CACHE_LOCK = Lock()
+
+
+def get_cache() -> GeocodeCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = GeocodeCache()
+        return _CACHE
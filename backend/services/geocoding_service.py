@@ -1,7 +1,25 @@
+import os
 import requests
 import time
+from concurrent.futures import Future
+from threading import Lock
 
-def geocode_location(location: str):
+from backend.services.geocode_cache import get_cache, normalize_query, MISSING
+from backend.services.gazetteer import get_gazetteer
+
+NOMINATIM_INTERVAL = 1.0  # polite rate limiting: at most one request per second
+# offline sites set this to 0 and rely on the local gazetteer only
+NOMINATIM_FALLBACK = os.getenv("GEOCODE_NOMINATIM_FALLBACK", "1") == "1"
+
+_last_request = 0.0
+_rate_lock = Lock()
+# normalized query -> Future of the lookup running for it
+_inflight = {}
+_inflight_lock = Lock()
+
+
+def _nominatim(location: str):
+    global _last_request
     url = "https://nominatim.openstreetmap.org/search"
     params = {
         "q": f"{location}, Mumbai, India",
@@ -12,16 +30,61 @@ def geocode_location(location: str):
         "User-Agent": "NyayaRakshak/1.0"
     }
 
-    response = requests.get(url, params=params, headers=headers, timeout=50)
+    with _rate_lock:
+        wait = _last_request + NOMINATIM_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            response = requests.get(url, params=params, headers=headers, timeout=50)
+        finally:
+            _last_request = time.monotonic()
+
     response.raise_for_status()
     data = response.json()
 
     if not data:
         return None
 
-    time.sleep(1)  # polite rate limiting
     return {
         "lat": float(data[0]["lat"]),
         "lon": float(data[0]["lon"]),
         "display_name": data[0]["display_name"]
     }
+
+
+def geocode_location(location: str):
+    # local gazetteer first; Nominatim only as an optional fallback
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        geo = gazetteer.lookup(location)
+        if geo:
+            return geo
+    if not NOMINATIM_FALLBACK:
+        return None
+
+    # network errors raise and are not cached; "not found" is cached as None.
+    # Concurrent lookups of the same query share one cache read and at most
+    # one Nominatim request; a lookup arriving after it is done hits the cache
+    key = normalize_query(location)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        cache = get_cache()
+        result = cache.get(location)
+        if result is MISSING:
+            result = _nominatim(location)
+            cache.put(location, result)
+        future.set_result(result)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+    return result
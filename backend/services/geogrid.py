@@ -0,0 +1,158 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Hierarchical geohash grid, vectorized with numpy.
+#
+# A cell at precision p is the first p characters of the precision-
+# GEOHASH_PRECISION code, so every FIR is encoded once and all coarser
+# levels are prefixes of it. fir_store materializes per-cell counts for
+# every level in fir_counts (dims "gh1".."gh7"), updated in the same
+# transaction as the FIR rows; tile queries only read those counts.
+#
+#   precision   cell size (approx.)
+#       4       39   x 19.5 km
+#       5       4.9  x 4.9  km
+#       6       1.2  x 0.61 km
+#       7       153  x 153  m
+
+GEOHASH_PRECISION = 7
+_ALPHABET = np.array(list("0123456789bcdefghjkmnpqrstuvwxyz"))
+_CHAR_VALUE = {c: i for i, c in enumerate(_ALPHABET.tolist())}
+# keep the number of key-range scans per tile request small
+MAX_RANGES = 32
+
+
+def _bits(precision: int) -> Tuple[int, int]:
+    """(lat bits, lon bits); longitude takes the first, even-numbered bit"""
+    total = 5 * precision
+    return total // 2, total - total // 2
+
+
+def _cell_index(lat, lon, precision):
+    lat_bits, lon_bits = _bits(precision)
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    lat_i = np.floor((lat + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64)
+    lon_i = np.floor((lon + 180.0) / 360.0 * (1 << lon_bits)).astype(np.int64)
+    return (np.clip(lat_i, 0, (1 << lat_bits) - 1),
+            np.clip(lon_i, 0, (1 << lon_bits) - 1))
+
+
+def _interleave(lat_i, lon_i, precision):
+    lat_bits, lon_bits = _bits(precision)
+    code = np.zeros(len(lat_i), dtype=np.int64)
+    for k in range(5 * precision):
+        if k % 2 == 0:
+            bit = (lon_i >> (lon_bits - 1 - k // 2)) & 1
+        else:
+            bit = (lat_i >> (lat_bits - 1 - k // 2)) & 1
+        code = (code << 1) | bit
+    return code
+
+
+def _to_strings(code, precision):
+    shifts = 5 * np.arange(precision - 1, -1, -1)
+    chars = _ALPHABET[(code[:, None] >> shifts) & 31]
+    return np.ascontiguousarray(chars).view(f"<U{precision}").ravel()
+
+
+def encode(lat, lon, precision: int = GEOHASH_PRECISION) -> np.ndarray:
+    """Geohash strings for arrays of latitudes / longitudes in degrees"""
+    lat = np.atleast_1d(np.asarray(lat, dtype=float))
+    if not len(lat):
+        return np.empty(0, dtype=f"<U{precision}")
+    lat_i, lon_i = _cell_index(lat, lon, precision)
+    return _to_strings(_interleave(lat_i, lon_i, precision), precision)
+
+
+def decode_bounds(cells: List[str]) -> np.ndarray:
+    """(n, 4) array of min_lat, min_lon, max_lat, max_lon; cells of one precision"""
+    if not len(cells):
+        return np.empty((0, 4))
+    precision = len(cells[0])
+    lat_bits, lon_bits = _bits(precision)
+    values = np.array([[_CHAR_VALUE[c] for c in cell] for cell in cells], dtype=np.int64)
+    code = np.zeros(len(cells), dtype=np.int64)
+    for k in range(precision):
+        code = (code << 5) | values[:, k]
+
+    lat_i = np.zeros(len(cells), dtype=np.int64)
+    lon_i = np.zeros(len(cells), dtype=np.int64)
+    for k in range(5 * precision):
+        bit = (code >> (5 * precision - 1 - k)) & 1
+        if k % 2 == 0:
+            lon_i = (lon_i << 1) | bit
+        else:
+            lat_i = (lat_i << 1) | bit
+
+    lat_step = 180.0 / (1 << lat_bits)
+    lon_step = 360.0 / (1 << lon_bits)
+    min_lat = lat_i * lat_step - 90.0
+    min_lon = lon_i * lon_step - 180.0
+    return np.stack([min_lat, min_lon, min_lat + lat_step, min_lon + lon_step], axis=1)
+
+
+def covering(bbox, precision: int) -> List[str]:
+    """Every cell of the given precision that overlaps the bbox
+    (min_lat, min_lon, max_lat, max_lon)"""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    lo_lat, lo_lon = _cell_index([min_lat], [min_lon], precision)
+    hi_lat, hi_lon = _cell_index([max_lat], [max_lon], precision)
+    lat_i, lon_i = np.meshgrid(np.arange(lo_lat[0], hi_lat[0] + 1),
+                               np.arange(lo_lon[0], hi_lon[0] + 1), indexing="ij")
+    return _to_strings(_interleave(lat_i.ravel(), lon_i.ravel(), precision), precision).tolist()
+
+
+def covering_size(bbox, precision: int) -> int:
+    min_lat, min_lon, max_lat, max_lon = bbox
+    lo_lat, lo_lon = _cell_index([min_lat], [min_lon], precision)
+    hi_lat, hi_lon = _cell_index([max_lat], [max_lon], precision)
+    return int((hi_lat[0] - lo_lat[0] + 1) * (hi_lon[0] - lo_lon[0] + 1))
+
+
+def cell_contributions(points) -> List[Tuple[str, str]]:
+    """fir_counts (dim, key) pairs for (lat, lon) points, every level"""
+    points = [p for p in points if p[0] is not None and p[1] is not None]
+    if not points:
+        return []
+    lat, lon = np.array(points, dtype=float).T
+    cells = encode(lat, lon).tolist()
+    return [(f"gh{p}", cell[:p]) for cell in cells for p in range(1, GEOHASH_PRECISION + 1)]
+
+
+def tile_counts(store, bbox, resolution: int) -> Dict:
+    """Per-cell FIR counts at a resolution, for cells overlapping the bbox"""
+    if not 1 <= resolution <= GEOHASH_PRECISION:
+        raise ValueError(f"resolution must be between 1 and {GEOHASH_PRECISION}")
+
+    # scan the materialized counts by key prefix, with prefixes coarse
+    # enough that a city-wide bbox needs only a handful of range reads
+    coarse = resolution
+    while coarse > 1 and covering_size(bbox, coarse) > MAX_RANGES:
+        coarse -= 1
+    counts = {}
+    for prefix in covering(bbox, coarse):
+        counts.update(store.aggregates(f"gh{resolution}", prefix, prefix + "~"))
+
+    cells = list(counts)
+    bounds = decode_bounds(cells)
+    min_lat, min_lon, max_lat, max_lon = bbox
+    inside = ((bounds[:, 0] <= max_lat) & (bounds[:, 2] >= min_lat)
+              & (bounds[:, 1] <= max_lon) & (bounds[:, 3] >= min_lon))
+
+    out = []
+    for i in np.flatnonzero(inside):
+        b = bounds[i]
+        out.append({
+            "cell": cells[i],
+            "count": counts[cells[i]],
+            "center": {"lat": float((b[0] + b[2]) / 2), "lon": float((b[1] + b[3]) / 2)},
+            "bounds": [float(v) for v in b]
+        })
+    return {
+        "resolution": resolution,
+        "bbox": list(bbox),
+        "total": sum(c["count"] for c in out),
+        "cells": out
+    }
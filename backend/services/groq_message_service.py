@@ -1,31 +1,110 @@
 import os
-from groq import Groq
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
 
-def generate_message_with_groq(context: dict) -> str:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise Exception("GROQ_API_KEY not found in environment")
+import numpy as np
 
-    client = Groq(api_key=api_key)
+# Alert message text.
+#
+# Messages are cached per (zone, crime type, risk bucket, event): the prompt
+# only carries the bucket, so one generated message serves every alert in
+# it. A miss asks Groq through one shared client, and concurrent misses
+# for the same key share one call. If no answer arrives within
+# GROQ_TIMEOUT_SECONDS, or Groq fails, the alert goes out with a template
+# message, which is cached for FALLBACK_TTL_SECONDS so later alerts do not
+# wait on a slow or down LLM; a late answer replaces it in the cache.
+#
+# pregenerate_for_hotspots() fills the cache for the current hotspot
+# clusters ahead of a surge. backend/dev/stub_llm.py is a local
+# OpenAI-compatible endpoint; point GROQ_BASE_URL at it for development.
 
-    system_prompt = (
-        "You generate short public safety SMS alerts. "
-        "Tone must be calm, neutral, and advisory. "
-        "Do NOT create panic. "
-        "Maximum 30 words."
-    )
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "3"))
+GROQ_WORKERS = int(os.getenv("GROQ_WORKERS", "8"))
+MESSAGE_CACHE_SIZE = int(os.getenv("MESSAGE_CACHE_SIZE", "2048"))
+MESSAGE_TTL_SECONDS = float(os.getenv("MESSAGE_TTL_HOURS", "6")) * 3600
+FALLBACK_TTL_SECONDS = float(os.getenv("MESSAGE_FALLBACK_TTL_SECONDS", "60"))
+
+# upper edges of the risk buckets; risk >= 0.85 is "critical"
+RISK_EDGES = [0.5, 0.7, 0.85]
+RISK_BUCKETS = ["low", "moderate", "high", "critical"]
+
+MAX_MESSAGE_LENGTH = 150
+
+SYSTEM_PROMPT = (
+    "You generate short public safety SMS alerts. "
+    "Tone must be calm, neutral, and advisory. "
+    "Do NOT create panic. "
+    "Maximum 30 words."
+)
+
+ADVICE = {
+    "low": "Stay alert and report anything suspicious to 112.",
+    "moderate": "Please stay alert, keep valuables secure and report anything suspicious to 112.",
+    "high": "Police patrols are increased. Avoid isolated spots and call 112 if needed.",
+    "critical": "Police presence is increased. Avoid the area if possible and call 112 in an emergency."
+}
+
+
+def risk_bucket(risk) -> str:
+    return RISK_BUCKETS[bisect_right(RISK_EDGES, float(risk or 0))]
+
+
+def context_key(context: Dict) -> Tuple:
+    def norm(v):
+        return " ".join(str(v or "").lower().split())
+    return (norm(context.get("zone")), norm(context.get("crime_type")),
+            risk_bucket(context.get("risk")), norm(context.get("event")))
+
+
+def template_message(context: Dict) -> str:
+    bucket = risk_bucket(context.get("risk"))
+    head = "Alert" if bucket in ("high", "critical") else "Advisory"
+    event = f" during {context['event']}" if context.get("event") else ""
+    text = f"{head}: {context.get('crime_type') or 'Incidents'} reported near {context.get('zone')}{event}. "
+    advice = ADVICE[bucket]
+    if len(text) + len(advice) > MAX_MESSAGE_LENGTH:
+        advice = "Stay alert, call 112 if needed."
+    return (text + advice)[:MAX_MESSAGE_LENGTH]
 
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_groq_client():
+    """One Groq client (and its connection pool) for the whole process"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            api_key = os.getenv("GROQ_API_KEY")
+            if not api_key:
+                raise Exception("GROQ_API_KEY not found in environment")
+            # imported on first use so templates work without the SDK
+            from groq import Groq
+            kwargs = {"base_url": GROQ_BASE_URL} if GROQ_BASE_URL else {}
+            _CLIENT = Groq(api_key=api_key, timeout=GROQ_TIMEOUT_SECONDS, max_retries=0, **kwargs)
+        return _CLIENT
+
+
+def generate_message_with_groq(context: dict) -> str:
+    """One uncached LLM call"""
     user_prompt = f"""
     Area: {context['zone']}
     Incident Type: {context['crime_type']}
-    Risk Level: {context['risk']}
-    Event Context: {context.get('event', 'None')}
+    Risk Level: {risk_bucket(context.get('risk'))}
+    Event Context: {context.get('event') or 'None'}
     """
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
+    response = get_groq_client().chat.completions.create(
+        model=GROQ_MODEL,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ],
         temperature=0.4,
@@ -33,3 +112,211 @@ def generate_message_with_groq(context: dict) -> str:
     )
 
     return response.choices[0].message.content.strip()
+
+
+class AlertMessageService:
+    def __init__(self, generate_fn: Callable[[Dict], str] = generate_message_with_groq,
+                 cache_size: int = MESSAGE_CACHE_SIZE, ttl: float = MESSAGE_TTL_SECONDS,
+                 fallback_ttl: float = FALLBACK_TTL_SECONDS, timeout: float = GROQ_TIMEOUT_SECONDS,
+                 workers: int = GROQ_WORKERS):
+        self.generate_fn = generate_fn
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.fallback_ttl = fallback_ttl
+        self.timeout = timeout
+
+        self._cache = OrderedDict()     # key -> (message, source, expires_at)
+        self._inflight = {}             # key -> future of the LLM call
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alert-msg")
+        self.stats = {
+            "hits": 0,              # cached LLM messages
+            "template_hits": 0,     # cached templates (LLM slow or down)
+            "misses": 0,
+            "coalesced": 0,
+            "llm_calls": 0,
+            "llm_errors": 0,
+            "timeouts": 0,
+            "templates": 0,
+            "pregenerated": 0,
+            "evictions": 0
+        }
+
+    def _remember(self, key, message, source, ttl):
+        # caller holds _lock
+        self._cache[key] = (message, source, time.monotonic() + ttl)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _cached(self, key):
+        # caller holds _lock
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _generate(self, key, context):
+        try:
+            message = self.generate_fn(context)[:MAX_MESSAGE_LENGTH]
+        except Exception:
+            with self._lock:
+                self.stats["llm_errors"] += 1
+                self._remember(key, template_message(context), "template", self.fallback_ttl)
+                self._inflight.pop(key, None)
+            raise
+        with self._lock:
+            self._remember(key, message, "groq", self.ttl)
+            self._inflight.pop(key, None)
+        return message
+
+    def _start(self, key, context):
+        """Future of the LLM call for key, starting one if none is running;
+        caller holds _lock"""
+        future = self._inflight.get(key)
+        if future is None:
+            self.stats["llm_calls"] += 1
+            future = self._executor.submit(self._generate, key, dict(context))
+            self._inflight[key] = future
+            return future, False
+        return future, True
+
+    def get(self, context: Dict) -> Tuple[str, str]:
+        """(message, source); source is groq or template, whether the
+        message was cached or not"""
+        key = context_key(context)
+        with self._lock:
+            entry = self._cached(key)
+            if entry is not None:
+                self.stats["hits" if entry[1] == "groq" else "template_hits"] += 1
+                return entry[0], entry[1]
+            self.stats["misses"] += 1
+            future, shared = self._start(key, context)
+            if shared:
+                self.stats["coalesced"] += 1
+
+        try:
+            return future.result(self.timeout), "groq"
+        except TimeoutError:
+            # the call carries on in the background and replaces the
+            # template once it answers; until then alerts get the template
+            # without waiting
+            message = template_message(context)
+            with self._lock:
+                self.stats["timeouts"] += 1
+                self.stats["templates"] += 1
+                if self._cached(key) is None:
+                    self._remember(key, message, "template", self.fallback_ttl)
+            return message, "template"
+        except Exception:
+            with self._lock:
+                self.stats["templates"] += 1
+        return template_message(context), "template"
+
+    def prefetch(self, context: Dict) -> bool:
+        """Start generating a message unless one is cached or on its way"""
+        key = context_key(context)
+        with self._lock:
+            entry = self._cached(key)
+            if (entry is not None and entry[1] == "groq") or key in self._inflight:
+                return False
+            self.stats["pregenerated"] += 1
+            self._start(key, context)
+        return True
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until every LLM call running now has finished"""
+        with self._lock:
+            futures = list(self._inflight.values())
+        for f in futures:
+            try:
+                f.result(timeout)
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._cache)
+            stats["inflight"] = len(self._inflight)
+        # share of lookups answered by a cached LLM message; cached
+        # templates are counted as lookups but not as hits
+        lookups = stats["hits"] + stats["template_hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_SERVICE: Optional[AlertMessageService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_message_service() -> AlertMessageService:
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = AlertMessageService()
+        return _SERVICE
+
+
+def get_alert_message(context: Dict) -> Tuple[str, str]:
+    return get_message_service().get(context)
+
+
+def hotspot_contexts(clusters: List[Dict], events: List[Optional[str]] = (None,),
+                     top: int = 20, min_risk: float = 0.5) -> List[Dict]:
+    """Likely alert contexts for the busiest hotspot clusters: the zone is
+    the nearest gazetteer locality, risk the cluster's crime count relative
+    to the busiest one, crime type its most common one. Clusters below
+    min_risk (the alert endpoints' threshold) are left out."""
+    from backend.services.gazetteer import get_gazetteer
+    from backend.services.hotspot_engine import haversine_km
+
+    clusters = sorted(clusters, key=lambda c: -c["crime_count"])[:top]
+    if not clusters:
+        return []
+    lat = np.array([c["centroid"]["lat"] for c in clusters])
+    lon = np.array([c["centroid"]["lon"] for c in clusters])
+
+    gazetteer = get_gazetteer()
+    places = gazetteer.places("locality") if gazetteer is not None else []
+    if places:
+        nearest = haversine_km(lat[:, None], lon[:, None],
+                               np.array([p["lat"] for p in places])[None, :],
+                               np.array([p["lon"] for p in places])[None, :]).argmin(axis=1)
+        zones = [places[i]["name"] for i in nearest]
+    else:
+        zones = [f"{round(a, 3)}-{round(b, 3)}" for a, b in zip(lat, lon)]
+
+    busiest = clusters[0]["crime_count"]
+    contexts = []
+    for c, zone in zip(clusters, zones):
+        if c["crime_count"] / busiest < min_risk:
+            continue
+        crime_type = next(iter(c.get("crime_types") or {}), None) or "Other"
+        for event in events:
+            contexts.append({
+                "zone": zone,
+                "crime_type": crime_type,
+                "risk": c["crime_count"] / busiest,
+                "event": event
+            })
+    return contexts
+
+
+def pregenerate_for_hotspots(events: List[Optional[str]] = (None,), top: int = 20,
+                             eps_km: float = 3, min_samples: int = 2) -> Dict:
+    from backend.services.pipeline_service import run_store_pipeline
+
+    clusters = run_store_pipeline(eps_km, min_samples)["hotspot_clusters"]
+    contexts = hotspot_contexts(clusters, list(events or [None]), top)
+    service = get_message_service()
+    queued = sum(service.prefetch(c) for c in contexts)
+    return {"hotspots": min(len(clusters), top), "contexts": len(contexts), "queued": queued}
@@ -0,0 +1,14 @@
+import hashlib
+import re
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Create SHA256 hash for files (FIR / evidence)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def complaint_fingerprint(text: str) -> str:
+    """Hash of a complaint with case, punctuation and spacing removed, so
+    the same complaint re-typed or re-scanned maps to the same key"""
+    words = re.sub(r"[^\w]+", " ", (text or "").lower()).split()
+    return sha256_bytes(" ".join(words).encode()) if words else ""
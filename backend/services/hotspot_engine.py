@@ -0,0 +1,339 @@
+import os
+from collections import OrderedDict, defaultdict
+from itertools import product
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Incremental haversine DBSCAN.
+#
+# Points live in a uniform grid over their 3D unit vectors (cell side = the
+# chord length of eps), so an eps-neighbourhood is the 27 surrounding cells
+# plus an exact haversine check. Each point keeps its neighbour count; core
+# points are joined in a union-find as they appear. Adding a FIR touches only
+# its own neighbourhood, and labels are derived from that state when asked.
+#
+# Labels match sklearn DBSCAN(metric="haversine") fitted on the same points
+# in the same order: clusters are numbered by their lowest-index core point
+# and a border point takes the lowest label among its core neighbours.
+
+EARTH_RADIUS_KM = 6371.0
+# accepted eps range; below ~6 m the grid keys overflow
+EPS_KM_MIN = 0.01
+EPS_KM_MAX = 50.0
+# StoreHotspots kept per (eps_km, min_samples), least recently used dropped
+HOTSPOT_ENGINES_MAX = int(os.getenv("HOTSPOT_ENGINES_MAX", "4"))
+# grid keys pack three cell coordinates into one int64, 21 bits each
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_NEIGHBOUR_CELLS = list(product((-1, 0, 1), repeat=3))
+_PAIR_CHUNK = 4096
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; degrees in, broadcasts over arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    h = (np.sin(0.5 * (lat2 - lat1)) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin(0.5 * (lon2 - lon1)) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def _unit_vectors(lat, lon):
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=1)
+
+
+def _pack(cells):
+    c = cells + _KEY_OFFSET
+    return (c[:, 0] << (2 * _KEY_BITS)) | (c[:, 1] << _KEY_BITS) | c[:, 2]
+
+
+class HotspotEngine:
+    def __init__(self, eps_km: float, min_samples: int):
+        self.eps_km = eps_km
+        self.min_samples = min_samples
+        eps = eps_km / EARTH_RADIUS_KM
+        # sklearn's haversine "reduced distance" and its radius
+        self._r_hav = np.sin(eps / 2) ** 2
+        chord = 2 * np.sin(eps / 2)
+        if chord * _KEY_OFFSET < 1:
+            raise ValueError(f"eps_km={eps_km} is too small for the grid")
+        self._cell = chord * (1 + 1e-9)
+
+        self.n = 0
+        self.payloads = []
+        self._lat = np.empty(0)
+        self._lon = np.empty(0)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._count = np.empty(0, dtype=np.int64)     # neighbours incl. self
+        self._parent = np.empty(0, dtype=np.int64)    # union-find, -1 = not core
+        self._grid = defaultdict(list)                # cell key -> point ids
+        self._labels = None
+        self._lock = Lock()
+
+    # -- geometry -------------------------------------------------------
+
+    def _cells(self, lat, lon):
+        return np.floor(_unit_vectors(lat, lon) / self._cell).astype(np.int64)
+
+    def _within(self, lat, lon, idx):
+        """Mask of points idx within eps of (lat, lon), in radians"""
+        d = (np.sin(0.5 * (lat - self._lat[idx])) ** 2
+             + np.cos(lat) * np.cos(self._lat[idx]) * np.sin(0.5 * (lon - self._lon[idx])) ** 2)
+        return d <= self._r_hav
+
+    def _neighbours(self, i, key_cells):
+        """Point ids within eps of point i (including i if it is indexed)"""
+        cand = [j for dx, dy, dz in _NEIGHBOUR_CELLS
+                for j in self._grid.get(self._cell_key(key_cells, dx, dy, dz), ())]
+        if not cand:
+            return np.empty(0, dtype=np.int64)
+        cand = np.array(cand, dtype=np.int64)
+        return cand[self._within(self._lat[i], self._lon[i], cand)]
+
+    @staticmethod
+    def _cell_key(cell, dx, dy, dz):
+        return ((int(cell[0]) + dx + _KEY_OFFSET) << (2 * _KEY_BITS)) \
+            | ((int(cell[1]) + dy + _KEY_OFFSET) << _KEY_BITS) \
+            | (int(cell[2]) + dz + _KEY_OFFSET)
+
+    def _pairs(self, query):
+        """All (i, j), i in query, j != i, within eps; vectorized over the grid"""
+        order = np.argsort(self._keys[:self.n], kind="stable")
+        sorted_keys = self._keys[order]
+        step = [(dx << (2 * _KEY_BITS)) + (dy << _KEY_BITS) + dz for dx, dy, dz in _NEIGHBOUR_CELLS]
+
+        for s in range(0, len(query), _PAIR_CHUNK):
+            q = query[s:s + _PAIR_CHUNK]
+            for off in step:
+                target = self._keys[q] + off
+                lo = np.searchsorted(sorted_keys, target, "left")
+                hi = np.searchsorted(sorted_keys, target, "right")
+                counts = hi - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                i = np.repeat(q, counts)
+                first = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                j = order[first + np.arange(total)]
+                keep = (i != j) & self._within(self._lat[i], self._lon[i], j)
+                yield i[keep], j[keep]
+
+    # -- updates --------------------------------------------------------
+
+    def _grow(self, extra):
+        need = self.n + extra
+        if need <= len(self._lat):
+            return
+        cap = max(need, 2 * len(self._lat), 1024)
+        for name, fill in (("_lat", 0.0), ("_lon", 0.0), ("_keys", 0), ("_count", 0), ("_parent", -1)):
+            old = getattr(self, name)
+            new = np.full(cap, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[max(ra, rb)] = min(ra, rb)
+
+    def add(self, lat_deg, lon_deg, payloads: Optional[list] = None):
+        """Index new points (degrees); payloads are kept alongside, in order"""
+        lat = np.radians(np.asarray(lat_deg, dtype=float))
+        lon = np.radians(np.asarray(lon_deg, dtype=float))
+        if not len(lat):
+            return
+        with self._lock:
+            if self.n == 0 and len(lat) > 1:
+                self._bulk_add(lat, lon)
+            else:
+                self._grow(len(lat))
+                cells = self._cells(lat, lon)
+                for k in range(len(lat)):
+                    self._add_one(lat[k], lon[k], cells[k])
+            self.payloads += list(payloads) if payloads is not None else [None] * len(lat)
+            self._labels = None
+
+    def _add_one(self, lat, lon, cell):
+        p = self.n
+        self._lat[p] = lat
+        self._lon[p] = lon
+        self._keys[p] = self._cell_key(cell, 0, 0, 0)
+
+        nb = self._neighbours(p, cell)
+        self._count[p] = len(nb) + 1
+        self._count[nb] += 1
+        self._grid[int(self._keys[p])].append(p)
+        self.n += 1
+
+        new_core = list(nb[self._count[nb] == self.min_samples])
+        if self._count[p] >= self.min_samples:
+            new_core.append(p)
+        for c in new_core:
+            self._parent[c] = c
+        for c in new_core:
+            around = np.append(nb, p) if c == p else self._neighbours(c, self._cells(
+                self._lat[c:c + 1], self._lon[c:c + 1])[0])
+            for q in around[self._parent[around] >= 0]:
+                self._union(c, int(q))
+
+    def _bulk_add(self, lat, lon):
+        n = len(lat)
+        self._grow(n)
+        self._lat[:n] = lat
+        self._lon[:n] = lon
+        self._keys[:n] = _pack(self._cells(lat, lon))
+        self.n = n
+        for i, key in enumerate(self._keys[:n].tolist()):
+            self._grid[key].append(i)
+
+        pairs = list(self._pairs(np.arange(n)))
+        i = np.concatenate([a for a, _ in pairs]) if pairs else np.empty(0, dtype=np.int64)
+        j = np.concatenate([b for _, b in pairs]) if pairs else np.empty(0, dtype=np.int64)
+        self._count[:n] = np.bincount(i, minlength=n) + 1
+
+        core = self._count[:n] >= self.min_samples
+        edge = core[i] & core[j]
+        roots = np.arange(n)
+        if edge.any():
+            from scipy.sparse import coo_matrix
+            from scipy.sparse.csgraph import connected_components
+            graph = coo_matrix((np.ones(edge.sum(), dtype=np.int8), (i[edge], j[edge])), shape=(n, n))
+            _, comp = connected_components(graph, directed=False)
+            first = np.full(comp.max() + 1, n)
+            np.minimum.at(first, comp, np.arange(n))
+            roots = first[comp]
+        self._parent[:n] = np.where(core, roots, -1)
+
+    # -- reads ----------------------------------------------------------
+
+    def labels(self) -> np.ndarray:
+        """DBSCAN labels of every point in insertion order, -1 = noise"""
+        with self._lock:
+            if self._labels is None:
+                self._labels = self._compute_labels()
+            return self._labels
+
+    def _compute_labels(self):
+        n = self.n
+        labels = np.full(n, -1, dtype=np.int64)
+        core = np.flatnonzero(self._parent[:n] >= 0)
+        if not len(core):
+            return labels
+
+        roots = self._parent[core]
+        while True:
+            nxt = self._parent[roots]
+            if np.array_equal(nxt, roots):
+                break
+            roots = nxt
+        uniq, comp = np.unique(roots, return_inverse=True)
+        first = np.full(len(uniq), n)
+        np.minimum.at(first, comp, core)
+        rank = np.empty(len(uniq), dtype=np.int64)
+        rank[np.argsort(first)] = np.arange(len(uniq))
+        labels[core] = rank[comp]
+
+        # border points: lowest label among core neighbours
+        border = np.flatnonzero((self._parent[:n] < 0) & (self._count[:n] > 1))
+        best = np.full(n, np.iinfo(np.int64).max)
+        for i, j in self._pairs(border):
+            is_core = self._parent[j] >= 0
+            np.minimum.at(best, i[is_core], labels[j[is_core]])
+        hit = best[border] != np.iinfo(np.int64).max
+        labels[border[hit]] = best[border[hit]]
+        return labels
+
+    def clusters(self) -> Dict[int, List[int]]:
+        """label -> point ids, noise excluded"""
+        labels = self.labels()
+        out = {}
+        for i in np.flatnonzero(labels >= 0):
+            out.setdefault(int(labels[i]), []).append(int(i))
+        return out
+
+
+def cluster_points(points: List[Dict], eps_km: float, min_samples: int) -> Dict:
+    """detect_hotspots() response for a list of {"lat", "lon", ...} dicts"""
+    if not points:
+        return {
+            "valid_geo_points": 0,
+            "hotspot_clusters": {}
+        }
+    engine = HotspotEngine(eps_km, min_samples)
+    engine.add([p["lat"] for p in points], [p["lon"] for p in points])
+    return {
+        "valid_geo_points": len(points),
+        "hotspot_clusters": {
+            label: [points[i] for i in ids] for label, ids in engine.clusters().items()
+        }
+    }
+
+
+# -- engines kept in sync with the FIR store --------------------------------
+
+class StoreHotspots:
+    """HotspotEngine over every geocoded FIR, fed from the store by seq"""
+
+    def __init__(self, store, eps_km: float, min_samples: int):
+        self.store = store
+        self.eps_km = eps_km
+        self.min_samples = min_samples
+        self.engine = HotspotEngine(eps_km, min_samples)
+        self.last_seq = 0
+        self._known = set()
+        self._lock = Lock()
+
+    def sync(self) -> HotspotEngine:
+        with self._lock:
+            rows = self.store.rows_since(self.last_seq)
+            if any(r[1] in self._known for r in rows):
+                # a FIR was re-added (replaced): its old point must go
+                self._rebuild()
+            elif rows:
+                self._append(rows)
+            return self.engine
+
+    def _append(self, rows):
+        geo = [r for r in rows if r[2] is not None]
+        self.engine.add([r[2] for r in geo], [r[3] for r in geo], geo)
+        self._known.update(r[1] for r in rows)
+        self.last_seq = rows[-1][0]
+
+    def _rebuild(self):
+        self.engine = HotspotEngine(self.eps_km, self.min_samples)
+        self._known = set()
+        self.last_seq = 0
+        rows = self.store.rows_since(0)
+        if rows:
+            self._append(rows)
+
+
+_ENGINES = OrderedDict()
+_ENGINES_LOCK = Lock()
+
+
+def get_store_hotspots(eps_km: float, min_samples: int) -> StoreHotspots:
+    """Shared engine for the parameters; each holds a full index of the
+    store, so only the HOTSPOT_ENGINES_MAX most recently used are kept.
+    Raises ValueError for eps_km outside [EPS_KM_MIN, EPS_KM_MAX]."""
+    from backend.fir_store import get_store
+    key = (float(eps_km), int(min_samples))
+    if not EPS_KM_MIN <= key[0] <= EPS_KM_MAX:
+        raise ValueError(f"eps_km must be between {EPS_KM_MIN} and {EPS_KM_MAX}")
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = _ENGINES[key] = StoreHotspots(get_store(), *key)
+        _ENGINES.move_to_end(key)
+        while len(_ENGINES) > HOTSPOT_ENGINES_MAX:
+            _ENGINES.popitem(last=False)
+        return engine
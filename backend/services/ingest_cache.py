@@ -0,0 +1,102 @@
+import json
+import os
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+# Content-addressed ingestion cache. Uploaded files are keyed by the SHA-256
+# of their bytes:
+#   documents  - file hash -> FIR id created for it by POST /documents/
+#   complaints - complaint fingerprint -> FIR id (near-duplicate check)
+#   results    - file hash -> response of POST /fir/process
+
+CACHE_PATH = os.getenv(
+    "INGEST_CACHE_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "ingest_cache.db")
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (content_hash TEXT PRIMARY KEY, fir_id TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS complaints (fingerprint TEXT PRIMARY KEY, fir_id TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS results (content_hash TEXT PRIMARY KEY, result TEXT NOT NULL);
+"""
+
+
+class IngestCache:
+    def __init__(self, path: str = CACHE_PATH):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = Lock()
+        self.stats = {"document_hits": 0, "complaint_hits": 0, "result_hits": 0, "misses": 0}
+
+    def _get(self, sql, key, stat):
+        with self._lock:
+            row = self._conn.execute(sql, (key,)).fetchone() if key else None
+            self.stats[stat if row else "misses"] += 1
+        return row[0] if row else None
+
+    def find_document(self, content_hash: str) -> Optional[str]:
+        return self._get("SELECT fir_id FROM documents WHERE content_hash = ?",
+                         content_hash, "document_hits")
+
+    def find_complaint(self, fingerprint: str) -> Optional[str]:
+        return self._get("SELECT fir_id FROM complaints WHERE fingerprint = ?",
+                         fingerprint, "complaint_hits")
+
+    def remember(self, fir_id: str, content_hash: Optional[str] = None,
+                 fingerprint: Optional[str] = None):
+        """Record the FIR a file (and its complaint) produced; first one wins"""
+        with self._lock, self._conn:
+            if content_hash:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO documents (content_hash, fir_id) VALUES (?, ?)",
+                    (content_hash, fir_id)
+                )
+            if fingerprint:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO complaints (fingerprint, fir_id) VALUES (?, ?)",
+                    (fingerprint, fir_id)
+                )
+
+    def forget(self, fir_id: str):
+        """Drop every key pointing at a FIR that no longer exists"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE fir_id = ?", (fir_id,))
+            self._conn.execute("DELETE FROM complaints WHERE fir_id = ?", (fir_id,))
+
+    def get_result(self, content_hash: str) -> Optional[dict]:
+        result = self._get("SELECT result FROM results WHERE content_hash = ?",
+                           content_hash, "result_hits")
+        return json.loads(result) if result is not None else None
+
+    def put_result(self, content_hash: str, result: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (content_hash, result) VALUES (?, ?)",
+                (content_hash, json.dumps(result))
+            )
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            for table in ("documents", "complaints", "results"):
+                stats[f"{table}_entries"] = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {table}"
+                ).fetchone()[0]
+        return stats
+
+
+_CACHE: Optional[IngestCache] = None
+_CACHE_LOCK = Lock()
+
+
+def get_ingest_cache() -> IngestCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = IngestCache()
+        return _CACHE
@@ -0,0 +1,213 @@
+import asyncio
+import io
+import logging
+import multiprocessing as mp
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from backend.models.fir import FIR
+from backend.services.text_utils import normalize_text, clean_location, extract_geo_query
+from backend.services.fir_extraction import extract_fir_fields
+from backend.services.geocoding_service import geocode_location
+from backend.services.crime_classifier import get_classifier
+from backend.services.department_classifier import classify_departments
+from backend.services.hashing import sha256_bytes, complaint_fingerprint
+from backend.services.ingest_cache import get_ingest_cache
+from backend.mock_store import add_firs, get_fir
+
+# FIR ingestion pipeline used by POST /documents/:
+#   parse + extract (CPU)  -> process pool, INGEST_WORKERS processes
+#   geocode (I/O)          -> threads, at most GEOCODE_CONCURRENCY at once
+#   store                  -> each FIR is committed as soon as it is ready
+# Files already ingested (same SHA-256) return their existing FIR and skip
+# every stage; with DEDUP_COMPLAINTS=1 so do files whose normalized
+# complaint text matches a stored FIR.
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 2)))
+GEOCODE_CONCURRENCY = int(os.getenv("GEOCODE_CONCURRENCY", "4"))
+DEDUP_COMPLAINTS = os.getenv("DEDUP_COMPLAINTS", "0") == "1"
+
+AREA_FALLBACKS = {
+    "borivali": "Borivali West, Mumbai",
+    "dahisar": "Dahisar, Mumbai"
+}
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=INGEST_WORKERS,
+                mp_context=mp.get_context("spawn")
+            )
+        return _pool
+
+
+def parse_fir_pdf(filename: str, content: bytes) -> Optional[dict]:
+    """CPU stage, runs in a worker process: PDF text -> FIR fields"""
+    start = time.perf_counter()
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        raw_text = ""
+        for page in reader.pages:
+            raw_text += page.extract_text() or ""
+    except Exception:
+        return None
+    parsed_at = time.perf_counter()
+
+    extracted, complaint_text = extract_fir_fields(raw_text)
+
+    crime_type, crime_type_source = get_classifier().classify(
+        extracted.get("crime_type"),
+        extracted.get("sections"),
+        complaint_text
+    )
+
+    raw_loc = extracted.get("location")
+    geo_query = extract_geo_query(clean_location(raw_loc)) if raw_loc else ""
+
+    return {
+        "source_file": filename,
+        "raw_text": raw_text,
+        "complaint_text": normalize_text(complaint_text),
+        "crime_type": crime_type,
+        "crime_type_source": crime_type_source,
+        "sections": extracted.get("sections"),
+        "date": extracted.get("date"),
+        "time": extracted.get("time"),
+        "location_text": raw_loc,
+        "geo_query": geo_query,
+        "department_tags": classify_departments(crime_type),
+        "parse_ms": (parsed_at - start) * 1000,
+        "extract_ms": (time.perf_counter() - parsed_at) * 1000
+    }
+
+
+def geocode_query(geo_query: str):
+    """I/O stage: geocode, then the hard-coded area-level fallbacks"""
+    if not geo_query:
+        return None
+
+    geo = geocode_location(geo_query)
+
+    # 🔁 HARD FALLBACK (AREA LEVEL) - cached like any other query
+    if not geo:
+        for area, query in AREA_FALLBACKS.items():
+            if area in geo_query.lower():
+                geo = geocode_location(query)
+                break
+    return geo
+
+
+def find_existing_fir(find, key) -> Optional[dict]:
+    """FIR a cache key points at; stale keys (FIR gone) are dropped"""
+    fir_id = find(key)
+    if fir_id is None:
+        return None
+    fir = get_fir(fir_id)
+    if fir is None:
+        get_ingest_cache().forget(fir_id)
+    return fir
+
+
+async def ingest_pdfs(files: List[Tuple[str, bytes]]) -> dict:
+    """Run the pipeline over (filename, content) pairs without blocking the loop"""
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    cache = get_ingest_cache()
+    geocode_slots = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+    timings = {"parse_ms": 0.0, "extract_ms": 0.0, "geocode_ms": 0.0, "store_ms": 0.0}
+    stored = {}         # file index -> FIR (new or existing)
+    duplicates = {}
+
+    def duplicate(index, filename, fir, match):
+        stored[index] = fir
+        duplicates[index] = {"source_file": filename, "fir_id": fir["fir_id"], "match": match, "fir": fir}
+
+    async def process(index, filename, content, content_hash):
+        fir = await asyncio.to_thread(find_existing_fir, cache.find_document, content_hash)
+        if fir is not None:
+            duplicate(index, filename, fir, "content")
+            return
+
+        parsed = await loop.run_in_executor(pool, parse_fir_pdf, filename, content)
+        if parsed is None:
+            return
+        timings["parse_ms"] += parsed.pop("parse_ms")
+        timings["extract_ms"] += parsed.pop("extract_ms")
+        geo_query = parsed.pop("geo_query")
+
+        fingerprint = complaint_fingerprint(parsed["complaint_text"])
+        if DEDUP_COMPLAINTS:
+            fir = await asyncio.to_thread(find_existing_fir, cache.find_complaint, fingerprint)
+            if fir is not None:
+                await asyncio.to_thread(cache.remember, fir["fir_id"], content_hash)
+                duplicate(index, filename, fir, "complaint")
+                return
+
+        async with geocode_slots:
+            t = time.perf_counter()
+            try:
+                geo = await asyncio.to_thread(geocode_query, geo_query)
+            except Exception as e:
+                # keep the FIR; it can be geocoded again later
+                logger.warning("geocoding failed for %r: %s", geo_query, e)
+                geo = None
+            timings["geocode_ms"] += (time.perf_counter() - t) * 1000
+
+        logger.debug("storing FIR geo for %r: %s", geo_query, geo)
+
+        fir = FIR(
+            fir_id=f"FIR-{uuid.uuid4().hex[:8]}",
+            geo=geo,
+            status="pending",
+            **parsed
+        ).dict()
+
+        t = time.perf_counter()
+        await asyncio.to_thread(add_firs, [fir])
+        await asyncio.to_thread(cache.remember, fir["fir_id"], content_hash, fingerprint)
+        timings["store_ms"] += (time.perf_counter() - t) * 1000
+        stored[index] = fir
+
+    # the same file twice in one batch is processed once
+    first_of = {}
+    repeats = []
+    for i, (name, content) in enumerate(files):
+        h = sha256_bytes(content)
+        if h in first_of:
+            repeats.append((i, name, first_of[h]))
+        else:
+            first_of[h] = i
+
+    await asyncio.gather(*(
+        process(i, files[i][0], files[i][1], h) for h, i in first_of.items()
+    ))
+
+    uploaded = len(stored) - len(duplicates)
+    for i, name, first in repeats:
+        if first in stored:
+            duplicate(i, name, stored[first], "content")
+
+    timings = {k: round(v, 2) for k, v in timings.items()}
+    timings["wall_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return {
+        "uploaded": uploaded,
+        "fir_ids": [stored[i]["fir_id"] for i in sorted(stored)],
+        "duplicates": [duplicates[i] for i in sorted(duplicates)],
+        "timings": timings,
+        "workers": {"parse": INGEST_WORKERS, "geocode": GEOCODE_CONCURRENCY}
+    }
@@ -0,0 +1,173 @@
+import math
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.rules.deployment_rules import base_deployment, event_multiplier
+from backend.services.hotspot_engine import haversine_km
+
+# Patrol routes per unit and time slot.
+#
+#   1. every hotspot goes to its nearest station (one stations x hotspots
+#      haversine matrix);
+#   2. a station fields ceil(base_deployment(risk) * event_multiplier(event))
+#      units, risk being its busiest hotspot's crime count relative to the
+#      city's busiest;
+#   3. per station and time slot, hotspots are swept by bearing around the
+#      station into one sector per unit, starting at the widest gap so no
+#      sector straddles it;
+#   4. each sector becomes a closed route from the station: nearest
+#      insertion, then 2-opt until no move helps or the time budget is spent.
+#
+# Distances are vectorized haversine matrices built per sector, so memory
+# stays proportional to the largest sector rather than to all hotspots.
+
+PATROL_TIME_LIMIT_SECONDS = float(os.getenv("PATROL_TIME_LIMIT_SECONDS", "10"))
+ALL_DAY = ("Daily", "00:00 - 00:00")
+
+
+def distance_matrix(lat_a, lon_a, lat_b=None, lon_b=None) -> np.ndarray:
+    """km between every point of a and every point of b (b defaults to a)"""
+    lat_a, lon_a = np.asarray(lat_a, dtype=float), np.asarray(lon_a, dtype=float)
+    if lat_b is None:
+        lat_b, lon_b = lat_a, lon_a
+    return haversine_km(lat_a[:, None], lon_a[:, None],
+                        np.asarray(lat_b, dtype=float)[None, :], np.asarray(lon_b, dtype=float)[None, :])
+
+
+def route_length(tour, D) -> float:
+    tour = np.asarray(tour)
+    return float(D[tour[:-1], tour[1:]].sum())
+
+
+def nearest_insertion(D, depot: int = 0) -> List[int]:
+    """Closed tour over every node of D, starting and ending at depot"""
+    tour = [depot]
+    remaining = np.array([i for i in range(len(D)) if i != depot], dtype=np.int64)
+    near = D[depot, remaining].copy()
+    while len(remaining):
+        k = int(near.argmin())
+        node = int(remaining[k])
+        t = np.array(tour)
+        nxt = np.roll(t, -1)
+        pos = int((D[t, node] + D[node, nxt] - D[t, nxt]).argmin())
+        tour.insert(pos + 1, node)
+        remaining = np.delete(remaining, k)
+        near = np.minimum(np.delete(near, k), D[node, remaining])
+    return tour + [depot]
+
+
+def two_opt(tour, D, deadline: Optional[float] = None) -> List[int]:
+    """Reverse segments while that shortens the closed tour; each pass
+    scores all moves from one edge with a single vector operation"""
+    t = np.array(tour)
+    n = len(t)
+    improved = True
+    while improved and (deadline is None or time.monotonic() < deadline):
+        improved = False
+        for i in range(n - 3):
+            a, b = t[i], t[i + 1]
+            c, d = t[i + 2:n - 1], t[i + 3:n]
+            delta = D[a, c] + D[b, d] - D[a, b] - D[c, d]
+            j = int(delta.argmin())
+            if delta[j] < -1e-9:
+                j += i + 2
+                t[i + 1:j + 1] = t[i + 1:j + 1][::-1].copy()
+                improved = True
+    return t.tolist()
+
+
+def sweep_sectors(lat, lon, depot_lat, depot_lon, k: int) -> np.ndarray:
+    """Sector (0..k-1) per point, equal stop counts, swept by bearing"""
+    n = len(lat)
+    k = max(1, min(k, n))
+    bearing = np.arctan2(np.asarray(lat) - depot_lat,
+                         (np.asarray(lon) - depot_lon) * math.cos(math.radians(depot_lat)))
+    order = np.argsort(bearing, kind="stable")
+    if n > 1:
+        gaps = np.diff(np.append(bearing[order], bearing[order[0]] + 2 * math.pi))
+        order = np.roll(order, -(int(gaps.argmax()) + 1))
+    sectors = np.empty(n, dtype=np.int64)
+    sectors[order] = np.arange(n) * k // n
+    return sectors
+
+
+def units_for(risk: float, event: Optional[str] = None) -> int:
+    return math.ceil(base_deployment(risk) * event_multiplier(event or ""))
+
+
+def plan_patrols(hotspots: List[Dict], stations: List[Dict], event: Optional[str] = None,
+                 time_limit: float = PATROL_TIME_LIMIT_SECONDS) -> Dict:
+    """Routes per unit and time slot.
+
+    hotspots: {"lat", "lon", "crime_count", optional "cluster_id", "day",
+    "time_slot"}; stations: {"name", "lat", "lon", optional "units"} where
+    "units" overrides the deployment rules."""
+    start = time.perf_counter()
+    deadline = time.monotonic() + time_limit
+    result = {
+        "event": event,
+        "event_multiplier": event_multiplier(event or ""),
+        "hotspots": len(hotspots),
+        "stations": len(stations),
+        "units": 0,
+        "routes": []
+    }
+    if not hotspots or not stations:
+        result.update(units_routed=0, total_distance_km=0.0, compute_ms=0.0)
+        return result
+
+    h_lat = np.array([h["lat"] for h in hotspots], dtype=float)
+    h_lon = np.array([h["lon"] for h in hotspots], dtype=float)
+    counts = np.array([h.get("crime_count", 1) for h in hotspots], dtype=float)
+    risk = counts / counts.max()
+    s_lat = np.array([s["lat"] for s in stations], dtype=float)
+    s_lon = np.array([s["lon"] for s in stations], dtype=float)
+    home = distance_matrix(s_lat, s_lon, h_lat, h_lon).argmin(axis=0)
+
+    groups = defaultdict(list)      # (station, slot) -> hotspot ids
+    for i, h in enumerate(hotspots):
+        slot = (h.get("day", "Daily"), h["time_slot"]) if h.get("time_slot") else ALL_DAY
+        groups[(int(home[i]), slot)].append(i)
+
+    station_units = {}
+    for s, station in enumerate(stations):
+        mine = home == s
+        if mine.any():
+            station_units[s] = int(station.get("units") or units_for(float(risk[mine].max()), event))
+    result["units"] = sum(station_units.values())
+
+    for (s, (day, slot)), ids in sorted(groups.items()):
+        ids = np.array(ids)
+        sectors = sweep_sectors(h_lat[ids], h_lon[ids], s_lat[s], s_lon[s], station_units[s])
+        for unit in range(int(sectors.max()) + 1):
+            members = ids[sectors == unit]
+            # node 0 is the station
+            lat = np.append(s_lat[s], h_lat[members])
+            lon = np.append(s_lon[s], h_lon[members])
+            D = distance_matrix(lat, lon)
+            tour = two_opt(nearest_insertion(D), D, deadline)
+            stops = [members[node - 1] for node in tour[1:-1]]
+            result["routes"].append({
+                "unit": f"{stations[s]['name']} #{unit + 1}",
+                "station": stations[s]["name"],
+                "day": day,
+                "time_slot": slot,
+                "distance_km": round(route_length(tour, D), 3),
+                "crimes_covered": int(counts[members].sum()),
+                "stops": [{
+                    "cluster_id": hotspots[i].get("cluster_id"),
+                    "lat": float(h_lat[i]),
+                    "lon": float(h_lon[i]),
+                    "crime_count": int(counts[i])
+                } for i in stops]
+            })
+
+    # a station with fewer stops than units leaves some units free
+    result["units_routed"] = len({r["unit"] for r in result["routes"]})
+    result["total_distance_km"] = round(sum(r["distance_km"] for r in result["routes"]), 3)
+    result["compute_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
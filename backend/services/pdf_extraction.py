@@ -1,22 +1,125 @@
+import hashlib
+import multiprocessing as mp
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+
 from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
 
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
+# Page-level OCR: pages with a usable text layer are read directly; only the
+# others are rasterized and OCR'd, one page per task in a process pool so a
+# large scanned bundle never sits in memory as a list of images. OCR output
+# is cached by page content hash (plus DPI and language).
+
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "50"))
+OCR_CACHE_PATH = os.getenv(
+    "OCR_CACHE_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "ocr_cache.db")
+)
+
+_pool = None
+_conn = None
+_lock = Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=mp.get_context("spawn")
+            )
+        return _pool
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    with _lock:
+        if _conn is None:
+            Path(OCR_CACHE_PATH).parent.mkdir(parents=True, exist_ok=True)
+            _conn = sqlite3.connect(OCR_CACHE_PATH, check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_pages (key TEXT PRIMARY KEY, text TEXT NOT NULL)"
+            )
+        return _conn
+
+
+def _cached(key):
+    conn = _get_conn()
+    with _lock:
+        row = conn.execute("SELECT text FROM ocr_pages WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _store(key, text):
+    conn = _get_conn()
+    with _lock, conn:
+        conn.execute("INSERT OR REPLACE INTO ocr_pages (key, text) VALUES (?, ?)", (key, text))
+
+
+def _page_hash(page) -> str:
+    """Hash of what is drawn on the page: content stream + image data"""
+    h = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        h.update(contents.get_data())
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if xobjects:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            h.update(name.encode())
+            # raw (still encoded) stream bytes, no need to decode images
+            h.update(getattr(xobjects[name].get_object(), "_data", b"") or b"")
+    return h.hexdigest()
+
+
+def ocr_page(file_path: str, page_number: int, dpi: int = OCR_DPI, lang: str = OCR_LANG) -> str:
+    """Runs in a worker process: rasterize a single page (1-based) and OCR it"""
+    images = convert_from_path(file_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    return "".join(pytesseract.image_to_string(img, lang=lang) for img in images)
+
+
+def extract_text_from_pdf(file_path: str, dpi: int = OCR_DPI, lang: str = OCR_LANG) -> str:
+    pages = []      # per page: [text layer, cache key or None]
 
     try:
         reader = PdfReader(file_path)
         for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
+            page_text = page.extract_text() or ""
+            key = None
+            if len(page_text.strip()) < MIN_PAGE_CHARS:
+                key = f"{_page_hash(page)}:{dpi}:{lang}"
+            pages.append([page_text, key])
     except:
-        pass
+        # no usable structure: OCR every page, keyed on the whole file
+        with open(file_path, "rb") as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()
+        n_pages = pdfinfo_from_path(file_path)["Pages"]
+        pages = [["", f"{file_hash}#{i}:{dpi}:{lang}"] for i in range(n_pages)]
+
+    pending = {}
+    for i, (_, key) in enumerate(pages):
+        if key is None:
+            continue
+        text = _cached(key)
+        if text is None:
+            pending[i] = _get_pool().submit(ocr_page, file_path, i + 1, dpi, lang)
+        else:
+            pages[i][0] += text
 
-    if len(text.strip()) < 50:
-        images = convert_from_path(file_path)
-        for img in images:
-            text += pytesseract.image_to_string(img)
+    for i, future in pending.items():
+        text = future.result()
+        _store(pages[i][1], text)
+        pages[i][0] += text
 
-    return text
+    return "".join(text for text, _ in pages)
@@ -1,3 +1,12 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend.services.hotspot_engine import HotspotEngine, get_store_hotspots, haversine_km
+
+
 def build_crime_points(fir_results: list):
     points = []
 
@@ -15,3 +24,129 @@ def build_crime_points(fir_results: list):
         })
 
     return points
+
+
+# -- hotspot pipeline over the FIR store ------------------------------------
+# Runs on the server against the stored FIRs instead of a posted FIR list.
+# The unfiltered case reads the incrementally maintained engine; date or
+# crime-type filters cluster the matching subset. Results are cached per
+# parameter set and dropped as soon as the store version moves.
+
+PIPELINE_CACHE_SIZE = 64
+
+_RESULTS = OrderedDict()      # params -> (store version, response)
+_RESULTS_LOCK = Lock()
+
+
+def summarize_clusters(lat, lon, labels, crime_types, dates) -> list:
+    """Per-cluster centroid, radius, crime-type mix and date range, computed
+    with one pass of numpy group-bys over all clustered points"""
+    labels = np.asarray(labels)
+    keep = labels >= 0
+    if not keep.any():
+        return []
+    lab = labels[keep]
+    lat = np.asarray(lat, dtype=float)[keep]
+    lon = np.asarray(lon, dtype=float)[keep]
+    k = int(lab.max()) + 1
+
+    counts = np.bincount(lab, minlength=k)
+    c_lat = np.bincount(lab, lat, k) / np.maximum(counts, 1)
+    c_lon = np.bincount(lab, lon, k) / np.maximum(counts, 1)
+
+    dist = haversine_km(lat, lon, c_lat[lab], c_lon[lab])
+    radius = np.zeros(k)
+    np.maximum.at(radius, lab, dist)
+    mean_dist = np.bincount(lab, dist, k) / np.maximum(counts, 1)
+
+    types = np.array([t or "Other" for t in np.asarray(crime_types, dtype=object)[keep]], dtype=object)
+    type_names, type_codes = np.unique(types.astype(str), return_inverse=True)
+    mix = np.zeros((k, len(type_names)), dtype=np.int64)
+    np.add.at(mix, (lab, type_codes), 1)
+
+    # ISO dates sort as strings: group min/max over their sorted codes
+    days = np.array([d or "" for d in np.asarray(dates, dtype=object)[keep]], dtype=str)
+    day_names, day_codes = np.unique(days, return_inverse=True)
+    dated = days != ""
+    first = np.full(k, len(day_names))
+    last = np.full(k, -1)
+    np.minimum.at(first, lab[dated], day_codes[dated])
+    np.maximum.at(last, lab[dated], day_codes[dated])
+
+    out = []
+    for c in np.flatnonzero(counts):
+        row = mix[c]
+        order = np.argsort(-row, kind="stable")
+        out.append({
+            "cluster_id": int(c),
+            "crime_count": int(counts[c]),
+            "centroid": {"lat": float(c_lat[c]), "lon": float(c_lon[c])},
+            "radius_km": round(float(radius[c]), 4),
+            "mean_distance_km": round(float(mean_dist[c]), 4),
+            "crime_types": {str(type_names[t]): int(row[t]) for t in order if row[t]},
+            "date_range": {
+                "from": str(day_names[first[c]]) if last[c] >= 0 else None,
+                "to": str(day_names[last[c]]) if last[c] >= 0 else None
+            }
+        })
+    return out
+
+
+def _run_store_pipeline(store, eps_km, min_samples, date_from, date_to, crime_type):
+    engine = get_store_hotspots(eps_km, min_samples).sync()
+    rows = engine.payloads          # (seq, fir_id, lat, lon, crime_type, date_iso)
+    lat = np.array([r[2] for r in rows], dtype=float)
+    lon = np.array([r[3] for r in rows], dtype=float)
+    crime_types = np.array([r[4] for r in rows], dtype=object)
+    dates = np.array([r[5] or "" for r in rows], dtype=str)
+
+    if date_from is None and date_to is None and crime_type is None:
+        labels = engine.labels()
+    else:
+        mask = np.ones(len(rows), dtype=bool)
+        if date_from is not None:
+            mask &= (dates != "") & (dates >= date_from)
+        if date_to is not None:
+            mask &= (dates != "") & (dates <= date_to)
+        if crime_type is not None:
+            mask &= crime_types == crime_type
+        lat, lon, crime_types, dates = lat[mask], lon[mask], crime_types[mask], dates[mask]
+        subset = HotspotEngine(eps_km, min_samples)
+        subset.add(lat, lon)
+        labels = subset.labels()
+
+    return {
+        "total_firs": store.count(date_from=date_from, date_to=date_to, crime_type=crime_type),
+        "valid_geo_points": int(len(lat)),
+        "noise_points": int((labels < 0).sum()) if len(lat) else 0,
+        "hotspot_clusters": summarize_clusters(lat, lon, labels, crime_types, dates)
+    }
+
+
+def run_store_pipeline(eps_km: float = 3, min_samples: int = 2,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       crime_type: Optional[str] = None) -> Dict:
+    """Hotspot pipeline over every stored FIR; dates are ISO yyyy-mm-dd"""
+    from backend.fir_store import get_store
+    store = get_store()
+    key = (float(eps_km), int(min_samples), date_from, date_to, crime_type)
+    version = store.version()
+
+    with _RESULTS_LOCK:
+        hit = _RESULTS.get(key)
+        if hit is not None and hit[0] == version:
+            _RESULTS.move_to_end(key)
+            return {**hit[1], "cached": True}
+
+    result = _run_store_pipeline(store, *key)
+    # the version read before computing: a write that lands meanwhile
+    # leaves this entry stale-marked and it is recomputed next time
+    result = {"store_version": version, "filters": {
+        "date_from": date_from, "date_to": date_to, "crime_type": crime_type
+    }, **result}
+    with _RESULTS_LOCK:
+        _RESULTS[key] = (version, result)
+        _RESULTS.move_to_end(key)
+        while len(_RESULTS) > PIPELINE_CACHE_SIZE:
+            _RESULTS.popitem(last=False)
+    return {**result, "cached": False}
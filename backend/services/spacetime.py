@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend.services import geogrid
+
+# Space x time hotspots: where *and when* crimes concentrate.
+#
+# FIR dates ("2024-03-08", stored ISO) and times ("22:30 hrs", as extracted)
+# are parsed with numpy in one pass into an hour of the week (Mon 00:00 =
+# 0 ... Sun 23:00 = 167). Points are binned into geohash cells, giving a
+# cells x 168 count matrix; circular window sums over it find, per cell,
+# the SLOT_HOURS window with the most crimes, which may wrap past midnight
+# or the end of the week. period="day" folds the week onto 24 hours for
+# cells with too few FIRs to say which weekday matters. SpaceTimeGrid
+# keeps the parsed codes so both periods come from one parse.
+
+SPACETIME_PRECISION = 6         # ~1.2 x 0.6 km cells
+SLOT_HOURS = 4
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+_PERIODS = {"week": 168, "day": 24}
+
+
+def parse_weekdays(dates) -> np.ndarray:
+    """Monday = 0 for ISO yyyy-mm-dd strings, -1 where missing"""
+    # a year of FIRs has a few hundred distinct dates: parse each once
+    dates, inverse = np.unique(np.array([d or "" for d in dates], dtype="<U10"), return_inverse=True)
+    out = np.full(len(dates), -1, dtype=np.int64)
+    ok = dates != ""
+    # 1970-01-01 was a Thursday
+    out[ok] = (dates[ok].astype("datetime64[D]").astype(np.int64) + 3) % 7
+    return out[inverse].reshape(-1)
+
+
+def parse_hours(times) -> np.ndarray:
+    """Hour of day from "22:30 hrs", "2230 hrs", "9 hrs"...; -1 if unreadable"""
+    t, inverse = np.unique(np.array([x or "" for x in times], dtype="<U24"), return_inverse=True)
+    if not len(t):
+        return np.empty(0, dtype=np.int64)
+    t = np.char.lower(t)
+    for junk in ("hrs", "hr", "h", ":", ".", " "):
+        t = np.char.replace(t, junk, "")
+    length = np.char.str_len(t)
+    ok = np.char.isdigit(t) & (length >= 1) & (length <= 4)
+    # "9" / "21" are hours alone; pad to hhmm and read the first two digits
+    t = np.where(length <= 2, np.char.add(t, "00"), t)
+    t = np.where(ok, np.char.zfill(t, 4), "9999")
+    hour = t.astype("<U2").astype(np.int64)
+    minute = t.astype(np.int64) % 100
+    ok &= (hour < 24) & (minute < 60)
+    return np.where(ok, hour, -1)[inverse].reshape(-1)
+
+
+def hour_of_week(dates, times) -> np.ndarray:
+    weekday, hour = parse_weekdays(dates), parse_hours(times)
+    return np.where((weekday >= 0) & (hour >= 0), weekday * 24 + hour, -1)
+
+
+def window_sums(counts: np.ndarray, window: int) -> np.ndarray:
+    """Circular sums: out[:, s] = counts[:, s] + ... + counts[:, s + window - 1]"""
+    period = counts.shape[1]
+    ext = np.concatenate([counts, counts[:, :window - 1]], axis=1)
+    cs = np.concatenate([np.zeros((len(counts), 1), dtype=counts.dtype), np.cumsum(ext, axis=1)], axis=1)
+    return cs[:, window:window + period] - cs[:, :period]
+
+
+def format_slot(start: int, window: int, period: str) -> Dict:
+    hour = start % 24
+    slot = {"time_slot": f"{hour:02d}:00 - {(hour + window) % 24:02d}:00"}
+    slot["day"] = DAY_NAMES[start // 24] if period == "week" else "Daily"
+    return slot
+
+
+def spacetime_hotspots(lat, lon, dates, times, crime_types=None,
+                       precision: int = SPACETIME_PRECISION, window_hours: int = SLOT_HOURS,
+                       period: str = "week", min_count: int = 3,
+                       top: Optional[int] = 20) -> Dict:
+    """Busiest time window per geohash cell, strongest cells first"""
+    if not 1 <= window_hours <= _PERIODS[period]:
+        raise ValueError(f"window_hours must be between 1 and {_PERIODS[period]}")
+    grid = SpaceTimeGrid(lat, lon, dates, times, crime_types, precision)
+    return grid.hotspots(window_hours, period, min_count, top)
+
+
+class SpaceTimeGrid:
+    """FIRs parsed once into (cell, hour of week, crime type) codes, so
+    the week and day hotspots of one set of points share the parsing and
+    the geohashing"""
+
+    def __init__(self, lat, lon, dates, times, crime_types=None,
+                 precision: int = SPACETIME_PRECISION):
+        self.precision = precision
+        how = hour_of_week(dates, times)
+        timed = how >= 0
+        self.points = int(len(how))
+        self.hours = how[timed]
+        self.cells, self.cell_idx = np.unique(
+            geogrid.encode(np.asarray(lat, dtype=float)[timed], np.asarray(lon, dtype=float)[timed],
+                           precision),
+            return_inverse=True
+        )
+        types = np.asarray(crime_types if crime_types is not None else [None] * len(how),
+                           dtype=object)[timed]
+        self.types, self.type_idx = np.unique(
+            np.array([t or "Other" for t in types], dtype=str), return_inverse=True
+        )
+
+    def hotspots(self, window_hours: int = SLOT_HOURS, period: str = "week",
+                 min_count: int = 3, top: Optional[int] = 20) -> Dict:
+        size = _PERIODS[period]
+        if not 1 <= window_hours <= size:
+            raise ValueError(f"window_hours must be between 1 and {size}")
+
+        result = {
+            "period": period,
+            "precision": self.precision,
+            "window_hours": window_hours,
+            "points": self.points,
+            "timed_points": int(len(self.hours)),
+            "hotspots": []
+        }
+        if not len(self.hours):
+            return result
+
+        n_cells, cell_idx, bins = len(self.cells), self.cell_idx, self.hours % size
+        counts = np.bincount(cell_idx * size + bins, minlength=n_cells * size).reshape(n_cells, size)
+        totals = counts.sum(axis=1)
+        sums = window_sums(counts, window_hours)
+        best = sums.argmax(axis=1)
+        best_count = sums[np.arange(n_cells), best]
+
+        ranked = [c for c in np.argsort(-best_count, kind="stable") if best_count[c] >= min_count][:top]
+        if not ranked:
+            return result
+
+        # crime mix of every cell's window in one pass: FIRs whose hour
+        # falls inside their own cell's (possibly wrapping) window
+        in_window = ((bins - best[cell_idx]) % size) < window_hours
+        n_types = len(self.types)
+        mix = np.bincount(cell_idx[in_window] * n_types + self.type_idx[in_window],
+                          minlength=n_cells * n_types).reshape(n_cells, n_types)
+
+        bounds = geogrid.decode_bounds([self.cells[c] for c in ranked])
+        for c, b in zip(ranked, bounds):
+            start = int(best[c])
+            order = np.argsort(-mix[c], kind="stable")
+            result["hotspots"].append({
+                "cell": str(self.cells[c]),
+                "center": {"lat": float((b[0] + b[2]) / 2), "lon": float((b[1] + b[3]) / 2)},
+                **format_slot(start, window_hours, period),
+                "start_hour": start,
+                "crimes_in_slot": int(best_count[c]),
+                "crimes_in_cell": int(totals[c]),
+                # versus the same crimes spread evenly over the period
+                "lift": round(float(best_count[c] / (totals[c] * window_hours / size)), 2),
+                "crime_types": {str(self.types[t]): int(mix[c, t]) for t in order if mix[c, t]}
+            })
+        return result
+
+
+# -- patrol slots from the FIR store ----------------------------------------
+
+class SlotProfile:
+    """Per-cell patrol windows for one store version: the cell's weekly
+    window if it is strong enough, else its daily one, else the city's"""
+
+    def __init__(self, rows, precision: int, window_hours: int, min_count: int):
+        self.precision = precision
+        _, lat, lon, crime_types, dates, times = (list(c) for c in zip(*rows)) if rows else ([],) * 6
+        grid = SpaceTimeGrid(lat, lon, dates, times, crime_types, precision)
+        week = grid.hotspots(window_hours, "week", min_count, top=None)
+        day = grid.hotspots(window_hours, "day", min_count, top=None)
+        self.week = {h["cell"]: h for h in week["hotspots"]}
+        self.day = {h["cell"]: h for h in day["hotspots"]}
+        self.timed_points = week["timed_points"]
+
+        # city-wide daily window, for FIRs outside any busy cell
+        self.city = None
+        if len(grid.hours):
+            sums = window_sums(np.bincount(grid.hours % 24, minlength=24)[None, :], window_hours)[0]
+            start = int(sums.argmax())
+            self.city = {
+                **format_slot(start, window_hours, "day"),
+                "start_hour": start,
+                "crimes_in_slot": int(sums[start])
+            }
+
+    def slot_for(self, lat: Optional[float], lon: Optional[float]) -> Optional[Dict]:
+        if lat is not None and lon is not None:
+            cell = str(geogrid.encode([lat], [lon], self.precision)[0])
+            for basis, table in (("cell_week", self.week), ("cell_day", self.day)):
+                if cell in table:
+                    return {"basis": basis, **table[cell]}
+        if self.city is not None:
+            return {"basis": "city", **self.city}
+        return None
+
+
+_PROFILES = OrderedDict()       # params -> (store version, SlotProfile)
+_PROFILES_LOCK = Lock()
+
+
+def get_slot_profile(store, lookback_days: int = 365, precision: int = SPACETIME_PRECISION,
+                     window_hours: int = SLOT_HOURS, min_count: int = 3) -> SlotProfile:
+    """Profile over the last lookback_days of FIRs (counted back from the
+    latest FIR date), rebuilt only when the store version changes"""
+    key = (lookback_days, precision, window_hours, min_count)
+    version = store.version()
+    with _PROFILES_LOCK:
+        hit = _PROFILES.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+
+    days = store.aggregates("day")
+    date_from = None
+    if days:
+        latest = np.datetime64(max(days))
+        date_from = str(latest - np.timedelta64(lookback_days, "D"))
+    profile = SlotProfile(store.timed_points(date_from=date_from), precision, window_hours, min_count)
+
+    with _PROFILES_LOCK:
+        _PROFILES[key] = (version, profile)
+        while len(_PROFILES) > 8:
+            _PROFILES.popitem(last=False)
+    return profile
@@ -0,0 +1,312 @@
+import os
+import pickle
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.services.hotspot_engine import EARTH_RADIUS_KM, haversine_km
+
+# Radius / k-nearest / bbox lookups over every geocoded FIR.
+#
+# Points live in a haversine BallTree (the same metric DBSCAN used in
+# spatial_clustering) plus a small "delta" of FIRs stored since the tree was
+# built, which is searched by brute force. When the delta or the number of
+# replaced (dead) points grows past SPATIAL_REBUILD_FRACTION of the tree,
+# everything is rebuilt into one tree and pickled to SPATIAL_INDEX_PATH, so
+# a restart loads it and only catches up on FIRs stored after it. The pickle
+# records the store's id and version: it is only used for the same database,
+# and if that has been written to since, only when replaying rows_since()
+# accounts for every geocoded FIR.
+
+SPATIAL_INDEX_PATH = os.getenv(
+    "SPATIAL_INDEX_PATH",
+    str(Path(__file__).resolve().parents[1] / "data" / "spatial_index.pkl")
+)
+SPATIAL_REBUILD_FRACTION = float(os.getenv("SPATIAL_REBUILD_FRACTION", "0.05"))
+SPATIAL_REBUILD_MIN = int(os.getenv("SPATIAL_REBUILD_MIN", "2000"))
+_FORMAT = 2
+
+
+class SpatialIndex:
+    def __init__(self, store, path: Optional[str] = SPATIAL_INDEX_PATH):
+        self.store = store
+        self.path = path
+        self._lock = Lock()
+        self._reset()
+        if path and Path(path).exists():
+            self._load()
+
+    def _reset(self):
+        self.last_seq = 0
+        self.n = 0                  # points, tree ones first
+        self.m = 0                  # points in the tree
+        self.dead = 0
+        self.tree = None
+        self._lat_order = np.empty(0, dtype=np.int64)   # tree points by latitude
+        self._lat_sorted = np.empty(0)
+        self._fir_id = np.empty(0, dtype=object)
+        self._lat = np.empty(0)
+        self._lon = np.empty(0)
+        self._crime = np.empty(0, dtype=np.int32)
+        self._date = np.empty(0, dtype="<U10")
+        self._alive = np.empty(0, dtype=bool)
+        self._pos = {}              # fir_id -> point index
+        self._crime_codes = {}      # crime type -> code, -1 = none
+
+    # -- persistence ----------------------------------------------------
+
+    def _state(self):
+        n = self.n
+        return {
+            "format": _FORMAT,
+            "store_id": self.store.store_id(),
+            "store_version": self.store.version(),
+            "last_seq": self.last_seq,
+            "fir_id": self._fir_id[:n], "lat": self._lat[:n], "lon": self._lon[:n],
+            "crime": self._crime[:n], "date": self._date[:n],
+            "crime_codes": self._crime_codes,
+            "tree": self.tree
+        }
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        Path(tmp).parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump(self._state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception:
+            return
+        if state.get("format") != _FORMAT or state.get("store_id") != self.store.store_id():
+            # another store, or one recreated since the index was saved
+            return
+        version = self.store.version()
+        if state["store_version"] > version:
+            # the database was restored from a copy older than the index
+            return
+        self.last_seq = state["last_seq"]
+        self._fir_id, self._lat, self._lon = state["fir_id"], state["lat"], state["lon"]
+        self._crime, self._date = state["crime"], state["date"]
+        self._crime_codes = state["crime_codes"]
+        self.tree = state["tree"]
+        self._lat_order = np.argsort(self._lat, kind="stable")
+        self._lat_sorted = self._lat[self._lat_order]
+        self.n = self.m = len(self._lat)
+        self._alive = np.ones(self.n, dtype=bool)
+        self._pos = {fir_id: i for i, fir_id in enumerate(self._fir_id.tolist())}
+        if state["store_version"] != version:
+            # written to since the save: re-adds come back with a new seq, so
+            # the replay is complete unless rows went missing some other way
+            rows = self.store.rows_since(self.last_seq)
+            if rows:
+                self._append(rows)
+            if self.n - self.dead != self.store.count(has_geo=True):
+                self._reset()
+
+    # -- updates --------------------------------------------------------
+
+    def _grow(self, extra):
+        need = self.n + extra
+        if need <= len(self._lat):
+            return
+        cap = max(need, 2 * len(self._lat), 1024)
+        for name, fill in (("_fir_id", None), ("_lat", 0.0), ("_lon", 0.0), ("_crime", -1),
+                           ("_date", ""), ("_alive", False)):
+            old = getattr(self, name)
+            new = np.full(cap, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _code(self, crime_type):
+        if crime_type is None:
+            return -1
+        return self._crime_codes.setdefault(crime_type, len(self._crime_codes))
+
+    def sync(self) -> "SpatialIndex":
+        """Catch up on FIRs stored since the last call"""
+        with self._lock:
+            rows = self.store.rows_since(self.last_seq)
+            if rows:
+                self._append(rows)
+                if (self.n - self.m) + self.dead > max(SPATIAL_REBUILD_MIN,
+                                                       SPATIAL_REBUILD_FRACTION * self.m):
+                    self._rebuild()
+            return self
+
+    def _append(self, rows):
+        # (seq, fir_id, lat, lon, crime_type, date_iso); a re-added fir_id
+        # retires its old point, with or without a new location
+        for _, fir_id, *_ in rows:
+            old = self._pos.pop(fir_id, None)
+            if old is not None and self._alive[old]:
+                self._alive[old] = False
+                self.dead += 1
+        geo = [r for r in rows if r[2] is not None and r[3] is not None]
+        self._grow(len(geo))
+        s, e = self.n, self.n + len(geo)
+        if geo:
+            self._fir_id[s:e] = [r[1] for r in geo]
+            self._lat[s:e] = [r[2] for r in geo]
+            self._lon[s:e] = [r[3] for r in geo]
+            self._crime[s:e] = [self._code(r[4]) for r in geo]
+            self._date[s:e] = [r[5] or "" for r in geo]
+            self._alive[s:e] = True
+            self._pos.update((r[1], s + k) for k, r in enumerate(geo))
+        self.n = e
+        self.last_seq = rows[-1][0]
+
+    def _rebuild(self):
+        from sklearn.neighbors import BallTree
+
+        keep = np.flatnonzero(self._alive[:self.n])
+        for name in ("_fir_id", "_lat", "_lon", "_crime", "_date"):
+            setattr(self, name, getattr(self, name)[keep].copy())
+        self.n = self.m = len(keep)
+        self.dead = 0
+        self._alive = np.ones(self.n, dtype=bool)
+        self._pos = {fir_id: i for i, fir_id in enumerate(self._fir_id.tolist())}
+        self.tree = BallTree(np.radians(np.column_stack([self._lat, self._lon])),
+                             metric="haversine") if self.n else None
+        self._lat_order = np.argsort(self._lat, kind="stable")
+        self._lat_sorted = self._lat[self._lat_order]
+        if self.path:
+            self._save()
+
+    # -- queries --------------------------------------------------------
+
+    def _mask(self, idx, crime_type, date_from, date_to):
+        mask = self._alive[idx]
+        if crime_type is not None:
+            mask &= self._crime[idx] == self._crime_codes.get(crime_type, -2)
+        if date_from is not None or date_to is not None:
+            dates = self._date[idx]
+            mask &= dates != ""
+            if date_from is not None:
+                mask &= dates >= date_from
+            if date_to is not None:
+                mask &= dates <= date_to
+        return mask
+
+    def _delta_distances(self, lat, lon):
+        idx = np.arange(self.m, self.n)
+        return idx, haversine_km(lat, lon, self._lat[idx], self._lon[idx])
+
+    def _result(self, idx, dist_km=None):
+        names = {code: name for name, code in self._crime_codes.items()}
+        out = [
+            {"fir_id": fir_id, "lat": lat, "lon": lon, "crime_type": names.get(crime), "date": day or None}
+            for fir_id, lat, lon, crime, day in zip(
+                self._fir_id[idx].tolist(), self._lat[idx].tolist(), self._lon[idx].tolist(),
+                self._crime[idx].tolist(), self._date[idx].tolist()
+            )
+        ]
+        if dist_km is not None:
+            for row, d in zip(out, np.round(np.asarray(dist_km) * 1000, 1).tolist()):
+                row["distance_m"] = d
+        return out
+
+    def radius(self, lat: float, lon: float, radius_m: float, crime_type: Optional[str] = None,
+               date_from: Optional[str] = None, date_to: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict]:
+        """FIRs within radius_m of a point, nearest first"""
+        radius_km = radius_m / 1000.0
+        with self._lock:
+            idx = [np.empty(0, dtype=np.int64)]
+            dist = [np.empty(0)]
+            if self.tree is not None:
+                i, d = self.tree.query_radius(np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM,
+                                              return_distance=True)
+                idx.append(i[0].astype(np.int64))
+                dist.append(d[0] * EARTH_RADIUS_KM)
+            di, dd = self._delta_distances(lat, lon)
+            idx.append(di[dd <= radius_km])
+            dist.append(dd[dd <= radius_km])
+            idx, dist = np.concatenate(idx), np.concatenate(dist)
+
+            keep = self._mask(idx, crime_type, date_from, date_to)
+            idx, dist = idx[keep], dist[keep]
+            order = np.argsort(dist, kind="stable")[:limit]
+            return self._result(idx[order], dist[order])
+
+    def nearest(self, lat: float, lon: float, k: int, crime_type: Optional[str] = None,
+                date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict]:
+        """k nearest FIRs matching the filters, nearest first"""
+        with self._lock:
+            di, dd = self._delta_distances(lat, lon)
+            keep = self._mask(di, crime_type, date_from, date_to)
+            di, dd = di[keep], dd[keep]
+            if len(dd) > k:
+                top = np.argpartition(dd, k)[:k]
+                di, dd = di[top], dd[top]
+
+            ti, td = np.empty(0, dtype=np.int64), np.empty(0)
+            if self.tree is not None:
+                # ask the tree for more than k until enough survive the
+                # filters, or the whole tree has been returned; the first
+                # ask is sized by the filters' hit rate on a sample
+                sample = np.arange(0, self.m, max(1, self.m // 4096))
+                rate = max(self._mask(sample, crime_type, date_from, date_to).mean(), 1 / len(sample))
+                want = min(max(k, int(2 * k / rate)), self.m)
+                while True:
+                    d, i = self.tree.query(np.radians([[lat, lon]]), k=want)
+                    i, d = i[0].astype(np.int64), d[0] * EARTH_RADIUS_KM
+                    hit = self._mask(i, crime_type, date_from, date_to)
+                    if hit.sum() >= k or want == self.m:
+                        ti, td = i[hit], d[hit]
+                        break
+                    want = min(want * 4, self.m)
+
+            idx, dist = np.concatenate([ti, di]), np.concatenate([td, dd])
+            order = np.argsort(dist, kind="stable")[:k]
+            return self._result(idx[order], dist[order])
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+             crime_type: Optional[str] = None, date_from: Optional[str] = None,
+             date_to: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """FIRs inside a lat/lon box, in store order"""
+        with self._lock:
+            # latitude band of the tree from its sorted order, delta scanned
+            lo = np.searchsorted(self._lat_sorted, min_lat, "left")
+            hi = np.searchsorted(self._lat_sorted, max_lat, "right")
+            idx = np.concatenate([np.sort(self._lat_order[lo:hi]), np.arange(self.m, self.n)])
+            lat, lon = self._lat[idx], self._lon[idx]
+            idx = idx[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)]
+            idx = idx[self._mask(idx, crime_type, date_from, date_to)]
+            return self._result(idx[:limit])
+
+    def location_of(self, fir_id: str) -> Optional[Dict]:
+        with self._lock:
+            i = self._pos.get(fir_id)
+            if i is None:
+                return None
+            return self._result(np.array([i]))[0]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "points": self.n - self.dead,
+                "tree_points": self.m,
+                "delta_points": self.n - self.m,
+                "dead_points": self.dead,
+                "last_seq": self.last_seq
+            }
+
+
+_INDEX: Optional[SpatialIndex] = None
+_INDEX_LOCK = Lock()
+
+
+def get_spatial_index() -> SpatialIndex:
+    """The index over the FIR store, synced with it on every call"""
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            from backend.fir_store import get_store
+            _INDEX = SpatialIndex(get_store())
+    return _INDEX.sync()
@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import alerts
+from backend.dev.stub_llm import StubLLM
+from backend.services.groq_message_service import (
+    SYSTEM_PROMPT,
+    AlertMessageService,
+    risk_bucket,
+    template_message
+)
+
+CONTEXT = {"zone": "Dadar", "crime_type": "Theft", "risk": 0.9, "event": "Ganesh Festival"}
+
+
+def generate_fn(stub):
+    """The chat completions request the Groq SDK makes, over requests"""
+    session = requests.Session()
+
+    def generate(context):
+        prompt = (f"Area: {context['zone']}\nIncident Type: {context['crime_type']}\n"
+                  f"Risk Level: {risk_bucket(context.get('risk'))}\n"
+                  f"Event Context: {context.get('event') or 'None'}")
+        r = session.post(stub.url, json={"model": "stub", "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]},
+            timeout=10)
+        r.raise_for_status()
+        return r.json()["choices"][0]["message"]["content"].strip()
+    return generate
+
+
+@pytest.fixture
+def service_for():
+    services = []
+
+    def make(stub, **kw):
+        service = AlertMessageService(generate_fn(stub), **kw)
+        services.append(service)
+        return service
+    yield make
+    for service in services:
+        service.close()
+
+
+def test_second_lookup_is_a_hit(service_for):
+    with StubLLM() as stub:
+        service = service_for(stub)
+        first = service.get(CONTEXT)
+        # same bucket, different spelling
+        second = service.get({**CONTEXT, "zone": " dadar ", "risk": 0.95})
+        stats = service.get_stats()
+
+    assert first[1] == second[1] == "groq"
+    assert first[0] == second[0] and "Dadar" in first[0]
+    assert stub.requests == 1
+    assert (stats["hits"], stats["misses"], stats["llm_calls"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_concurrent_misses_share_one_call(service_for):
+    with StubLLM(latency=0.3) as stub:
+        service = service_for(stub, timeout=5)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: service.get(CONTEXT), range(8)))
+        stats = service.get_stats()
+
+    assert {source for _, source in results} == {"groq"}
+    assert len({message for message, _ in results}) == 1
+    assert stub.requests == 1
+    assert stats["llm_calls"] == 1
+    assert stats["coalesced"] == 7
+
+
+def test_slow_llm_answers_with_a_template_then_replaces_it(service_for):
+    with StubLLM(latency=0.5) as stub:
+        service = service_for(stub, timeout=0.05)
+        message, source = service.get(CONTEXT)
+        assert (message, source) == (template_message(CONTEXT), "template")
+
+        # cached template, no second call while the first is running
+        assert service.get(CONTEXT) == (message, "template")
+        stats = service.get_stats()
+        assert (stats["timeouts"], stats["template_hits"], stats["hits"]) == (1, 1, 0)
+        assert stats["hit_rate"] == 0.0
+
+        service.wait()
+        late, source = service.get(CONTEXT)
+        stats = service.get_stats()
+
+    assert source == "groq" and late != message
+    assert stub.requests == 1
+    assert stats["hits"] == 1
+
+
+def test_failing_llm_falls_back_to_a_cached_template(service_for):
+    with StubLLM(fail_rate=1.0) as stub:
+        service = service_for(stub, timeout=5)
+        first = service.get(CONTEXT)
+        second = service.get(CONTEXT)
+        stats = service.get_stats()
+
+    assert first == second == (template_message(CONTEXT), "template")
+    assert stub.requests == 1
+    assert (stats["llm_errors"], stats["templates"], stats["template_hits"]) == (1, 1, 1)
+    assert stats["hits"] == 0
+
+
+def test_template_expires_and_the_llm_is_asked_again(service_for):
+    with StubLLM(fail_rate=1.0) as stub:
+        service = service_for(stub, timeout=5, fallback_ttl=0)
+        service.get(CONTEXT)
+        stub.fail_rate = 0.0
+        message, source = service.get(CONTEXT)
+
+    assert source == "groq"
+    assert stub.requests == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    def pregenerate(**kw):
+        calls.append(kw)
+        return {"hotspots": 0, "contexts": 0, "queued": 0}
+
+    monkeypatch.setattr(alerts, "pregenerate_for_hotspots", pregenerate)
+    app = FastAPI()
+    app.include_router(alerts.router, prefix="/alerts")
+    client = TestClient(app)
+    client.calls = calls
+    return client
+
+
+def test_pregenerate_defaults(client):
+    assert client.post("/alerts/messages/pregenerate").status_code == 200
+    assert client.post("/alerts/messages/pregenerate", json={"events": ["Ganesh Festival"], "top": 5}).status_code == 200
+    assert client.calls == [
+        {"events": [None], "top": 20, "eps_km": 3, "min_samples": 2},
+        {"events": ["Ganesh Festival"], "top": 5, "eps_km": 3, "min_samples": 2}
+    ]
+
+
+@pytest.mark.parametrize("body", [
+    {"events": "Ganesh Festival"},
+    {"top": 0},
+    {"top": 10000},
+    {"eps_km": 0},
+    {"eps_km": 1000},
+    {"min_samples": 0}
+])
+def test_pregenerate_rejects_bad_bodies(client, body):
+    assert client.post("/alerts/messages/pregenerate", json=body).status_code == 422
+    assert client.calls == []
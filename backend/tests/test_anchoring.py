@@ -0,0 +1,73 @@
+import hashlib
+import sqlite3
+
+from backend.dev.local_chain import LocalChain
+from backend.services.anchoring import MerkleAnchor, merkle_leaf, verify_proof
+
+
+def _hashes(n):
+    return [hashlib.sha256(f"FIR-{i}".encode()).hexdigest() for i in range(n)]
+
+
+def test_batch_proofs_verify_against_anchored_root(tmp_path):
+    chain = LocalChain()
+    anchor = MerkleAnchor(chain.anchor, db_path=str(tmp_path / "anchors.db"), window=60, max_batch=1000,
+                          root_fn=chain.anchored_root)
+    try:
+        items = _hashes(7)      # odd count: the last node is carried up
+        futures = [anchor.submit(h) for h in items]
+        anchor.flush()
+        proofs = [f.result(timeout=10) for f in futures]
+    finally:
+        anchor.close()
+
+    assert len(chain.blocks) == 1
+    root = chain.blocks[0]["root"]
+    assert chain.blocks[0]["size"] == len(items)
+    for item_hash, proof in zip(items, proofs):
+        assert proof["root"] == root
+        assert chain.is_anchored(proof["root"])
+        assert verify_proof(item_hash, proof["proof"], root)
+
+
+def test_tampered_leaf_fails(tmp_path):
+    chain = LocalChain()
+    anchor = MerkleAnchor(chain.anchor, db_path=str(tmp_path / "anchors.db"), window=60, max_batch=4,
+                          root_fn=chain.anchored_root)
+    try:
+        items = _hashes(4)      # a full batch is anchored without flush()
+        proofs = [f.result(timeout=10) for f in [anchor.submit(h) for h in items]]
+        assert all(anchor.verify(h) for h in items)
+        assert not anchor.verify(hashlib.sha256(b"unknown").hexdigest())
+    finally:
+        anchor.close()
+
+    root = chain.blocks[0]["root"]
+    tampered = hashlib.sha256(b"FIR-0 edited").hexdigest()
+    assert not verify_proof(tampered, proofs[0]["proof"], root)
+    # a genuine leaf with another leaf's proof fails too
+    assert not verify_proof(items[0], proofs[1]["proof"], root)
+
+
+def test_verify_checks_the_root_on_chain(tmp_path):
+    chain = LocalChain()
+    db_path = str(tmp_path / "anchors.db")
+    anchor = MerkleAnchor(chain.anchor, db_path=db_path, window=60, max_batch=2, root_fn=chain.anchored_root)
+    try:
+        items = _hashes(2)
+        [f.result(timeout=10) for f in [anchor.submit(h) for h in items]]
+        assert all(anchor.verify(h) for h in items)
+
+        # rewrite the local record: a forged batch whose proofs are
+        # consistent with its own root, which was never anchored
+        forged = hashlib.sha256(b"forged").hexdigest()
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("UPDATE anchor_items SET proof = '[]' WHERE item_hash = ?", (items[0],))
+            conn.execute("UPDATE anchor_batches SET root = ?", (merkle_leaf(items[0]).hex(),))
+        conn.close()
+        assert verify_proof(items[0], [], merkle_leaf(items[0]).hex())
+        assert not anchor.verify(items[0])
+        assert not anchor.verify(forged)
+    finally:
+        anchor.close()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+
+pytest.importorskip("eth_tester")
+from web3 import EthereumTesterProvider, Web3
+
+from backend.services.anchoring import MerkleAnchor, verify_proof
+from backend.services.blockchain import (
+    BlockchainClient,
+    read_merkle_root_from_chain,
+    store_merkle_root_on_chain
+)
+
+# CaseRegistry's write calls as blockchain.py makes them; the repo's ABI
+# file is empty, so the test brings its own
+ABI = [
+    {"type": "function", "name": "addFIR", "stateMutability": "nonpayable", "outputs": [],
+     "inputs": [{"name": "firHash", "type": "string"}, {"name": "policeStation", "type": "string"},
+                {"name": "ipcSections", "type": "string"}]},
+    {"type": "function", "name": "addEvidence", "stateMutability": "nonpayable", "outputs": [],
+     "inputs": [{"name": "fileHash", "type": "string"}, {"name": "evType", "type": "uint8"},
+                {"name": "description", "type": "string"}]},
+]
+# init code deploying a contract whose runtime is a single STOP: every
+# call succeeds, and the calldata stays on chain in the transaction
+ACCEPT_ALL = "0x6001600c60003960016000f300"
+
+
+def _hashes(n):
+    return [hashlib.sha256(f"FIR-{i}".encode()).hexdigest() for i in range(n)]
+
+
+@pytest.fixture
+def w3():
+    return Web3(EthereumTesterProvider())
+
+
+@pytest.fixture
+def client(w3, tmp_path):
+    tx = w3.eth.send_transaction({"from": w3.eth.accounts[0], "data": ACCEPT_ALL})
+    address = w3.eth.get_transaction_receipt(tx).contractAddress
+    abi_path = tmp_path / "CaseRegistry.json"
+    abi_path.write_text(json.dumps({"abi": ABI}))
+    return BlockchainClient(contract_address=address, abi_path=abi_path, w3=w3)
+
+
+def test_merkle_roots_are_anchored_and_read_back_from_the_chain(client, tmp_path):
+    anchor = MerkleAnchor(partial(store_merkle_root_on_chain, client=client),
+                          db_path=str(tmp_path / "anchors.db"), window=60, max_batch=1000,
+                          root_fn=partial(read_merkle_root_from_chain, client=client))
+    try:
+        items = _hashes(5)
+        futures = [anchor.submit(h) for h in items]
+        anchor.flush()
+        proofs = [f.result(timeout=30) for f in futures]
+        assert all(anchor.verify(h) for h in items)
+    finally:
+        anchor.close()
+
+    root, tx_hash = proofs[0]["root"], proofs[0]["tx_hash"]
+    assert {(p["root"], p["tx_hash"]) for p in proofs} == {(root, tx_hash)}
+    assert client.anchored_root(tx_hash) == root
+    receipt = client.w3.eth.get_transaction_receipt("0x" + tx_hash)
+    assert receipt.blockNumber == proofs[0]["block_number"]
+    for item_hash, proof in zip(items, proofs):
+        assert verify_proof(item_hash, proof["proof"], client.anchored_root(tx_hash))
+
+
+def test_only_merkle_root_transactions_count_as_anchors(client, w3):
+    fir = client.transact("addFIR", "ab" * 32, "Dadar PS", "IPC 379").result(timeout=30)
+    note = client.transact("addEvidence", "cd" * 32, 3, "cctv still").result(timeout=30)
+    cctv = client.transact("addEvidence", "ef" * 32, 0, "merkle-root:4").result(timeout=30)
+    transfer = w3.eth.send_transaction({"from": w3.eth.accounts[1], "to": w3.eth.accounts[2], "value": 1})
+
+    for receipt in (fir, note, cctv):
+        assert client.anchored_root(receipt.transactionHash.hex()) is None
+    assert client.anchored_root(transfer.hex()) is None
+    assert client.anchored_root("00" * 32) is None
+    assert store_merkle_root_on_chain("12" * 32, 4, client)["tx_hash"]
+
+
+def test_concurrent_transactions_get_consecutive_nonces(client, w3):
+    client.connect()
+    start = w3.eth.get_transaction_count(w3.eth.accounts[0])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = list(pool.map(lambda h: client.transact("addFIR", h, "Dadar PS", "IPC 379"), _hashes(20)))
+    receipts = [f.result(timeout=30) for f in futures]
+
+    assert all(r.status == 1 for r in receipts)
+    nonces = sorted(w3.eth.get_transaction(r.transactionHash)["nonce"] for r in receipts)
+    assert nonces == list(range(start, start + 20))
+
+
+def test_nonce_is_reread_after_a_rejected_transaction(client, w3):
+    client.transact("addFIR", "ab" * 32, "Dadar PS", "IPC 379").result(timeout=30)
+    # another sender on the same account moves the nonce on
+    w3.eth.send_transaction({"from": w3.eth.accounts[0], "to": w3.eth.accounts[1], "value": 1})
+
+    with pytest.raises(Exception):
+        client.transact("addFIR", "cd" * 32, "Dadar PS", "IPC 379")
+    assert client.transact("addFIR", "cd" * 32, "Dadar PS", "IPC 379").result(timeout=30).status == 1
+
+
+def test_receipt_poller_retries_transient_errors(client, w3, monkeypatch):
+    client.connect()
+    real = w3.eth.get_transaction_receipt
+    calls = []
+
+    def flaky(tx_hash):
+        calls.append(tx_hash)
+        if len(calls) <= 2:
+            raise ConnectionError("node restarting")
+        return real(tx_hash)
+
+    monkeypatch.setattr(w3.eth, "get_transaction_receipt", flaky)
+    result = store_merkle_root_on_chain("12" * 32, 4, client)
+
+    assert len(calls) >= 3
+    assert client.anchored_root(result["tx_hash"]) == "12" * 32
@@ -0,0 +1,65 @@
+import pytest
+
+from backend.services import crime_classifier
+from backend.services.crime_classifier import CrimeClassifier, parse_sections, resolve_crime_type
+
+
+@pytest.mark.parametrize("sections, expected", [
+    ("354A", {"354A"}),
+    ("IPC 376D", {"376D"}),
+    ("302 r/w 34", {"302", "34"}),
+    ("302r/w 34", {"302", "34"}),
+    ("307 R/W 34", {"307", "34"}),
+    ("IPC 302, 34 r/w 498a", {"302", "34", "498A"}),
+    ("498A/34", {"498A", "34"}),
+    ("IPC 1302", {"1302"}),
+])
+def test_parse_sections(sections, expected):
+    assert parse_sections(sections) == expected
+
+
+@pytest.mark.parametrize("sections, expected", [
+    # lettered sections the table does not list count as their base section
+    ("354A", "Sexual Harassment"),
+    ("IPC 354D", "Sexual Harassment"),
+    ("302 r/w 34", "Murder"),
+    ("302r/w 34", "Murder"),
+    ("IPC 307 R/W 34", "Attempt to Murder"),
+    ("IPC 376D", "Unknown"),
+    ("IPC 1302", "Unknown"),
+    ("IPC 4201", "Unknown"),
+])
+def test_sections(sections, expected):
+    assert resolve_crime_type(None, sections, None) == expected
+
+
+def test_lettered_section_in_the_table_wins_over_its_base():
+    classifier = CrimeClassifier([("Gang Rape", ["376D"], []), ("Rape", ["376"], [])])
+    assert classifier.classify(None, "IPC 376D", None) == ("Gang Rape", "section")
+    assert classifier.classify(None, "IPC 376B", None) == ("Rape", "section")
+    assert classifier.classify(None, "IPC 376", None) == ("Rape", "section")
+
+
+@pytest.mark.parametrize("trie_min", [1, 10 ** 6])
+def test_keyword_matching_is_the_same_either_way(monkeypatch, trie_min):
+    monkeypatch.setattr(crime_classifier, "KEYWORD_TRIE_MIN", trie_min)
+    classifier = CrimeClassifier()
+    rows = [
+        (None, None, "His WALLET was stolen near the station"),
+        (None, None, "they attacked him and he was killed"),
+        (None, None, "heavy congestion after a traffic jam"),
+        (None, None, "nothing of note"),
+        (None, "IPC 379", "he was killed"),
+        ("Chain Snatching", "IPC 302", "killed"),
+        (None, None, None),
+    ]
+    assert classifier.classify_batch(rows) == [
+        ("Theft", "keyword"),
+        ("Murder", "keyword"),
+        ("Traffic Obstruction", "keyword"),
+        ("Unknown", "default"),
+        ("Theft", "section"),
+        ("Chain Snatching", "extracted"),
+        ("Unknown", "default"),
+    ]
+    assert [classifier.classify(*row) for row in rows] == classifier.classify_batch(rows)
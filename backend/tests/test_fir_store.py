@@ -0,0 +1,30 @@
+from backend.fir_store import FIRStore
+
+FIRS = [
+    {"fir_id": "F1", "status": "Open", "crime_type": "Theft", "date": "01/03/2024",
+     "department_tags": ["Crime Branch", "Cyber Cell"], "geo": {"lat": 19.01, "lon": 72.81}},
+    {"fir_id": "F2", "status": "Closed", "crime_type": "Theft", "date": "02/03/2024",
+     "department_tags": ["Crime Branch"]},
+    {"fir_id": "F3", "status": "Open", "crime_type": "Murder", "date": "03/03/2024",
+     "department_tags": ["Crime Branch"], "geo": {"lat": 19.02, "lon": 72.82}},
+]
+
+
+def test_department_counts_take_the_other_filters():
+    store = FIRStore(":memory:")
+    store.add_firs(FIRS)
+
+    assert store.count_by("department") == {"Crime Branch": 3, "Cyber Cell": 1}
+    assert store.count_by("department", status="Open", has_geo=True) == {"Crime Branch": 2, "Cyber Cell": 1}
+    assert store.count_by("department", crime_type="Theft", date_from="2024-03-02") == {"Crime Branch": 1}
+    assert store.count_by("department", department="Cyber Cell") == {"Crime Branch": 3, "Cyber Cell": 1}
+    assert store.aggregates("department") == {"Crime Branch": 3, "Cyber Cell": 1}
+
+
+def test_department_filter_combines_with_the_others():
+    store = FIRStore(":memory:")
+    store.add_firs(FIRS)
+
+    assert [f["fir_id"] for f in store.query(department="Crime Branch", status="Open", newest_first=True)] == ["F3", "F1"]
+    assert store.count(department="Crime Branch", crime_type="Theft") == 2
+    assert store.count_by("status", department="Crime Branch") == {"Open": 2, "Closed": 1}
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from backend.services import geocoding_service
+from backend.services.gazetteer import GAZETTEER_CSV, Gazetteer
+from backend.services.geocode_cache import GeocodeCache
+
+
+@pytest.fixture(scope="module")
+def gazetteer(tmp_path_factory):
+    index = tmp_path_factory.mktemp("gazetteer") / "gazetteer.npz"
+    return Gazetteer.load(GAZETTEER_CSV, str(index))
+
+
+@pytest.mark.parametrize("query", [
+    "Link Road",
+    "Pune Station",
+    "Road",
+    "West",
+    "Near Station",
+    "Goregaon Link Road",
+])
+def test_generic_words_do_not_match(gazetteer, query):
+    assert gazetteer.lookup(query) is None
+
+
+@pytest.mark.parametrize("query, place", [
+    ("Andheri West", "Andheri West"),
+    ("andheri e", "Andheri East"),
+    ("Bandra (W)", "Bandra West"),
+    ("Borivli west", "Borivali West"),
+    ("Ghatkoper", "Ghatkopar"),
+    ("Borivali Station", "Borivali Station"),
+    ("Opp Dadar Station", "Dadar Police Station"),
+    ("Mira Road", "Mira Road"),
+])
+def test_distinctive_words_match(gazetteer, query, place):
+    assert gazetteer.lookup(query)["display_name"] == f"{place}, Mumbai"
+
+
+def test_unmatched_query_falls_back_to_nominatim(gazetteer, monkeypatch):
+    class NoCache:
+        def get(self, query):
+            return geocoding_service.MISSING
+
+        def put(self, query, result):
+            pass
+
+    asked = []
+    monkeypatch.setattr(geocoding_service, "get_gazetteer", lambda: gazetteer)
+    monkeypatch.setattr(geocoding_service, "get_cache", lambda: NoCache())
+    monkeypatch.setattr(geocoding_service, "NOMINATIM_FALLBACK", True)
+    monkeypatch.setattr(geocoding_service, "_nominatim",
+                        lambda q: asked.append(q) or {"lat": 1.0, "lon": 2.0, "display_name": q})
+
+    assert geocoding_service.geocode_location("Goregaon Link Road")["lat"] == 1.0
+    assert asked == ["Goregaon Link Road"]
+    assert geocoding_service.geocode_location("Dadar")["source"] == "gazetteer"
+    assert asked == ["Goregaon Link Road"]
+
+
+@pytest.fixture
+def slow_nominatim(monkeypatch):
+    asked = []
+    release = threading.Event()
+
+    def nominatim(q):
+        asked.append(q)
+        release.wait(5)
+        if release.error:
+            raise requests.ConnectionError("nominatim down")
+        return {"lat": 1.0, "lon": 2.0, "display_name": q}
+
+    release.error = False
+    release.asked = asked
+    cache = GeocodeCache(":memory:")
+    monkeypatch.setattr(geocoding_service, "get_gazetteer", lambda: None)
+    monkeypatch.setattr(geocoding_service, "get_cache", lambda: cache)
+    monkeypatch.setattr(geocoding_service, "NOMINATIM_FALLBACK", True)
+    monkeypatch.setattr(geocoding_service, "_nominatim", nominatim)
+    return release
+
+
+def lookup_concurrently(queries, release):
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futures = [pool.submit(geocoding_service.geocode_location, q) for q in queries]
+        time.sleep(0.2)
+        release.set()
+    return futures
+
+
+def test_concurrent_misses_share_one_nominatim_request(slow_nominatim):
+    queries = ["Kurla Depot Lane", "kurla depot lane", "Kurla  Depot-Lane"] * 3
+    results = [f.result() for f in lookup_concurrently(queries, slow_nominatim)]
+
+    assert len(slow_nominatim.asked) == 1
+    assert all(r == results[0] for r in results)
+    assert geocoding_service.geocode_location("KURLA DEPOT LANE") == results[0]
+    assert len(slow_nominatim.asked) == 1
+    assert geocoding_service._inflight == {}
+
+
+def test_a_failed_shared_request_fails_every_waiter_and_is_not_cached(slow_nominatim):
+    slow_nominatim.error = True
+    futures = lookup_concurrently(["Kurla Depot Lane"] * 4, slow_nominatim)
+
+    for f in futures:
+        with pytest.raises(requests.ConnectionError):
+            f.result()
+    assert len(slow_nominatim.asked) == 1
+
+    slow_nominatim.error = False
+    assert geocoding_service.geocode_location("Kurla Depot Lane")["lat"] == 1.0
+    assert len(slow_nominatim.asked) == 2
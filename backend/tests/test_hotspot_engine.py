@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.cluster import DBSCAN
+
+from backend import fir_store
+from backend.api import pipeline
+from backend.services import hotspot_engine
+from backend.services.hotspot_engine import EARTH_RADIUS_KM, HotspotEngine, StoreHotspots
+
+PARAMS = [(3, 2), (0.5, 3), (1, 5)]
+
+
+def points(seed, n):
+    """Clustered and uniform points over Mumbai, (lat, lon) degrees"""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform([18.9, 72.8], [19.3, 73.0], (8, 2))
+    clustered = centers[rng.integers(0, len(centers), n)] + rng.normal(0, 0.01, (n, 2))
+    noise = rng.uniform([18.9, 72.8], [19.3, 73.0], (n // 3, 2))
+    pts = np.vstack([clustered, noise])
+    rng.shuffle(pts)
+    return pts[:n]
+
+
+def dbscan(pts, eps_km, min_samples):
+    return DBSCAN(eps=eps_km / EARTH_RADIUS_KM, min_samples=min_samples,
+                  metric="haversine", algorithm="ball_tree").fit_predict(np.radians(pts))
+
+
+@pytest.mark.parametrize("eps_km, min_samples", PARAMS)
+def test_bulk_labels_match_dbscan(eps_km, min_samples):
+    pts = points(0, 3000)
+    engine = HotspotEngine(eps_km, min_samples)
+    engine.add(pts[:, 0], pts[:, 1])
+    assert np.array_equal(engine.labels(), dbscan(pts, eps_km, min_samples))
+
+
+@pytest.mark.parametrize("eps_km, min_samples", PARAMS)
+def test_incremental_labels_match_dbscan(eps_km, min_samples):
+    pts = points(1, 1500)
+    engine = HotspotEngine(eps_km, min_samples)
+    # single points, then growing batches, checked after every step
+    sizes = [1] * 100 + [7, 50, 343, 1000]
+    at = 0
+    for size in sizes:
+        batch = pts[at:at + size]
+        if size == 1:
+            engine.add([batch[0, 0]], [batch[0, 1]])
+        else:
+            engine.add(batch[:, 0], batch[:, 1])
+        at += len(batch)
+        if size > 1 or at % 25 == 0:
+            assert np.array_equal(engine.labels(), dbscan(pts[:at], eps_km, min_samples))
+
+
+def _firs(pts, start=0):
+    return [{"fir_id": f"FIR-{start + i}", "crime_type": "Theft", "date": "2024-01-01",
+             "geo": {"lat": float(lat), "lon": float(lon)}} for i, (lat, lon) in enumerate(pts)]
+
+
+def _store_labels(store, eps_km, min_samples):
+    rows = [r for r in store.rows_since(0) if r[2] is not None]
+    return dbscan(np.array([[r[2], r[3]] for r in rows]), eps_km, min_samples)
+
+
+def test_store_hotspots_follow_new_and_readded_firs(tmp_path):
+    store = fir_store.FIRStore(str(tmp_path / "firs.db"))
+    pts = points(2, 1200)
+    hotspots = StoreHotspots(store, 0.5, 3)
+
+    store.add_firs(_firs(pts[:800]))
+    assert np.array_equal(hotspots.sync().labels(), _store_labels(store, 0.5, 3))
+
+    store.add_firs(_firs(pts[800:], 800))
+    assert np.array_equal(hotspots.sync().labels(), _store_labels(store, 0.5, 3))
+
+    # re-added FIRs move to new coordinates and to the end of the store
+    moved = points(3, 100)
+    store.add_firs(_firs(moved, 300))
+    engine = hotspots.sync()
+    assert engine.n == 1200
+    assert np.array_equal(engine.labels(), _store_labels(store, 0.5, 3))
+    store.close()
+
+
+def test_engine_cache_is_bounded(tmp_path, monkeypatch):
+    store = fir_store.FIRStore(str(tmp_path / "firs.db"))
+    monkeypatch.setattr(fir_store, "get_store", lambda: store)
+    monkeypatch.setattr(hotspot_engine, "_ENGINES", type(hotspot_engine._ENGINES)())
+
+    for i in range(20):
+        hotspot_engine.get_store_hotspots(0.5 + i * 0.01, 3)
+    assert len(hotspot_engine._ENGINES) == hotspot_engine.HOTSPOT_ENGINES_MAX
+    # most recently used kept
+    assert (0.5 + 19 * 0.01, 3) in hotspot_engine._ENGINES
+
+    with pytest.raises(ValueError):
+        hotspot_engine.get_store_hotspots(0.001, 3)
+    store.close()
+
+
+@pytest.mark.parametrize("eps_km", ["0", "0.001", "-1", "1000"])
+def test_bad_eps_is_rejected_with_422(eps_km):
+    app = FastAPI()
+    app.include_router(pipeline.router, prefix="/pipeline")
+    response = TestClient(app).get("/pipeline/hotspots", params={"eps_km": eps_km})
+    assert response.status_code == 422
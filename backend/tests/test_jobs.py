@@ -0,0 +1,101 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.yolo_detection import jobs, model
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    """submit_job on one thread, with a fake analysis that leaves evidence behind"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.release = threading.Event()
+    executor.release.set()
+    # a job's done callback runs on the worker, so a no-op behind it waits for both
+    executor.drain = lambda: executor.submit(lambda: None).result(timeout=10)
+    monkeypatch.setattr(model, "EVIDENCE_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "_JOBS", {})
+    monkeypatch.setattr(jobs, "_progress", {})
+    monkeypatch.setattr(jobs, "_get_executor", lambda: executor)
+
+    def run_job(job_id, video_path, suspect_path, name, progress):
+        evidence_dir = os.path.join(model.EVIDENCE_DIR, job_id)
+        os.makedirs(os.path.join(evidence_dir, ".pending_0"))
+        progress[job_id] = (10, 10)
+        executor.release.wait()
+        if name == "broken":
+            raise RuntimeError("unreadable video")
+        return {"evidence_files": []}
+
+    monkeypatch.setattr(jobs, "_run_job", run_job)
+    yield executor
+    executor.release.set()
+    executor.shutdown()
+
+
+def test_finished_jobs_beyond_the_cap_are_evicted(worker, monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_FINISHED_JOBS", 3)
+    ids = [jobs.submit_job("v.mp4") for _ in range(6)]
+    worker.drain()
+
+    assert list(jobs._JOBS) == ids[3:]
+    assert set(jobs._progress) == set(ids[3:])
+    assert sorted(os.listdir(model.EVIDENCE_DIR)) == sorted(ids[3:])
+    assert jobs.get_job(ids[0]) is None
+
+
+def test_expired_jobs_are_evicted_and_running_ones_kept(worker):
+    done = jobs.submit_job("v.mp4")
+    worker.drain()
+    worker.release.clear()
+    running = jobs.submit_job("v.mp4")
+
+    jobs._JOBS[done]["finished_at"] = (datetime.utcnow() - timedelta(seconds=jobs.JOB_TTL_SECONDS + 1)).isoformat()
+    assert jobs._evict_finished() == [done]
+    assert list(jobs._JOBS) == [running]
+    assert not os.path.exists(os.path.join(model.EVIDENCE_DIR, done))
+
+    worker.release.set()
+    worker.drain()
+    assert jobs.get_job(running)["status"] == "completed"
+
+
+def test_failed_job_keeps_its_status_but_not_its_folder(worker):
+    job_id = jobs.submit_job("v.mp4", name="broken")
+    worker.drain()
+
+    job = jobs.get_job(job_id)
+    assert (job["status"], job["error"]) == ("failed", "unreadable video")
+    assert not os.path.exists(os.path.join(model.EVIDENCE_DIR, job_id))
+
+
+def test_sync_uploads_get_their_own_files(tmp_path, monkeypatch):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    monkeypatch.setattr(model, "UPLOAD_DIR", str(uploads))
+    monkeypatch.setattr(model, "EVIDENCE_DIR", str(tmp_path / "evidence"))
+    monkeypatch.setattr(model, "CASE_GRAPH", {"nodes": [], "edges": []})
+    seen = []
+
+    class Vision:
+        def analyze(self, path, sus_feat=None, name="CCTV", evidence_dir=None):
+            with open(path, "rb") as f:
+                seen.append((path, f.read()))
+            return {"evidence_files": []}, {"nodes": [], "edges": []}
+
+    monkeypatch.setattr(model, "vision", Vision)
+    app = FastAPI()
+    app.include_router(model.router, prefix="/analyze")
+    client = TestClient(app)
+
+    for body in (b"first", b"second"):
+        assert client.post("/analyze/", files={"cctv_video": ("v.mp4", body)}).status_code == 200
+
+    assert [content for _, content in seen] == [b"first", b"second"]
+    assert len({path for path, _ in seen}) == 2
+    assert os.listdir(uploads) == []
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.yolo_detection import model
+from backend.yolo_detection.segments import merge_segments
+
+
+def segment(start, end, violence=(), chase=()):
+    return {"start": start, "end": end, "violence": list(violence), "chase": list(chase),
+            "contacts": {}, "suspect": None, "head": {}, "tail": {}, "pending_dir": None}
+
+
+def test_merged_reports_carry_their_own_graph(tmp_path, monkeypatch):
+    shown = {"nodes": [{"id": "doc_fir", "label": "fir.pdf", "type": "document"}], "edges": []}
+    monkeypatch.setattr(model, "CASE_GRAPH", shown)
+
+    def job(k):
+        evidence_dir = tmp_path / str(k)
+        evidence_dir.mkdir()
+        results = [segment(1, 100, violence=[10, 12]), segment(101, 200, chase=[150])]
+        return merge_segments(results, 25, f"CCTV{k}", str(evidence_dir))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        reports = list(pool.map(job, range(32)))
+
+    assert model.CASE_GRAPH is shown
+    assert shown["nodes"] == [{"id": "doc_fir", "label": "fir.pdf", "type": "document"}]
+    for k, report in enumerate(reports):
+        graph = report["case_graph"]
+        assert {n["id"] for n in graph["nodes"]} == {
+            f"video_cctv{k}", "event_physical_altercation", "event_rapid_movement"}
+        assert {(e["from"], e["label"]) for e in graph["edges"]} == {(f"video_cctv{k}", "captured")}
+        assert [e["event"] for e in report["events_detected"]] == ["Physical Altercation", "Rapid Movement"]
@@ -0,0 +1,204 @@
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from backend.dev.mock_gateway import MockGateway
+from backend.services.fast2sms_service import _SCHEMA, SMSDispatcher, send_batch
+
+MESSAGE = "Advisory: increased thefts reported near Dadar station."
+
+
+def phones(n):
+    return [f"9{i:09d}" for i in range(n)]
+
+
+@pytest.fixture
+def mock():
+    with MockGateway() as gateway:
+        yield gateway
+
+
+def dispatcher(gateway, tmp_path, api_key="test", **kw):
+    kw.setdefault("rate", 0)
+    kw.setdefault("backoff", 0.01)
+    return SMSDispatcher(lambda numbers, message: send_batch(numbers, message, gateway.url, api_key),
+                         db_path=str(tmp_path / "sms.db"), **kw)
+
+
+def test_numbers_are_batched(mock, tmp_path):
+    d = dispatcher(mock, tmp_path, batch_size=40)
+    campaign = d.dispatch(phones(250), MESSAGE)
+    status = d.wait(campaign["campaign_id"], timeout=10)
+    d.close()
+
+    assert campaign["batches"] == math.ceil(250 / 40)
+    assert mock.requests == campaign["batches"]
+    assert status["sent"] == 250 and status["done"]
+    assert sorted(mock.delivered) == phones(250)
+
+
+def test_numbers_are_normalized_and_deduplicated(mock, tmp_path):
+    d = dispatcher(mock, tmp_path)
+    campaign = d.dispatch(["9000000001", "+91 90000 00001", "09000000001", "9000000002",
+                           "12345", "5000000000"], MESSAGE)
+    status = d.wait(campaign["campaign_id"], timeout=10)
+    failed = d.deliveries(campaign["campaign_id"], status="failed")
+    d.close()
+
+    assert (campaign["recipients"], campaign["invalid"]) == (2, 2)
+    assert sorted(mock.delivered) == ["9000000001", "9000000002"]
+    assert status["sent"] == 2 and status["failed"] == 2
+    assert {r["error"] for r in failed} == {"invalid number"}
+
+
+def test_server_error_is_retried(mock, tmp_path):
+    mock.fail_next(500, 2)
+    d = dispatcher(mock, tmp_path)
+    campaign = d.dispatch(phones(10), MESSAGE)
+    status = d.wait(campaign["campaign_id"], timeout=10)
+    rows = d.deliveries(campaign["campaign_id"])
+    d.close()
+
+    assert status["sent"] == 10
+    assert mock.requests == 3
+    assert {r["attempts"] for r in rows} == {3}
+    assert sorted(mock.delivered) == phones(10)
+
+
+def test_throttling_honours_retry_after(tmp_path):
+    # the backoff alone would wait a minute; Retry-After says 50 ms
+    with MockGateway(retry_after=0.05) as mock:
+        mock.fail_next(429)
+        d = dispatcher(mock, tmp_path, backoff=60)
+        start = time.monotonic()
+        campaign = d.dispatch(phones(10), MESSAGE)
+        status = d.wait(campaign["campaign_id"], timeout=10)
+        elapsed = time.monotonic() - start
+        d.close()
+
+    assert status["sent"] == 10
+    assert mock.requests == 2
+    assert elapsed < 5
+
+
+def test_retries_are_bounded(mock, tmp_path):
+    mock.fail_next(500, 10)
+    d = dispatcher(mock, tmp_path, max_retries=2)
+    campaign = d.dispatch(phones(5), MESSAGE)
+    status = d.wait(campaign["campaign_id"], timeout=10)
+    rows = d.deliveries(campaign["campaign_id"])
+    d.close()
+
+    assert status["failed"] == 5
+    assert mock.requests == 3
+    assert {r["attempts"] for r in rows} == {3}
+
+
+@pytest.mark.parametrize("status", [400, 401])
+def test_client_errors_are_not_retried(mock, tmp_path, status):
+    mock.fail_next(status)
+    d = dispatcher(mock, tmp_path)
+    campaign = d.dispatch(phones(5), MESSAGE)
+    result = d.wait(campaign["campaign_id"], timeout=10)
+    rows = d.deliveries(campaign["campaign_id"])
+    d.close()
+
+    assert result["failed"] == 5
+    assert mock.requests == 1
+    assert {r["attempts"] for r in rows} == {1}
+    assert mock.delivered == []
+
+
+def test_missing_api_key_fails_without_a_request(mock, tmp_path):
+    d = dispatcher(mock, tmp_path, api_key="")
+    campaign = d.dispatch(phones(5), MESSAGE)
+    result = d.wait(campaign["campaign_id"], timeout=10)
+    d.close()
+
+    assert result["failed"] == 5
+    assert mock.requests == 0
+
+
+def test_retry_failed_requeues_failed_numbers(mock, tmp_path):
+    mock.fail_next(400)
+    d = dispatcher(mock, tmp_path)
+    campaign = d.dispatch(phones(5) + ["12345"], MESSAGE)
+    cid = campaign["campaign_id"]
+    assert d.wait(cid, timeout=10)["failed"] == 6
+
+    retry = d.retry_failed(cid)
+    status = d.wait(cid, timeout=10)
+    d.close()
+
+    assert retry["recipients"] == 5
+    assert status["sent"] == 5 and status["failed"] == 1
+    assert status["errors"] == {"invalid number": 1}
+    assert sorted(mock.delivered) == phones(5)
+
+
+def queued_rows(db_path, owners, schema=_SCHEMA):
+    """Campaign 1 with one queued row per owner pid, as another process left it"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(schema)
+    with conn:
+        conn.execute("INSERT INTO sms_campaigns (campaign_id, message, recipients, created_at) "
+                     "VALUES (1, ?, ?, 0)", (MESSAGE, len(owners)))
+        for phone, pid in zip(phones(len(owners)), owners):
+            if "owner_pid" in schema:
+                conn.execute("INSERT INTO sms_deliveries (campaign_id, phone, status, updated_at, owner_pid) "
+                             "VALUES (1, ?, 'queued', 0, ?)", (phone, pid))
+            else:
+                conn.execute("INSERT INTO sms_deliveries (campaign_id, phone, status, updated_at) "
+                             "VALUES (1, ?, 'queued', 0)", (phone,))
+    conn.close()
+
+
+def test_rows_queued_by_an_earlier_process_can_be_retried(mock, tmp_path):
+    # a database from before rows had owners
+    queued_rows(tmp_path / "sms.db", [None] * 3, _SCHEMA.replace("    owner_pid INTEGER,\n", ""))
+
+    d = dispatcher(mock, tmp_path)
+    status = d.status(1)
+    assert status["done"] and status["failed"] == 3
+    assert status["errors"] == {"interrupted": 3}
+
+    d.retry_failed(1)
+    status = d.wait(1, timeout=10)
+    d.close()
+    assert status["sent"] == 3
+    assert sorted(mock.delivered) == phones(3)
+
+
+def test_rows_of_live_processes_stay_queued(mock, tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    alive = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        queued_rows(tmp_path / "sms.db", [alive.pid, exited.pid, os.getpid()])
+        d = dispatcher(mock, tmp_path)
+        rows = {r["phone"]: (r["status"], r["error"]) for r in d.deliveries(1)}
+        d.close()
+    finally:
+        alive.kill()
+        alive.wait()
+
+    assert rows == {
+        phones(3)[0]: ("queued", None),             # another API worker's batch
+        phones(3)[1]: ("failed", "interrupted"),
+        phones(3)[2]: ("queued", None)              # this process's own dispatcher
+    }
+    assert mock.requests == 0
+
+
+def test_finished_campaigns_release_their_futures(mock, tmp_path):
+    d = dispatcher(mock, tmp_path, batch_size=10)
+    for _ in range(3):
+        d.dispatch(phones(30), MESSAGE)
+    d.close()
+
+    assert d._futures == {}
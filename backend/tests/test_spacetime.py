@@ -0,0 +1,65 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from backend.services import geogrid
+from backend.services.spacetime import SlotProfile, hour_of_week, spacetime_hotspots
+
+CRIME_TYPES = ["Theft", "Chain Snatching", "Sexual Harassment", None]
+
+
+def firs(seed, n):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(19.0, 19.1, n)
+    lon = rng.uniform(72.8, 72.9, n)
+    dates = [str(np.datetime64("2024-01-01") + int(d)) for d in rng.integers(0, 90, n)]
+    times = [f"{h:02d}:{m:02d} hrs" for h, m in zip(rng.integers(0, 24, n), rng.integers(0, 60, n))]
+    # a few FIRs without a usable date or time
+    dates[::50] = [None] * len(dates[::50])
+    times[7::60] = ["late night"] * len(times[7::60])
+    crime_types = rng.choice(np.array(CRIME_TYPES, dtype=object), n).tolist()
+    return lat, lon, dates, times, crime_types
+
+
+def reference_mix(lat, lon, dates, times, crime_types, hotspot, period, window_hours):
+    """The hotspot's crime mix, counted FIR by FIR"""
+    size = {"week": 168, "day": 24}[period]
+    cells = geogrid.encode(lat, lon, 6)
+    mix = Counter()
+    for cell, how, crime_type in zip(cells, hour_of_week(dates, times), crime_types):
+        if how >= 0 and cell == hotspot["cell"] and (how % size - hotspot["start_hour"]) % size < window_hours:
+            mix[crime_type or "Other"] += 1
+    return dict(mix)
+
+
+@pytest.mark.parametrize("period", ["week", "day"])
+def test_crime_mix_matches_a_per_fir_count(period):
+    lat, lon, dates, times, crime_types = firs(0, 3000)
+    result = spacetime_hotspots(lat, lon, dates, times, crime_types, period=period, min_count=1, top=None)
+
+    assert result["hotspots"]
+    for h in result["hotspots"]:
+        assert h["crime_types"] == reference_mix(lat, lon, dates, times, crime_types, h, period, 4)
+        assert sum(h["crime_types"].values()) == h["crimes_in_slot"]
+        counts = list(h["crime_types"].values())
+        assert counts == sorted(counts, reverse=True)
+
+
+def test_slot_profile_matches_spacetime_hotspots():
+    lat, lon, dates, times, crime_types = firs(1, 3000)
+    rows = list(zip(range(len(lat)), lat.tolist(), lon.tolist(), crime_types, dates, times))
+    profile = SlotProfile(rows, precision=6, window_hours=4, min_count=3)
+
+    for period, table in (("week", profile.week), ("day", profile.day)):
+        result = spacetime_hotspots(lat, lon, dates, times, crime_types, period=period, top=None)
+        assert table == {h["cell"]: h for h in result["hotspots"]}
+
+    hot = next(iter(profile.week.values()))
+    assert profile.slot_for(hot["center"]["lat"], hot["center"]["lon"]) == {"basis": "cell_week", **hot}
+    assert profile.slot_for(None, None)["basis"] == "city"
+
+
+def test_empty_profile():
+    profile = SlotProfile([], precision=6, window_hours=4, min_count=3)
+    assert profile.slot_for(19.0, 72.8) is None
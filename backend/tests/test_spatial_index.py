@@ -0,0 +1,93 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from backend.fir_store import FIRStore
+from backend.services import spatial_index
+from backend.services.spatial_index import SpatialIndex
+
+
+def firs(start, n):
+    return [{"fir_id": f"FIR-{i}", "crime_type": "Theft", "date": "01/03/2024",
+             "geo": {"lat": 19.0 + i * 1e-4, "lon": 72.8 + i * 1e-4}} for i in range(start, start + n)]
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    # every sync rebuilds, and so saves the index
+    monkeypatch.setattr(spatial_index, "SPATIAL_REBUILD_MIN", 0)
+    monkeypatch.setattr(spatial_index, "SPATIAL_REBUILD_FRACTION", 0.0)
+    return str(tmp_path / "firs.db"), str(tmp_path / "spatial.pkl")
+
+
+def saved_index(db, pkl, n=50):
+    store = FIRStore(db)
+    store.add_firs(firs(0, n))
+    SpatialIndex(store, pkl).sync()
+    return store
+
+
+def test_index_is_loaded_for_the_same_store(paths):
+    db, pkl = paths
+    store = saved_index(db, pkl)
+
+    loaded = SpatialIndex(store, pkl)
+    assert loaded.stats() == {"points": 50, "tree_points": 50, "delta_points": 0,
+                              "dead_points": 0, "last_seq": 50}
+
+
+def test_writes_since_the_save_are_replayed(paths):
+    db, pkl = paths
+    store = saved_index(db, pkl)
+    store.add_firs(firs(50, 5) + [{**firs(3, 1)[0], "geo": {"lat": 18.9, "lon": 72.7}}])
+    store.set_status("FIR-7", "Closed")
+
+    loaded = SpatialIndex(store, pkl)
+    assert loaded.stats()["points"] == 55
+    assert loaded.stats()["tree_points"] == 50
+    assert loaded.location_of("FIR-3")["lat"] == 18.9
+
+
+def test_recreated_store_discards_the_index(paths):
+    db, pkl = paths
+    saved_index(db, pkl).close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db + suffix):
+            os.remove(db + suffix)
+
+    # same path, same number of writes, different database
+    store = FIRStore(db)
+    store.add_firs(firs(100, 50))
+    loaded = SpatialIndex(store, pkl)
+    assert loaded.stats()["points"] == 0
+    assert loaded.location_of("FIR-0") is None
+    assert loaded.sync().location_of("FIR-100") is not None
+
+
+def test_store_older_than_the_index_discards_it(paths, tmp_path):
+    db, pkl = paths
+    store = FIRStore(db)
+    store.add_firs(firs(0, 50))
+    store.close()
+    shutil.copy(db, tmp_path / "backup.db")
+
+    store = saved_index(db, pkl, 0)
+    store.add_firs(firs(50, 10))
+    SpatialIndex(store, pkl).sync()
+    store.close()
+    shutil.copy(tmp_path / "backup.db", db)
+
+    assert SpatialIndex(FIRStore(db), pkl).stats()["points"] == 0
+
+
+def test_rows_missing_from_the_replay_discard_the_index(paths):
+    db, pkl = paths
+    store = saved_index(db, pkl)
+    with store._conn:
+        store._conn.execute("DELETE FROM firs WHERE fir_id = 'FIR-1'")
+        store._bump_version(store._conn.cursor())
+
+    assert SpatialIndex(store, pkl).stats()["points"] == 0
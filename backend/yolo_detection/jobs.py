@@ -0,0 +1,233 @@
+import os, shutil, uuid, cv2
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
+from fastapi import UploadFile, File, APIRouter, HTTPException, Query
+
+from backend.yolo_detection import model
+from backend.yolo_detection.segments import analyze_video_segmented
+
+router = APIRouter()
+
+# Each worker process holds its own YOLO/OSNet, loaded when it starts.
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", "2"))
+# finished jobs are dropped, with their progress and evidence folder, once
+# they are older than JOB_TTL_SECONDS or beyond the newest MAX_FINISHED_JOBS
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+MAX_FINISHED_JOBS = int(os.getenv("MAX_FINISHED_JOBS", "100"))
+
+_JOBS = {}
+_LOCK = Lock()
+_executor = None
+_progress = None
+# segmented jobs are coordinated from threads; the segments run on _executor
+_coordinator = ThreadPoolExecutor(max_workers=4)
+
+
+def _get_executor():
+    global _executor, _progress
+    with _LOCK:
+        if _executor is None:
+            ctx = mp.get_context("spawn")
+            _progress = ctx.Manager().dict()
+            _executor = ProcessPoolExecutor(max_workers=ANALYZE_WORKERS, mp_context=ctx,
+                                            initializer=model.load_models)
+        return _executor
+
+
+def _run_job(job_id, video_path, suspect_path, name, progress):
+    progress[job_id] = (0, 0)
+
+    evidence_dir = os.path.join(model.EVIDENCE_DIR, job_id)
+    os.makedirs(evidence_dir, exist_ok=True)
+
+    try:
+        sus_feat = None
+        if suspect_path:
+            img = cv2.imread(suspect_path)
+            if img is not None:
+                sus_feat = model.extract_feat(img)
+
+        def report(done, total):
+            progress[job_id] = (done, total)
+
+        result = model.analyze_video_logic(video_path, sus_feat, name, evidence_dir, report)
+    finally:
+        for p in (video_path, suspect_path):
+            if p and os.path.exists(p):
+                os.remove(p)
+
+    # served through the /evidence mount as /evidence/<job_id>/<file>;
+    # the job's case graph comes back in result["case_graph"], while
+    # /analyze/case-graph only shows the synchronous analysis
+    result["evidence_files"] = [f"{job_id}/{f}" for f in result["evidence_files"]]
+    return result
+
+
+def _run_segmented_job(job_id, video_path, suspect_path, name, n_segments):
+    evidence_dir = os.path.join(model.EVIDENCE_DIR, job_id)
+    os.makedirs(evidence_dir, exist_ok=True)
+
+    try:
+        result = analyze_video_segmented(
+            video_path, suspect_path, name, evidence_dir,
+            n_segments, _get_executor(), _progress, job_id
+        )
+    finally:
+        for p in (video_path, suspect_path):
+            if p and os.path.exists(p):
+                os.remove(p)
+
+    result["evidence_files"] = [f"{job_id}/{f}" for f in result["evidence_files"]]
+    return result
+
+
+def _discard(job_id):
+    if _progress is not None:
+        for k in [k for k in _progress.keys() if k == job_id or k.startswith(f"{job_id}:")]:
+            _progress.pop(k, None)
+    shutil.rmtree(os.path.join(model.EVIDENCE_DIR, job_id), ignore_errors=True)
+
+
+def _evict_finished():
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_TTL_SECONDS)
+    with _LOCK:
+        finished = sorted((j["finished_at"], i) for i, j in _JOBS.items() if j["finished_at"])
+        excess = len(finished) - MAX_FINISHED_JOBS
+        evicted = [i for n, (at, i) in enumerate(finished)
+                   if n < excess or datetime.fromisoformat(at) < cutoff]
+        for i in evicted:
+            del _JOBS[i]
+    for i in evicted:
+        _discard(i)
+    return evicted
+
+
+def _on_done(job_id, future):
+    with _LOCK:
+        job = _JOBS[job_id]
+        job["finished_at"] = datetime.utcnow().isoformat()
+        try:
+            job["result"] = future.result()
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+    if job["status"] == "failed":
+        # no report points into it, and segments leave .pending_* folders behind
+        shutil.rmtree(os.path.join(model.EVIDENCE_DIR, job_id), ignore_errors=True)
+    _evict_finished()
+
+
+def submit_job(video_path, suspect_path=None, name="CCTV", n_segments=1):
+    """n_segments > 1 splits the video into parallel segments (see segments.py)"""
+    job_id = uuid.uuid4().hex[:12]
+    executor = _get_executor()
+    _evict_finished()
+
+    with _LOCK:
+        _JOBS[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "name": name,
+            "submitted_at": datetime.utcnow().isoformat(),
+            "segments": n_segments,
+            "finished_at": None,
+            "error": None,
+            "result": None
+        }
+
+    if n_segments > 1:
+        future = _coordinator.submit(_run_segmented_job, job_id, video_path, suspect_path, name, n_segments)
+    else:
+        future = executor.submit(_run_job, job_id, video_path, suspect_path, name, _progress)
+    future.add_done_callback(lambda f: _on_done(job_id, f))
+    return job_id
+
+
+def get_job(job_id):
+    with _LOCK:
+        job = _JOBS.get(job_id)
+        if job is None:
+            return None
+        job = dict(job)
+
+    if job["status"] == "queued" and get_progress(job_id)["started"]:
+        job["status"] = "running"
+    return job
+
+
+def get_progress(job_id):
+    entries = []
+    if _progress is not None:
+        entries = [v for k, v in _progress.items() if k == job_id or k.startswith(f"{job_id}:")]
+    done = sum(d for d, _ in entries)
+    total = sum(t for _, t in entries)
+    return {
+        "started": bool(entries),
+        "frames_processed": done,
+        "total_frames": total,
+        "percent": round(100 * done / total, 1) if total else 0.0
+    }
+
+
+def _require_job(job_id):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs")
+async def submit_analysis(
+    cctv_video: UploadFile = File(...),
+    criminal_img: Optional[UploadFile] = File(None),
+    segments: int = Query(1, ge=1, le=256)
+):
+    token = uuid.uuid4().hex
+    vp = os.path.join(model.UPLOAD_DIR, f"{token}.mp4")
+    with open(vp, "wb") as f:
+        shutil.copyfileobj(cctv_video.file, f)
+
+    ip = None
+    if criminal_img:
+        ip = os.path.join(model.UPLOAD_DIR, f"{token}.jpg")
+        with open(ip, "wb") as f:
+            shutil.copyfileobj(criminal_img.file, f)
+
+    job_id = submit_job(vp, ip, "CCTV1", segments)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs")
+def list_jobs():
+    with _LOCK:
+        ids = list(_JOBS)
+    return [
+        {k: v for k, v in get_job(i).items() if k != "result"}
+        for i in ids
+    ]
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = _require_job(job_id)
+    return {k: v for k, v in job.items() if k != "result"}
+
+
+@router.get("/jobs/{job_id}/progress")
+def job_progress(job_id: str):
+    job = _require_job(job_id)
+    return {"job_id": job_id, "status": job["status"], **get_progress(job_id)}
+
+
+@router.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = _require_job(job_id)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
@@ -1,22 +1,24 @@
-import os, cv2, shutil, numpy as np, torch, requests, re
+import os, cv2, shutil, numpy as np, requests, re
+import queue, threading, time, uuid
 from fastapi import UploadFile, File, APIRouter
 from fastapi.responses import JSONResponse
 from typing import Optional, List
-from ultralytics import YOLO
-from scipy.spatial.distance import cosine
-import torchreid
 from collections import deque
-import fitz
-import docx
 import json
 import hashlib
 
+# torch / ultralytics / torchreid / fitz / docx are imported where they are
+# first needed, so importing this module (every API worker does) stays cheap
+
 router = APIRouter()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 EVIDENCE_DIR = os.path.join(BASE_DIR, "evidence")
+# the synchronous /analyze/ endpoint writes here; background jobs write to
+# EVIDENCE_DIR/<job_id>/ (see jobs.py)
+SYNC_EVIDENCE = "sync"
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(EVIDENCE_DIR, exist_ok=True)
@@ -24,27 +26,32 @@ os.makedirs(EVIDENCE_DIR, exist_ok=True)
 EXTRACTED_FACTS = []  
 CASE_GRAPH = {"nodes": [], "edges": []}
 
+def new_graph():
+    return {"nodes": [], "edges": []}
+
 def reset_graph():
     """Reset the graph for a new case"""
     global CASE_GRAPH
-    CASE_GRAPH = {"nodes": [], "edges": []}
+    CASE_GRAPH = new_graph()
 
-def add_node(id, label, type):
-    """Add a node only if it doesn't exist"""
-    if not any(n["id"] == id for n in CASE_GRAPH["nodes"]):
-        CASE_GRAPH["nodes"].append({"id": id, "label": label, "type": type})
+def add_node(id, label, type, graph=None):
+    """Add a node only if it doesn't exist; graph defaults to CASE_GRAPH"""
+    graph = CASE_GRAPH if graph is None else graph
+    if not any(n["id"] == id for n in graph["nodes"]):
+        graph["nodes"].append({"id": id, "label": label, "type": type})
 
-def add_edge(src, dst, label="related_to"):
+def add_edge(src, dst, label="related_to", graph=None):
     """Add an edge with validation"""
-    node_ids = [n["id"] for n in CASE_GRAPH["nodes"]]
+    graph = CASE_GRAPH if graph is None else graph
+    node_ids = [n["id"] for n in graph["nodes"]]
     if src in node_ids and dst in node_ids:
 
         edge_exists = any(
             e["from"] == src and e["to"] == dst 
-            for e in CASE_GRAPH["edges"]
+            for e in graph["edges"]
         )
         if not edge_exists:
-            CASE_GRAPH["edges"].append({"from": src, "to": dst, "label": label})
+            graph["edges"].append({"from": src, "to": dst, "label": label})
 
 def normalize_id(text, prefix):
     """Create consistent IDs from text"""
@@ -58,6 +65,7 @@ def extract_text_from_file(path):
 
     if ext == "pdf":
         try:
+            import fitz
             doc = fitz.open(path)
             for page in doc:
                 text += page.get_text()
@@ -65,6 +73,7 @@ def extract_text_from_file(path):
             pass
     elif ext == "docx":
         try:
+            import docx
             doc = docx.Document(path)
             for p in doc.paragraphs:
                 text += p.text + "\n"
@@ -150,13 +159,46 @@ VIOLENCE_SPEED = 8
 ESCAPE_SPEED = 25
 THEFT_IOU = 0.05
 
-yolo = YOLO("yolov8n.pt")
-yolo.fuse()
-
-reid = torchreid.models.build_model("osnet_x1_0", num_classes=1000, pretrained=True)
-reid.eval()
-if torch.cuda.is_available():
-    reid = reid.cuda()
+_yolo = None
+_reid = None
+_models_lock = threading.Lock()
+LOAD_MS = {}
+
+def get_yolo():
+    """YOLO detector/tracker, loaded on first use"""
+    global _yolo
+    with _models_lock:
+        if _yolo is None:
+            start=time.perf_counter()
+            from ultralytics import YOLO
+            m = YOLO("yolov8n.pt")
+            m.fuse()
+            _yolo = m
+            LOAD_MS["yolo"]=round((time.perf_counter()-start)*1000,1)
+        return _yolo
+
+def get_reid():
+    """OSNet ReID model, loaded on first use"""
+    global _reid
+    with _models_lock:
+        if _reid is None:
+            start=time.perf_counter()
+            import torch, torchreid
+            m = torchreid.models.build_model("osnet_x1_0", num_classes=1000, pretrained=True)
+            m.eval()
+            if torch.cuda.is_available():
+                m = m.cuda()
+            _reid = m
+            LOAD_MS["reid"]=round((time.perf_counter()-start)*1000,1)
+        return _reid
+
+def load_models():
+    """Load both models now (warm-up / worker initializer); returns load times"""
+    get_yolo(); get_reid()
+    return dict(LOAD_MS)
+
+def models_loaded():
+    return {"yolo": _yolo is not None, "reid": _reid is not None}
 
 def iou(a,b):
     x1=max(a[0],b[0]); y1=max(a[1],b[1])
@@ -167,6 +209,77 @@ def iou(a,b):
     area2=(b[2]-b[0])*(b[3]-b[1])
     return inter/(area1+area2-inter)
 
+def iou_matrix(boxes):
+    """Pairwise IoU of an (n,4) xyxy array, same result as iou() per pair"""
+    b=np.asarray(boxes)
+    x1=np.maximum(b[:,None,0],b[None,:,0]); y1=np.maximum(b[:,None,1],b[None,:,1])
+    x2=np.minimum(b[:,None,2],b[None,:,2]); y2=np.minimum(b[:,None,3],b[None,:,3])
+    inter=np.clip(x2-x1,0,None)*np.clip(y2-y1,0,None)
+    area=(b[:,2]-b[:,0])*(b[:,3]-b[:,1])
+    union=area[:,None]+area[None,:]-inter
+    return np.divide(inter,union,out=np.zeros_like(inter),where=inter>0)
+
+def detect_interactions(boxes,ids,speeds,suspect_id=None):
+    """Violence / theft / chase flags for one frame from IoU and speed masks.
+
+    boxes are the current boxes of the tracks in ids and speeds their
+    avg_speed(); every unordered pair (i<j) is checked like the old loop.
+    """
+    n=len(ids)
+    ov=iou_matrix(boxes)
+    sp=speeds[:,None]+speeds[None,:]
+    pairs=np.triu(np.ones((n,n),dtype=bool),1)
+
+    violent=(pairs&(ov>VIOLENCE_IOU)&(sp>VIOLENCE_SPEED)).any()
+    theft=False
+    if suspect_id is not None:
+        sus=np.asarray(ids)==suspect_id
+        theft=(pairs&(sus[:,None]|sus[None,:])&(ov>THEFT_IOU)).any()
+    chase=(speeds>ESCAPE_SPEED).any()
+    return bool(violent),bool(theft),bool(chase)
+
+EVIDENCE_BUFFER = int(os.getenv("EVIDENCE_BUFFER", "64"))
+EVIDENCE_WRITERS = 2
+
+class EvidenceWriter:
+    """Encodes flagged full-resolution frames to JPEG off the decode loop.
+
+    The queue is the bounded frame buffer: at most EVIDENCE_BUFFER frames
+    wait for encoding and put() blocks the decoder when it is full.
+    """
+    def __init__(self, name, out_dir=EVIDENCE_DIR, maxsize=EVIDENCE_BUFFER, workers=EVIDENCE_WRITERS):
+        self.name=name
+        self.out_dir=out_dir
+        self.q=queue.Queue(maxsize=maxsize)
+        self.threads=[threading.Thread(target=self._run,daemon=True) for _ in range(workers)]
+        for t in self.threads: t.start()
+
+    def _run(self):
+        while True:
+            item=self.q.get()
+            if item is None: break
+            f,frame=item
+            cv2.imwrite(os.path.join(self.out_dir,f"{self.name}_{f}.jpg"),frame)
+
+    def put(self,f,frame):
+        self.q.put((f,frame))
+
+    def close(self):
+        for _ in self.threads: self.q.put(None)
+        for t in self.threads: t.join()
+
+def theft_contacts(boxes,ids):
+    """Track ids overlapping another box above THEFT_IOU in this frame"""
+    ov=iou_matrix(boxes)
+    np.fill_diagonal(ov,0)
+    return [int(i) for i in np.asarray(ids)[(ov>THEFT_IOU).any(axis=1)]]
+
+def reset_tracker():
+    """Drop ByteTrack state so each video (or segment) starts with fresh ids"""
+    predictor=getattr(_yolo,"predictor",None)
+    for t in getattr(predictor,"trackers",None) or []:
+        t.reset()
+
 def format_time(frames,fps):
     return f"{min(frames)/fps:.2f}s - {max(frames)/fps:.2f}s"
 
@@ -189,21 +302,52 @@ class PersonTracker:
     def avg_speed(self):
         return np.mean(self.speeds) if self.speeds else 0
 
-def extract_feat(img):
-    if img is None or img.size==0: return None
+REID_BATCH = int(os.getenv("REID_BATCH", "32"))
+
+def prep_crop(img):
     img=cv2.resize(img,(128,256))
-    img=cv2.cvtColor(img,cv2.COLOR_BGR2RGB)/255.0
-    t=torch.tensor(img).permute(2,0,1).unsqueeze(0).float()
+    return cv2.cvtColor(img,cv2.COLOR_BGR2RGB)/255.0
+
+def extract_feats(imgs):
+    """Embed many crops with batched OSNet passes (None for empty crops)"""
+    feats=[None]*len(imgs)
+    valid=[k for k,img in enumerate(imgs) if img is not None and img.size>0]
+    if not valid: return feats
+    import torch
+    reid=get_reid()
+    batch=np.stack([prep_crop(imgs[k]) for k in valid])
+    t=torch.from_numpy(batch).permute(0,3,1,2).float()
     if torch.cuda.is_available(): t=t.cuda()
-    with torch.no_grad(): f=reid(t)
-    return f.squeeze().cpu().numpy()
+    out=[]
+    with torch.no_grad():
+        for s in range(0,len(t),REID_BATCH):
+            out.append(reid(t[s:s+REID_BATCH]).cpu().numpy())
+    for k,f in zip(valid,np.concatenate(out)):
+        feats[k]=f
+    return feats
 
-def find_suspect(boxes,ids,frame,sus_feat):
-    best=None; best_sim=0.6
+def extract_feat(img):
+    return extract_feats([img])[0]
+
+def find_suspect(boxes,ids,frame,sus_feat,feat_cache=None):
+    """Match the suspect against every box of a frame in one ReID batch.
+
+    feat_cache maps track id -> embedding so a person already compared in
+    an earlier frame is not embedded again.
+    """
+    if feat_cache is None: feat_cache={}
+    todo=[]; crops=[]
     for b,i in zip(boxes,ids):
+        if i in feat_cache: continue
         x1,y1,x2,y2=map(int,b)
-        crop=frame[y1:y2,x1:x2]
-        f=extract_feat(crop)
+        todo.append(i); crops.append(frame[y1:y2,x1:x2])
+    for i,f in zip(todo,extract_feats(crops)):
+        if f is not None: feat_cache[i]=f
+
+    from scipy.spatial.distance import cosine
+    best=None; best_sim=0.6
+    for i in ids:
+        f=feat_cache.get(i)
         if f is None: continue
         sim=1-cosine(sus_feat,f)
         if sim>best_sim:
@@ -214,62 +358,19 @@ def groq_report(event, tw, suspect=None):
   
     return f"{event} observed during {tw}."
 
-def analyze_video_logic(path, sus_feat=None, name="CCTV"):
-    reset_graph()  
-    cap=cv2.VideoCapture(path)
-    fps=cap.get(cv2.CAP_PROP_FPS)
-
-    trackers={}
-    suspect_id=None
-    frame_idx=0
-    violence=[]; theft=[]; chase=[]; evidence=set()
-
-    while True:
-        ret,frame=cap.read()
-        if not ret: break
-        frame_idx+=1
-        if frame_idx%FRAME_SKIP: continue
-
-        h,w=frame.shape[:2]
-        frame_s=cv2.resize(frame,(RESIZE_WIDTH,int(h*RESIZE_WIDTH/w)))
-        res=yolo.track(frame_s,persist=True,conf=CONF,classes=[0])[0]
-        if res.boxes.id is None: continue
-
-        boxes=res.boxes.xyxy.cpu().numpy()
-        ids=res.boxes.id.cpu().numpy().astype(int)
-
-        if sus_feat is not None and suspect_id is None:
-            suspect_id=find_suspect(boxes,ids,frame_s,sus_feat)
-
-        for b,i in zip(boxes,ids):
-            if i not in trackers: trackers[i]=PersonTracker(i)
-            trackers[i].update(b)
-
-        for i in range(len(ids)):
-            for j in range(i+1,len(ids)):
-                t1,t2=trackers[ids[i]],trackers[ids[j]]
-                ov=iou(t1.boxes[-1],t2.boxes[-1])
-                sp=t1.avg_speed()+t2.avg_speed()
-
-                if ov>VIOLENCE_IOU and sp>VIOLENCE_SPEED:
-                    violence.append(frame_idx); evidence.add(frame_idx)
-                if suspect_id in (ids[i],ids[j]) and ov>THEFT_IOU:
-                    theft.append(frame_idx); evidence.add(frame_idx)
-
-        for tid in ids:
-            if trackers[tid].avg_speed()>ESCAPE_SPEED:
-                chase.append(frame_idx); evidence.add(frame_idx)
-
-    cap.release()
+def build_report(theft, violence, chase, fps, name="CCTV", evidence_dir=EVIDENCE_DIR):
+    """The video's report, with its own case graph under "case_graph";
+    analyses run concurrently, so none of them touches CASE_GRAPH"""
     events=[]
+    graph = new_graph()
     video_id = normalize_id(name, "video")
-    add_node(video_id, name, "video_source")
+    add_node(video_id, name, "video_source", graph)
 
     def register_event(label, frames, desc):
         tw = format_time(frames, fps)
         eid = normalize_id(label, "event")
-        add_node(eid, label, "event")
-        add_edge(video_id, eid, "captured")
+        add_node(eid, label, "event", graph)
+        add_edge(video_id, eid, "captured", graph)
         events.append({"event": label, "time_window": tw, "llm_report": desc})
         return eid
 
@@ -278,18 +379,68 @@ def analyze_video_logic(path, sus_feat=None, name="CCTV"):
     if chase: register_event("Rapid Movement", chase, "Chase detected.")
     if not events: register_event("Normal Activity", [], "No abnormal events.")
 
-    cap=cv2.VideoCapture(path)
-    for f in sorted(evidence):
-        cap.set(cv2.CAP_PROP_POS_FRAMES,f)
-        r,fr=cap.read()
-        if r: cv2.imwrite(f"{EVIDENCE_DIR}/{name}_{f}.jpg",fr)
-    cap.release()
-
     return {
         "status": "completed",
         "events_detected": events,
-        "evidence_files": sorted(os.listdir(EVIDENCE_DIR))
+        "evidence_files": sorted(os.listdir(evidence_dir)),
+        "case_graph": graph
     }
+
+def analyze_video_logic(path, sus_feat=None, name="CCTV", evidence_dir=EVIDENCE_DIR, progress=None):
+    """progress, if given, is called as progress(frames_processed, total_frames)"""
+    reset_tracker()
+    yolo=get_yolo()
+    cap=cv2.VideoCapture(path)
+    fps=cap.get(cv2.CAP_PROP_FPS)
+    total=int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    trackers={}
+    feat_cache={}
+    suspect_id=None
+    frame_idx=0
+    violence=[]; theft=[]; chase=[]
+    writer=EvidenceWriter(name,evidence_dir)
+    # stop the writer threads and flush queued frames even if decoding fails
+    try:
+        while True:
+            ret,frame=cap.read()
+            if not ret: break
+            frame_idx+=1
+            if frame_idx%FRAME_SKIP: continue
+            if progress: progress(frame_idx,total)
+
+            h,w=frame.shape[:2]
+            frame_s=cv2.resize(frame,(RESIZE_WIDTH,int(h*RESIZE_WIDTH/w)))
+            res=yolo.track(frame_s,persist=True,conf=CONF,classes=[0])[0]
+            if res.boxes.id is None: continue
+
+            boxes=res.boxes.xyxy.cpu().numpy()
+            ids=res.boxes.id.cpu().numpy().astype(int)
+
+            if sus_feat is not None and suspect_id is None:
+                suspect_id=find_suspect(boxes,ids,frame_s,sus_feat,feat_cache)
+
+            for b,i in zip(boxes,ids):
+                if i not in trackers: trackers[i]=PersonTracker(i)
+                trackers[i].update(b)
+
+            speeds=np.array([trackers[i].avg_speed() for i in ids],dtype=float)
+            is_violent,is_theft,is_chase=detect_interactions(boxes,ids,speeds,suspect_id)
+
+            if is_violent: violence.append(frame_idx)
+            if is_theft: theft.append(frame_idx)
+            if is_chase: chase.append(frame_idx)
+
+            # flagged frames are saved from this decode pass, no second seek pass
+            if is_violent or is_theft or is_chase:
+                writer.put(frame_idx,frame)
+    finally:
+        cap.release()
+        writer.close()
+    if progress: progress(frame_idx,max(total,frame_idx))
+
+    return build_report(theft,violence,chase,fps,name,evidence_dir)
+
 @router.post("/text")
 async def analyze_text_evidence(files: List[UploadFile] = File(...)):
     
@@ -364,34 +515,64 @@ def reset_case():
     global EXTRACTED_FACTS
     EXTRACTED_FACTS = []
     reset_graph()
+    # job directories belong to their jobs and stay until the jobs go
     for f in os.listdir(EVIDENCE_DIR):
-        os.remove(os.path.join(EVIDENCE_DIR, f))
+        p = os.path.join(EVIDENCE_DIR, f)
+        if f == SYNC_EVIDENCE:
+            shutil.rmtree(p, ignore_errors=True)
+        elif os.path.isfile(p):
+            os.remove(p)
     return {"status": "case_reset"}
 
+def vision():
+    # model_server imports this module
+    from backend.yolo_detection.model_server import get_vision
+    return get_vision()
+
 @router.post("/")
 async def analyze_single(
     cctv_video: UploadFile = File(...),
     criminal_img: Optional[UploadFile] = File(None)
 ):
-    for f in os.listdir(EVIDENCE_DIR):
-        os.remove(os.path.join(EVIDENCE_DIR, f))
-
-    vp = os.path.join(UPLOAD_DIR, "v.mp4")
-    with open(vp, "wb") as f:
-        shutil.copyfileobj(cctv_video.file, f)
-
-    sus_feat = None
-    if criminal_img:
-        ip = os.path.join(UPLOAD_DIR, "s.jpg")
-        with open(ip, "wb") as f:
-            shutil.copyfileobj(criminal_img.file, f)
-        img = cv2.imread(ip)
-        if img is not None:
-            sus_feat = extract_feat(img)
-
-    result = analyze_video_logic(vp, sus_feat, "CCTV1")
+    global CASE_GRAPH
+    evidence_dir = os.path.join(EVIDENCE_DIR, SYNC_EVIDENCE)
+    shutil.rmtree(evidence_dir, ignore_errors=True)
+    os.makedirs(evidence_dir)
+
+    # per-request names: concurrent uploads must not overwrite each other
+    token = uuid.uuid4().hex
+    vp = os.path.join(UPLOAD_DIR, f"{token}.mp4")
+    ip = os.path.join(UPLOAD_DIR, f"{token}.jpg")
+    try:
+        with open(vp, "wb") as f:
+            shutil.copyfileobj(cctv_video.file, f)
+
+        sus_feat = None
+        if criminal_img:
+            with open(ip, "wb") as f:
+                shutil.copyfileobj(criminal_img.file, f)
+            img = cv2.imread(ip)
+            if img is not None:
+                sus_feat = vision().embed(img)
+
+        result, CASE_GRAPH = vision().analyze(vp, sus_feat, "CCTV1", evidence_dir)
+    finally:
+        for p in (vp, ip):
+            if os.path.exists(p):
+                os.remove(p)
+    # served through the /evidence mount as /evidence/sync/<file>
+    result["evidence_files"] = [f"{SYNC_EVIDENCE}/{f}" for f in result["evidence_files"]]
     return JSONResponse(result)
 
+@router.post("/warmup")
+def warmup():
+    """Load the models now instead of on the first analysis"""
+    return vision().warmup()
+
+@router.get("/models")
+def models_status():
+    return vision().status()
+
 @router.get("/health")
 def health():
     return {"status": "ok"}
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os, threading, time
+from multiprocessing.managers import BaseManager
+
+from backend.yolo_detection import model
+
+# One loaded copy of YOLO/OSNet for every API worker on the host.
+#
+#   python -m backend.yolo_detection.model_server        (loads, then serves)
+#
+# With MODEL_SERVER_ADDRESS=host:port set, API workers send analysis and
+# embedding calls to that process; without it they load the models
+# themselves, lazily, on the first vision request. Videos and evidence are
+# exchanged through the shared upload/evidence folders, so the server must
+# run on the same host; it listens on MODEL_SERVER_BIND (loopback) only.
+#
+# The manager unpickles what clients send, so anyone holding the key can
+# run code in the server: MODEL_SERVER_AUTHKEY has no default and must be
+# set, to the same secret, for the server and every API worker, e.g.
+#   python -c "import secrets; print(secrets.token_hex(32))"
+
+MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS", "")
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY", "")
+MODEL_SERVER_BIND = os.getenv("MODEL_SERVER_BIND", "127.0.0.1")
+
+
+def _authkey() -> bytes:
+    if not MODEL_SERVER_AUTHKEY:
+        raise RuntimeError("MODEL_SERVER_AUTHKEY is not set; refusing to use the model server without it")
+    return MODEL_SERVER_AUTHKEY.encode()
+
+
+class VisionService:
+    def __init__(self):
+        # tracker state lives on the shared YOLO instance: one video at a time
+        self._lock = threading.Lock()
+
+    def warmup(self):
+        start = time.perf_counter()
+        load_ms = model.load_models()
+        return {
+            "loaded": model.models_loaded(),
+            "load_ms": load_ms,
+            "warmup_ms": round((time.perf_counter() - start) * 1000, 1),
+            "pid": os.getpid()
+        }
+
+    def status(self):
+        return {"loaded": model.models_loaded(), "load_ms": dict(model.LOAD_MS), "pid": os.getpid()}
+
+    def embed(self, img):
+        return model.extract_feat(img)
+
+    def analyze(self, path, sus_feat=None, name="CCTV", evidence_dir=model.EVIDENCE_DIR):
+        """Returns (report, case graph) so the caller can show the graph"""
+        with self._lock:
+            result = model.analyze_video_logic(path, sus_feat, name, evidence_dir)
+        return result, result.pop("case_graph")
+
+
+class ModelManager(BaseManager):
+    pass
+
+
+def _parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+_local = None
+_remote = None
+_lock = threading.Lock()
+
+
+def get_vision():
+    """The model server's VisionService proxy, or an in-process one"""
+    global _local, _remote
+    with _lock:
+        if MODEL_SERVER_ADDRESS:
+            if _remote is None:
+                ModelManager.register("vision")
+                manager = ModelManager(address=_parse_address(MODEL_SERVER_ADDRESS),
+                                       authkey=_authkey())
+                manager.connect()
+                _remote = manager.vision()
+            return _remote
+        if _local is None:
+            _local = VisionService()
+        return _local
+
+
+def serve(address=MODEL_SERVER_ADDRESS or "127.0.0.1:8765"):
+    authkey = _authkey()
+    _, port = _parse_address(address)
+    service = VisionService()
+    print("model server warm-up:", service.warmup())
+    ModelManager.register("vision", callable=lambda: service)
+    manager = ModelManager(address=(MODEL_SERVER_BIND, port), authkey=authkey)
+    print(f"model server listening on {MODEL_SERVER_BIND}:{port}")
+    manager.get_server().serve_forever()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,239 @@
+import os, sys, shutil, cv2, numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.yolo_detection import model
+
+# Segment-parallel analysis of long recordings.
+#
+# Each segment starts decoding STITCH_OVERLAP frames before its own range so
+# the tracker history (speeds) is warm at the boundary; those warm-up frames
+# are only used for state, never reported. Tracks seen in that shared window
+# are embedded with OSNet on both sides and matched, which carries the
+# suspect's identity across segments the way one continuous tracker would.
+
+SEGMENTS = int(os.getenv("ANALYZE_SEGMENTS", "8"))
+STITCH_OVERLAP = model.FRAME_SKIP * 20
+STITCH_SIM = 0.7
+
+
+def plan_segments(total, n, overlap=STITCH_OVERLAP):
+    """Split 1-based frames 1..total into (decode_start, start, end) ranges"""
+    if total <= 0:  # frame count unknown, decode to the end in one segment
+        return [(1, 1, sys.maxsize)]
+    n = max(1, min(n, total // max(overlap, 1)))
+    bounds = np.linspace(0, total, n + 1).astype(int)
+    return [
+        (max(1, int(s) + 1 - overlap), int(s) + 1, int(e))
+        for s, e in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def _embed(crops):
+    ids = list(crops)
+    feats = model.extract_feats([crops[i] for i in ids])
+    return {i: f for i, f in zip(ids, feats) if f is not None}
+
+
+def analyze_segment(path, seg, sus_feat=None, name="CCTV",
+                    evidence_dir=model.EVIDENCE_DIR, progress=None, need_tail=True):
+    decode_start, start, end = seg
+    tail_from = end - STITCH_OVERLAP + 1
+
+    model.reset_tracker()
+    yolo = model.get_yolo()
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, decode_start - 1)
+    frame_idx = decode_start - 1
+
+    trackers = {}
+    feat_cache = {}
+    suspect = None
+    violence = []; chase = []; contacts = {}
+    head_crops = {}; tail_crops = {}   # track id -> crop at its last sighting
+
+    writer = model.EvidenceWriter(name, evidence_dir)
+    pending_dir = os.path.join(evidence_dir, f".pending_{start}")
+    pending = None
+    if sus_feat is not None:
+        os.makedirs(pending_dir, exist_ok=True)
+        pending = model.EvidenceWriter(name, pending_dir)
+
+    try:
+        while frame_idx < end:
+            ret, frame = cap.read()
+            if not ret: break
+            frame_idx += 1
+            if frame_idx % model.FRAME_SKIP: continue
+            if progress: progress(frame_idx - decode_start + 1, end - decode_start + 1)
+
+            h, w = frame.shape[:2]
+            frame_s = cv2.resize(frame, (model.RESIZE_WIDTH, int(h * model.RESIZE_WIDTH / w)))
+            res = yolo.track(frame_s, persist=True, conf=model.CONF, classes=[0])[0]
+            if res.boxes.id is None: continue
+
+            boxes = res.boxes.xyxy.cpu().numpy()
+            ids = res.boxes.id.cpu().numpy().astype(int)
+
+            for window, inside in ((head_crops, frame_idx < start),
+                                   (tail_crops, need_tail and frame_idx >= tail_from)):
+                if not inside: continue
+                for b, i in zip(boxes, ids):
+                    x1, y1, x2, y2 = map(int, b)
+                    window[int(i)] = frame_s[y1:y2, x1:x2].copy()
+
+            if frame_idx >= start and sus_feat is not None and suspect is None:
+                sid = model.find_suspect(boxes, ids, frame_s, sus_feat, feat_cache)
+                if sid is not None: suspect = (frame_idx, int(sid))
+
+            for b, i in zip(boxes, ids):
+                if i not in trackers: trackers[i] = model.PersonTracker(i)
+                trackers[i].update(b)
+
+            # warm-up frames belong to the previous segment's report
+            if frame_idx < start: continue
+
+            speeds = np.array([trackers[i].avg_speed() for i in ids], dtype=float)
+            is_violent, _, is_chase = model.detect_interactions(boxes, ids, speeds)
+
+            if is_violent: violence.append(frame_idx)
+            if is_chase: chase.append(frame_idx)
+            if is_violent or is_chase:
+                writer.put(frame_idx, frame)
+
+            # theft depends on the global suspect id, known only after merging
+            if pending is not None:
+                c = model.theft_contacts(boxes, ids)
+                if c:
+                    contacts[frame_idx] = c
+                    pending.put(frame_idx, frame)
+
+    finally:
+        cap.release()
+        writer.close()
+        if pending is not None: pending.close()
+
+    return {
+        "start": start,
+        "end": end,
+        "violence": violence,
+        "chase": chase,
+        "contacts": contacts,
+        "suspect": suspect,
+        "head": _embed(head_crops),
+        "tail": _embed(tail_crops),
+        "pending_dir": pending_dir if pending is not None else None
+    }
+
+
+def stitch_tracks(tail, head, min_sim=STITCH_SIM):
+    """Greedy one-to-one match of previous-segment tail ids to head ids"""
+    if not tail or not head:
+        return {}
+
+    a_ids = list(tail); b_ids = list(head)
+    a = np.stack([tail[i] for i in a_ids]).astype(float)
+    b = np.stack([head[i] for i in b_ids]).astype(float)
+    a /= np.linalg.norm(a, axis=1, keepdims=True) + 1e-12
+    b /= np.linalg.norm(b, axis=1, keepdims=True) + 1e-12
+    sim = a @ b.T
+
+    cand = np.argwhere(sim >= min_sim)
+    cand = cand[np.argsort(-sim[cand[:, 0], cand[:, 1]], kind="stable")]
+
+    mapping = {}; used = set()
+    for x, y in cand:
+        if a_ids[x] in mapping or y in used: continue
+        mapping[a_ids[x]] = b_ids[y]; used.add(y)
+    return mapping
+
+
+def _promote(pending_dir, evidence_dir, fname):
+    if not pending_dir: return
+    src = os.path.join(pending_dir, fname)
+    dst = os.path.join(evidence_dir, fname)
+    if os.path.exists(src) and not os.path.exists(dst):
+        shutil.move(src, dst)
+
+
+def merge_segments(results, fps, name="CCTV", evidence_dir=model.EVIDENCE_DIR):
+    results = sorted(results, key=lambda r: r["start"])
+    violence = []; chase = []; theft = []
+
+    # the sequential loop stops searching once a suspect id is set, and
+    # loses the suspect when its track dies; mirror both here
+    found = False
+    suspect = None
+    prev = None
+
+    for r in results:
+        violence += r["violence"]
+        chase += r["chase"]
+
+        since = r["start"]
+        if found:
+            if suspect is not None:
+                suspect = stitch_tracks(prev["tail"], r["head"]).get(suspect)
+        elif r["suspect"]:
+            found = True
+            since, suspect = r["suspect"]
+
+        if suspect is not None:
+            for f in sorted(r["contacts"]):
+                if f >= since and suspect in r["contacts"][f]:
+                    theft.append(f)
+                    _promote(r["pending_dir"], evidence_dir, f"{name}_{f}.jpg")
+
+        if r["pending_dir"]:
+            shutil.rmtree(r["pending_dir"], ignore_errors=True)
+        prev = r
+
+    # runs in the API process next to other jobs and /analyze/: the report
+    # carries its own case graph and CASE_GRAPH is left alone
+    return model.build_report(theft, violence, chase, fps, name, evidence_dir)
+
+
+def run_segment(path, seg, suspect_path=None, name="CCTV", evidence_dir=model.EVIDENCE_DIR,
+                progress=None, key=None, need_tail=True):
+    """Worker entry point; progress is a shared dict written under key"""
+    sus_feat = None
+    if suspect_path:
+        img = cv2.imread(suspect_path)
+        if img is not None:
+            sus_feat = model.extract_feat(img)
+
+    def report(done, total):
+        progress[key] = (done, total)
+
+    return analyze_segment(path, seg, sus_feat, name, evidence_dir,
+                           report if progress is not None else None, need_tail)
+
+
+def analyze_video_segmented(path, suspect_path=None, name="CCTV", evidence_dir=model.EVIDENCE_DIR,
+                            segments=SEGMENTS, executor=None, progress=None, key="segments"):
+    """Analyze a video as parallel segments and merge them into one report.
+
+    Pass an existing ProcessPoolExecutor to share workers with the job
+    queue; otherwise a spawn pool with one process per segment is used.
+    """
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    plan = plan_segments(total, segments)
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=len(plan), mp_context=mp.get_context("spawn"))
+
+    try:
+        futures = [
+            executor.submit(run_segment, path, seg, suspect_path, name, evidence_dir,
+                            progress, f"{key}:{k}", k < len(plan) - 1)
+            for k, seg in enumerate(plan)
+        ]
+        results = [f.result() for f in futures]
+    finally:
+        if own: executor.shutdown()
+
+    return merge_segments(results, fps, name, evidence_dir)